@@ -5,7 +5,7 @@
 import numpy as np
 
 
-def convolve_grayscale_valid(images, kernel):
+def convolve_grayscale_valid(images, kernel, reference=False):
     """Function that that performs a valid convolution on grayscale images.
 
     Args:
@@ -16,12 +16,22 @@ def convolve_grayscale_valid(images, kernel):
         kernel (numpy.ndarray): N-dimensional array with shape (kh, kw)
             containing the kernel for the convolution where kh is the
             height of the kernel and kw is the width of the kernel.
+        reference (bool, optional): If True the convolution is computed with
+            a loop over every window instead of a single strided matrix
+            multiply. Defaults to False.
 
     Returns:
         A numpy.ndarray containing the convolved images.
     """
     m, h, w = images.shape[0], images.shape[1], images.shape[2]
     kh, kw = kernel.shape[0], kernel.shape[1]
+    if not reference:
+        images = images.astype(float, copy=False)
+        s_m, s_h, s_w = images.strides
+        windows = np.lib.stride_tricks.as_strided(
+            images, shape=(m, h - kh + 1, w - kw + 1, kh, kw),
+            strides=(s_m, s_h, s_w, s_h, s_w), writeable=False)
+        return np.tensordot(windows, kernel, axes=2)
     convol = np.zeros((m, h - kh + 1, w - kw + 1))
     for x in range(convol.shape[1]):
         for y in range(convol.shape[2]):
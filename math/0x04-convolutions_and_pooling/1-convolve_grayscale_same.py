@@ -5,7 +5,7 @@
 import numpy as np
 
 
-def convolve_grayscale_same(images, kernel):
+def convolve_grayscale_same(images, kernel, reference=False):
     """Function that that performs a same convolution on grayscale images.
 
     Args:
@@ -16,6 +16,9 @@ def convolve_grayscale_same(images, kernel):
         kernel (numpy.ndarray): N-dimensional array with shape (kh, kw)
             containing the kernel for the convolution where kh is the
             height of the kernel and kw is the width of the kernel.
+        reference (bool, optional): If True the convolution is computed with
+            a loop over every window instead of a single strided matrix
+            multiply. Defaults to False.
 
     Returns:
         A numpy.ndarray containing the convolved images.
@@ -32,6 +35,13 @@ def convolve_grayscale_same(images, kernel):
         pad_w = kw // 2
     images = np.pad(images, ((0, 0), (pad_h, pad_h), (pad_w, pad_w)),
                     "constant", constant_values=0)
+    if not reference:
+        images = images.astype(float, copy=False)
+        s_m, s_h, s_w = images.strides
+        windows = np.lib.stride_tricks.as_strided(
+            images, shape=(m, h, w, kh, kw),
+            strides=(s_m, s_h, s_w, s_h, s_w), writeable=False)
+        return np.tensordot(windows, kernel, axes=2)
     convol = np.zeros((m, h, w))
     for x in range(convol.shape[1]):
         for y in range(convol.shape[2]):
@@ -5,7 +5,7 @@
 import numpy as np
 
 
-def convolve_grayscale_padding(images, kernel, padding):
+def convolve_grayscale_padding(images, kernel, padding, reference=False):
     """Function that that performs a convolution on grayscale images with
     custom padding.
 
@@ -20,6 +20,9 @@ def convolve_grayscale_padding(images, kernel, padding):
         padding (tuple): Tuple of containing (ph, pw) where ph is the padding
             for the height of the image and pw is the padding for the width of
             the image.
+        reference (bool, optional): If True the convolution is computed with
+            a loop over every window instead of a single strided matrix
+            multiply. Defaults to False.
 
     Returns:
         A numpy.ndarray containing the convolved images.
@@ -29,7 +32,16 @@ def convolve_grayscale_padding(images, kernel, padding):
     pad_h, pad_w = padding[0], padding[1]
     images = np.pad(images, ((0, 0), (pad_h, pad_h), (pad_w, pad_w)),
                     "constant", constant_values=0)
-    convol = np.zeros((m, h + (2 * pad_h) - kh + 1, w + (2 * pad_w) - kw + 1))
+    conv_h = h + (2 * pad_h) - kh + 1
+    conv_w = w + (2 * pad_w) - kw + 1
+    if not reference:
+        images = images.astype(float, copy=False)
+        s_m, s_h, s_w = images.strides
+        windows = np.lib.stride_tricks.as_strided(
+            images, shape=(m, conv_h, conv_w, kh, kw),
+            strides=(s_m, s_h, s_w, s_h, s_w), writeable=False)
+        return np.tensordot(windows, kernel, axes=2)
+    convol = np.zeros((m, conv_h, conv_w))
     for x in range(convol.shape[1]):
         for y in range(convol.shape[2]):
             output = np.sum(images[:, x: x + kh, y: y + kw] * kernel,
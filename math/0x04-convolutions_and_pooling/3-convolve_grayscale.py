@@ -5,7 +5,8 @@
 import numpy as np
 
 
-def convolve_grayscale(images, kernel, padding='same', stride=(1, 1)):
+def convolve_grayscale(images, kernel, padding='same', stride=(1, 1),
+                       reference=False):
     """Function that that performs a convolution on grayscale images..
 
     Args:
@@ -24,6 +25,9 @@ def convolve_grayscale(images, kernel, padding='same', stride=(1, 1)):
         stride (tuple): A tuple containing (sh, sw) where sh is the stride for
             the height of the image and sw is the stride for the width of the
             image.
+        reference (bool, optional): If True the convolution is computed with
+            a loop over every window instead of a single strided matrix
+            multiply. Defaults to False.
 
     Returns:
         A numpy.ndarray containing the convolved images.
@@ -44,6 +48,13 @@ def convolve_grayscale(images, kernel, padding='same', stride=(1, 1)):
                     'constant', constant_values=0)
     conv_h = ((h + (2 * pad_h) - kh) // sh) + 1
     conv_w = ((w + (2 * pad_w) - kw) // sw) + 1
+    if not reference:
+        images = images.astype(float, copy=False)
+        s_m, s_h, s_w = images.strides
+        windows = np.lib.stride_tricks.as_strided(
+            images, shape=(m, conv_h, conv_w, kh, kw),
+            strides=(s_m, s_h * sh, s_w * sw, s_h, s_w), writeable=False)
+        return np.tensordot(windows, kernel, axes=2)
     convol = np.zeros((m, conv_h, conv_w))
     i = 0
     for x in range(0, (h + (2 * pad_h) - kh + 1), sh):
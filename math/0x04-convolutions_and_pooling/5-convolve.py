@@ -5,7 +5,8 @@
 import numpy as np
 
 
-def convolve(images, kernels, padding='same', stride=(1, 1)):
+def convolve(images, kernels, padding='same', stride=(1, 1),
+             reference=False):
     """Function that that performs a convolution on images with channels.
 
     Args:
@@ -25,6 +26,9 @@ def convolve(images, kernels, padding='same', stride=(1, 1)):
         stride (tuple): A tuple containing (sh, sw) where sh is the stride for
             the height of the image and sw is the stride for the width of the
             image.
+        reference (bool, optional): If True the convolution is computed with
+            a loop over every window instead of a single strided matrix
+            multiply. Defaults to False.
 
     Returns:
         A numpy.ndarray containing the convolved images.
@@ -45,6 +49,14 @@ def convolve(images, kernels, padding='same', stride=(1, 1)):
                     'constant', constant_values=0)
     conv_h = ((h + (2 * pad_h) - kh) // sh) + 1
     conv_w = ((w + (2 * pad_w) - kw) // sw) + 1
+    if not reference:
+        images = images.astype(float, copy=False)
+        s_m, s_h, s_w, s_c = images.strides
+        windows = np.lib.stride_tricks.as_strided(
+            images, shape=(m, conv_h, conv_w, kh, kw, c),
+            strides=(s_m, s_h * sh, s_w * sw, s_h, s_w, s_c),
+            writeable=False)
+        return np.tensordot(windows, kernels, axes=3)
     convol = np.zeros((m, conv_h, conv_w, nc))
 
     for z in (range(nc)):
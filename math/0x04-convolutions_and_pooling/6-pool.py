@@ -5,7 +5,7 @@
 import numpy as np
 
 
-def pool(images, kernel_shape, stride, mode='max'):
+def pool(images, kernel_shape, stride, mode='max', reference=False):
     """Function that performs pooling on images.
 
     Args:
@@ -21,12 +21,27 @@ def pool(images, kernel_shape, stride, mode='max'):
             image.
         mode (str, optional): Indicates the type of pooling 'max' indicates max
             pooling and 'avg' indicates average pooling. Defaults to 'max'.
+        reference (bool, optional): If True the pooling is computed with a
+            loop over every window instead of a single strided reduction.
+            Defaults to False.
+
+    Returns:
+        A numpy.ndarray containing the pooled images.
     """
     m, h, w, c = images.shape
     kh, kw = kernel_shape
     sh, sw = stride
     output_h = ((h - kh) // sh) + 1
     output_w = ((w - kw) // sw) + 1
+    if not reference:
+        s_m, s_h, s_w, s_c = images.strides
+        windows = np.lib.stride_tricks.as_strided(
+            images, shape=(m, output_h, output_w, kh, kw, c),
+            strides=(s_m, s_h * sh, s_w * sw, s_h, s_w, s_c),
+            writeable=False)
+        if mode == 'max':
+            return np.max(windows, axis=(3, 4)).astype(float)
+        return np.mean(windows, axis=(3, 4))
     pooled = np.zeros((m, output_h, output_w, c))
     i = 0
     for x in range(0, (h - kh + 1), sh):
@@ -11,12 +11,16 @@ class NeuralNetwork():
     """Class that defines a neural network with one hidden layer performing
     binary classification."""
 
-    def __init__(self, nx, nodes):
+    def __init__(self, nx, nodes, dtype=np.float32):
         """Innitilization function for NeuralNetwork class
 
         Args:
             nx (int): The number of input features
             nodes (int): The number of nodes found in the hidden layer
+            dtype (numpy.dtype, optional): The floating point type the weights
+                are stored in. Computations run in this type, except for
+                float16 weights which are computed in float32. Defaults to
+                np.float32.
         """
         if not isinstance(nx, int):
             raise TypeError("nx must be an integer")
@@ -26,10 +30,14 @@ class NeuralNetwork():
             raise TypeError("nodes must be an integer")
         elif nodes < 1:
             raise ValueError("nodes must be a positive integer")
-
-        self.__W1 = np.random.randn(nodes, nx)
-        self.__W2 = np.random.randn(1, nodes)
-        self.__b1 = np.zeros((nodes, 1))
+        elif not np.issubdtype(dtype, np.floating):
+            raise TypeError("dtype must be a floating point type")
+
+        self.__dtype = np.dtype(dtype)
+        self.__compute_dtype = np.promote_types(dtype, np.float32)
+        self.__W1 = np.random.randn(nodes, nx).astype(dtype)
+        self.__W2 = np.random.randn(1, nodes).astype(dtype)
+        self.__b1 = np.zeros((nodes, 1), dtype=dtype)
         self.__b2 = 0
         self.__A1 = 0
         self.__A2 = 0
@@ -64,6 +72,11 @@ class NeuralNetwork():
         """Getter method for __A2"""
         return self.__A2
 
+    @property
+    def dtype(self):
+        """Getter method for __dtype"""
+        return self.__dtype
+
     def forward_prop(self, X):
         """Function that calculates the forward propagation of the neural
         network.
@@ -78,10 +91,11 @@ class NeuralNetwork():
                 the hidden layer
             self.__A2 (float): The activated output for the neural network.
         """
-
-        z = np.dot(self.W1, X) + self.__b1
+        dtype = self.__compute_dtype
+        X = np.asarray(X, dtype=dtype)
+        z = np.dot(self.W1.astype(dtype, copy=False), X) + self.__b1
         self.__A1 = 1/(1 + np.exp(-z))  # Sigmoid
-        z = np.dot(self.W2, self.__A1) + self.__b2
+        z = np.dot(self.W2.astype(dtype, copy=False), self.__A1) + self.__b2
         self.__A2 = 1/(1 + np.exp(-z))  # Sigmoid
         return self.__A1, self.__A2
 
@@ -144,16 +158,19 @@ class NeuralNetwork():
         """
 
         m = X.shape[1]
-        dZ2 = A2 - Y
+        dtype = self.__compute_dtype
+        X = np.asarray(X, dtype=dtype)
+        dZ2 = A2 - np.asarray(Y, dtype=dtype)
         dW2 = (np.matmul(dZ2, A1.T) / m)
         db2 = np.sum(dZ2, axis=1, keepdims=True) / m
-        dZ1 = np.multiply(np.dot(self.W2.T, dZ2), (A1 * (1 - A1)))
+        dZ1 = np.multiply(np.dot(self.W2.T.astype(dtype, copy=False), dZ2),
+                          (A1 * (1 - A1)))
         dW1 = np.matmul(dZ1, X.T) / m
         db1 = np.sum(dZ1, axis=1, keepdims=True) / m
-        self.__W2 = self.W2 - (alpha * dW2)
-        self.__b2 = self.b2 - (alpha * db2)
-        self.__W1 = self.W1 - (alpha * dW1)
-        self.__b1 = self.b1 - (alpha * db1)
+        self.__W2 = (self.W2 - (alpha * dW2)).astype(self.__dtype)
+        self.__b2 = (self.b2 - (alpha * db2)).astype(self.__dtype)
+        self.__W1 = (self.W1 - (alpha * dW1)).astype(self.__dtype)
+        self.__b1 = (self.b1 - (alpha * db1)).astype(self.__dtype)
 
     def train(self, X, Y, iterations=5000, alpha=0.05, verbose=True,
               graph=True, step=100):
@@ -196,6 +213,8 @@ class NeuralNetwork():
             elif step < 1 or step > iterations:
                 raise ValueError("step must be positive and <= iterations")
 
+        X = np.asarray(X, dtype=self.__compute_dtype)
+        Y = np.asarray(Y, dtype=self.__compute_dtype)
         x = np.arange(0, iterations, step)
         y = []
 
@@ -5,19 +5,26 @@ network performing binary classification."""
 import numpy as np
 import matplotlib.pyplot as plt
 import pickle
+import time
+ParameterBuffer = __import__('parameter_buffer').ParameterBuffer
+train_data_parallel = __import__('data_parallel').train_data_parallel
 
 
 class DeepNeuralNetwork():
     """Class that defines a deep neural network performing binary
     classification."""
 
-    def __init__(self, nx, layers, activation='sig'):
+    def __init__(self, nx, layers, activation='sig', dtype=np.float32):
         """Class constructor
 
         Args:
             nx (int): The number of input features
             layers (list[int]): List representing the number of nodes in each
                 layer of the network
+            dtype (numpy.dtype, optional): The floating point type the weights
+                are stored in. Computations run in this type, except for
+                float16 weights which are computed in float32. Defaults to
+                np.float32.
         """
         if not isinstance(nx, int):
             raise TypeError("nx must be an integer")
@@ -27,18 +34,22 @@ class DeepNeuralNetwork():
             raise TypeError("layers must be a list of positive integers")
         elif activation is not 'sig' and activation is not 'tanh':
             raise ValueError("activation must be 'sig' or 'tanh'")
+        elif not np.issubdtype(dtype, np.floating):
+            raise TypeError("dtype must be a floating point type")
 
         self.__L = len(layers)
         self.__activation = activation
         self.__cache = {}
-        weights = {}
-        prev = nx
-        for i, L in enumerate(layers, 1):
+        for L in layers:
             if not isinstance(L, int) and L < 0:
                 raise TypeError("layers must be a list of positive integers")
-            weights["b{}".format(i)] = np.zeros((L, 1))
-            weights["W{}".format(i)] = (np.random.randn(L, prev) *
-                                        np.sqrt(2 / prev))
+        self.__dtype = np.dtype(dtype)
+        self.__compute_dtype = np.promote_types(dtype, np.float32)
+        weights = ParameterBuffer(nx, layers, dtype)
+        prev = nx
+        for i, L in enumerate(layers, 1):
+            W, b = weights.layer(i)
+            W[...] = np.random.randn(L, prev) * np.sqrt(2 / prev)
             prev = L
         self.__weights = weights
 
@@ -62,7 +73,17 @@ class DeepNeuralNetwork():
         """Getter for self.__activation"""
         return self.__activation
 
-    def forward_prop(self, X):
+    @property
+    def dtype(self):
+        """Getter for self.__dtype"""
+        return self.__dtype
+
+    @property
+    def compute_dtype(self):
+        """Getter for self.__compute_dtype"""
+        return self.__compute_dtype
+
+    def forward_prop(self, X, buffers=None, logits=False, cache=None):
         """Function that calculates the forward propagation of the deep
             neural network.
 
@@ -70,27 +91,50 @@ class DeepNeuralNetwork():
             X (numpy.ndarray): N-dimensional array with shape (nx, m) that
             contains the input data, where nx is the number of input features
             to the deep neural network and m is the number of examples.
+            buffers (dict, optional): Dictionary of activation arrays keyed by
+            (layer, m) that are reused between calls. Missing arrays are
+            allocated and added to it. When given, the activations are
+            computed in place in these arrays. Defaults to None.
+            logits (boolean, optional): Defines whether or not to leave the
+            output layer unactivated, for softmax_cross_entropy. Defaults to
+            False.
+            cache (dict, optional): Dictionary the activations are stored in
+            instead of self.cache. Defaults to None.
 
         Returns:
             A (numpy.ndarray[(float)]): The activated output for the deep
-            neural network.
+            neural network, or its logits.
         """
-        A = X
-        self.cache["A{}".format(0)] = X
+        if cache is None:
+            cache = self.__cache
+        A = np.asarray(X, dtype=self.compute_dtype)
+        cache["A{}".format(0)] = A
         for L in range(1, self.L + 1):
             prev = A
-            W = self.weights["W{}".format(L)]
-            b = self.weights["b{}".format(L)]
-            Z = np.matmul(W, A) + b
+            W, b = self.weights.layer(L)
+            if self.dtype != self.compute_dtype:
+                W = W.astype(self.compute_dtype)
+                b = b.astype(self.compute_dtype)
+            if buffers is None:
+                Z = np.matmul(W, A) + b
+                out = None
+            else:
+                out = buffers.get((L, X.shape[1]))
+                if out is None:
+                    out = np.empty((W.shape[0], X.shape[1]),
+                                   dtype=self.compute_dtype)
+                    buffers[(L, X.shape[1])] = out
+                Z = np.matmul(W, A, out=out)
+                Z += b
             if L == self.L:
-                A = self.softmax(Z)
+                A = Z if logits else self.softmax(Z, out)
             else:
                 if self.activation == 'sig':
-                    A = self.sigmoid(Z)
+                    A = self.sigmoid(Z, out)
                 if self.activation == 'tanh':
-                    A = self.tanh(Z)
-            self.__cache["A{}".format(L)] = A
-        return A, self.cache
+                    A = self.tanh(Z, out)
+            cache["A{}".format(L)] = A
+        return A, cache
 
     def cost(self, Y, A):
         """Function that alculates the cost of the model using
@@ -110,8 +154,54 @@ class DeepNeuralNetwork():
         loss = np.sum(-Y * np.log(A))
         return loss / m
 
+    def predict(self, X):
+        """Function that calculates the output of the deep neural network
+        without storing anything in self.cache, so it may be called from
+        several threads and on read-only weights.
+
+        Args:
+            X (numpy.ndarray): N-dimensional array with shape (nx, m) that
+                contains the input data.
+
+        Returns:
+            The activated output for the deep neural network.
+        """
+        A, _ = self.forward_prop(X, cache={})
+        return A
+
+    def softmax_cross_entropy(self, Y, Z, out=None):
+        """Function that calculates the cross-entropy cost of the softmax of
+        the output layer and its gradient in one pass, using the log-softmax
+        so large logits neither overflow nor take the log of 0.
+
+        Args:
+            Y (numpy.ndarray): N-dimensional array with shape (classes, m)
+                that contains the correct labels for the input data.
+            Z (numpy.ndarray): N-dimensional array with shape (classes, m)
+                containing the logits of the output layer.
+            out (numpy.ndarray, optional): Array the gradient is written into.
+                May be Z itself. Defaults to None.
+
+        Returns:
+            cost (float): The cost of the network.
+            dZ (numpy.ndarray): The gradient of the cost with respect to Z
+                for each example, softmax(Z) - Y.
+        """
+        m = Y.shape[1]
+        Y = np.asarray(Y, dtype=Z.dtype)
+        dZ = np.subtract(Z, np.max(Z, axis=0, keepdims=True), out=out)
+        # -sum(Y * log_softmax) = -sum(Y * Z) + sum(Y) * log(sum(exp(Z)))
+        loss = -np.einsum('ij,ij->', Y, dZ)
+        np.exp(dZ, out=dZ)
+        total = np.sum(dZ, axis=0, keepdims=True)
+        loss += np.sum(np.sum(Y, axis=0, keepdims=True) * np.log(total))
+        dZ /= total
+        dZ -= Y
+        return loss / m, dZ
+
     def evaluate(self, X, Y):
-        """Function that valuates the deep neural network’s predictions.
+        """Function that valuates the deep neural network’s predictions. The
+        cost comes from softmax_cross_entropy so large logits stay finite.
 
         Args:
             X (numpy.ndarray): N-dimensioal array with shape (nx, m) that
@@ -126,47 +216,81 @@ class DeepNeuralNetwork():
                 example.
             cost (float): The cost of the network.
         """
-        A, cache = self.forward_prop(X)
-        cost = self.cost(Y, A)
+        Z, cache = self.forward_prop(X, logits=True)
+        cost, _ = self.softmax_cross_entropy(Y, Z)
+        A = self.softmax(Z)
+        cache["A{}".format(self.L)] = A
         A = np.where(A >= 0.5, 1, 0)
         return A, cost
 
-    def gradient_descent(self, Y, cache, alpha=0.05):
-        """Function that calculates one pass of gradient descent on the neural
-        network.
+    def gradients(self, Y, cache, dZ=None):
+        """Function that back propagates through the neural network and sums
+        the gradients of the weights and biases over the examples.
 
         Args:
-            Y (numpy.ndarray): N-dimensioal array with shape (1, m) that
+            Y (numpy.ndarray): N-dimensioal array with shape (classes, m) that
                 contains the correct labels for the input data.
             cache (dictionary): Dictionary containing all the intermediary
                 values of the network.
-            alpha (float, optional): The learning rate. Defaults to 0.05.
+            dZ (numpy.ndarray, optional): The gradient of the output layer
+                from softmax_cross_entropy. If None, it is computed from the
+                cached output as A - Y. Defaults to None.
+
+        Returns:
+            A ParameterBuffer in the compute type holding the gradients summed
+            over the m examples.
         """
-        m = Y.shape[1]
+        Y = np.asarray(Y, dtype=self.compute_dtype)
+        grads = self.weights.zeros_like(self.compute_dtype)
 
         for i in range(self.L, 0, -1):
             Ai = cache["A{}".format(i)]
             Ai_next = cache["A{}".format(i - 1)]
 
             if i == self.L:
-                dZi = (Ai - Y)
+                dZi = (Ai - Y) if dZ is None else dZ
             else:
                 if self.activation == 'sig':
                     dZi = dAi_next * self.sigmoid_prime(Ai)
                 elif self.activation == 'tanh':
                     dZi = dAi_next * self.tanh_prime(Ai)
-            dWi = np.matmul(dZi, Ai_next.T) / m
-            dbi = np.sum(dZi, axis=1, keepdims=True) / m
+            dWi, dbi = grads.layer(i)
+            np.matmul(dZi, Ai_next.T, out=dWi)
+            np.sum(dZi, axis=1, keepdims=True, out=dbi)
+
+            Wi, _ = self.weights.layer(i)
+            dAi_next = np.matmul(Wi.T.astype(self.compute_dtype, copy=False),
+                                 dZi)
+        return grads
+
+    def gradient_descent(self, Y, cache, alpha=0.05, dZ=None):
+        """Function that calculates one pass of gradient descent on the neural
+        network.
 
-            dZ_prev = dZi
-            Wi = self.weights["W{}".format(i)]
-            dAi_next = np.matmul(Wi.T, dZi)
+        Args:
+            Y (numpy.ndarray): N-dimensioal array with shape (1, m) that
+                contains the correct labels for the input data.
+            cache (dictionary): Dictionary containing all the intermediary
+                values of the network.
+            alpha (float, optional): The learning rate. Defaults to 0.05.
+            dZ (numpy.ndarray, optional): The gradient of the output layer
+                from softmax_cross_entropy. If None, it is computed from the
+                cached output as A - Y. Defaults to None.
+        """
+        m = Y.shape[1]
+        grads = self.gradients(Y, cache, dZ)
 
-            self.__weights["W{}".format(i)] -= (alpha * dWi)
-            self.__weights["b{}".format(i)] -= (alpha * dbi)
+        # Every layer used the weights from before the update, so all of
+        # them are updated at once through the flat parameter array. The
+        # update is computed in the compute type and rounded to the storage
+        # type on the way out
+        np.multiply(grads.flat, alpha / m, out=grads.flat)
+        np.subtract(self.weights.flat, grads.flat, out=self.weights.flat,
+                    casting='same_kind')
 
     def train(self, X, Y, iterations=5000, alpha=0.05, verbose=True,
-              graph=True, step=100):
+              graph=True, step=100, batch_size=None, shuffle=True, epochs=1,
+              workers=None, seed=0):
         """Function that trains the neural network.
 
         Args:
@@ -187,10 +311,28 @@ class DeepNeuralNetwork():
             graph (boolean, optional): Defines whether or not to graph
                 information about the training once the training has completed.
                 If True, plots the training data every step iterations.
+            batch_size (int, optional): The number of examples in each
+                mini-batch. If None, full batch gradient descent is run for
+                iterations iterations, otherwise mini-batch gradient descent
+                is run for epochs epochs and iterations and step are ignored.
+                X may then also be a numpy.memmap, or a function returning an
+                iterable of (X_batch, Y_batch) pairs for each epoch in which
+                case Y is ignored. Defaults to None.
+            shuffle (boolean, optional): Defines whether or not to shuffle the
+                examples of X and Y before each epoch. Defaults to True.
+            epochs (int, optional): The number of passes over the data in
+                mini-batch mode. Defaults to 1.
+            workers (int, optional): In mini-batch mode, the number of
+                processes each mini-batch is split across with
+                train_data_parallel. X and Y must then be arrays. If None,
+                the network trains in this process. Defaults to None.
+            seed (int, optional): The seed of the shuffling and of the worker
+                processes when workers is set. Defaults to 0.
 
         Returns:
             Evaluation of the training data after iterations of training
-            have occurred.
+            have occurred. In mini-batch mode, the evaluation of the last
+            mini-batch.
         """
         if not isinstance(iterations, int):
             raise TypeError("iterations must be an integer")
@@ -201,14 +343,25 @@ class DeepNeuralNetwork():
         elif alpha <= 0:
             raise ValueError("alpha must be positive")
 
+        if batch_size is not None and workers is not None:
+            return train_data_parallel(self, X, Y, alpha, verbose, graph,
+                                       batch_size, shuffle, epochs, workers,
+                                       seed)
+        if batch_size is not None:
+            return self.train_mini_batch(X, Y, alpha, verbose, graph,
+                                         batch_size, shuffle, epochs)
+
+        X = np.asarray(X, dtype=self.compute_dtype)
+        Y = np.asarray(Y, dtype=self.compute_dtype)
         x = np.arange(0, iterations, step)
         y = []
 
         for i in range(iterations):
-            A, cache = self.forward_prop(X)
-            self.gradient_descent(Y, cache, alpha)
+            Z, cache = self.forward_prop(X, logits=True)
+            loss, dZ = self.softmax_cross_entropy(Y, Z, out=Z)
+            self.gradient_descent(Y, cache, alpha, dZ)
             if (i) % step == 0 or i == 0:
-                cost = self.cost(Y, A)
+                cost = loss
                 y.append(cost)
                 if verbose:
                     print("Cost after {} iterations: {}"
@@ -226,6 +379,100 @@ class DeepNeuralNetwork():
 
         return self.evaluate(X, Y)
 
+    def train_mini_batch(self, X, Y, alpha=0.05, verbose=True, graph=True,
+                         batch_size=32, shuffle=True, epochs=1):
+        """Function that trains the neural network with mini-batch gradient
+        descent, reusing the activation arrays between mini-batches.
+
+        Args:
+            X (numpy.ndarray): N-dimensioal array with shape (nx, m) that
+                contains the input data, or a function returning an iterable
+                of (X_batch, Y_batch) pairs for each epoch.
+            Y (numpy.ndarray): N-dimensioal array with shape (classes, m) that
+                contains the correct labels for the input data.
+            alpha (float, optional): The learning rate. Defaults to 0.05.
+            verbose (boolean, optional): Defines whether or not to print the
+                mean cost and throughput in samples/sec after each epoch.
+            graph (boolean, optional): Defines whether or not to graph the
+                mean cost of each epoch once the training has completed.
+            batch_size (int, optional): The number of examples in each
+                mini-batch. Defaults to 32.
+            shuffle (boolean, optional): Defines whether or not to shuffle the
+                examples before each epoch. Defaults to True.
+            epochs (int, optional): The number of passes over the data.
+                Defaults to 1.
+
+        Returns:
+            Evaluation of the last mini-batch.
+        """
+        if not isinstance(batch_size, int):
+            raise TypeError("batch_size must be an integer")
+        elif batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+        elif not isinstance(epochs, int):
+            raise TypeError("epochs must be an integer")
+        elif epochs <= 0:
+            raise ValueError("epochs must be a positive integer")
+
+        buffers = {}
+        y = []
+
+        for epoch in range(epochs):
+            if callable(X):
+                batches = X()
+            else:
+                batches = self.mini_batches(X, Y, batch_size, shuffle)
+            total_cost = 0
+            samples = 0
+            start = time.perf_counter()
+            for X_batch, Y_batch in batches:
+                Z, cache = self.forward_prop(X_batch, buffers, logits=True)
+                loss, dZ = self.softmax_cross_entropy(Y_batch, Z, out=Z)
+                total_cost += loss * X_batch.shape[1]
+                samples += X_batch.shape[1]
+                self.gradient_descent(Y_batch, cache, alpha, dZ)
+            rate = samples / (time.perf_counter() - start)
+            y.append(total_cost / samples)
+            if verbose:
+                print("Cost after {} epochs: {} ({:.0f} samples/sec)"
+                      .format(epoch + 1, y[-1], rate))
+
+        if graph:
+            plt.plot(np.arange(1, epochs + 1), y, "b-")
+            plt.xlabel('epoch')
+            plt.ylabel('cost')
+            plt.title("Training Cost")
+            plt.show()
+
+        return self.evaluate(X_batch, Y_batch)
+
+    def mini_batches(self, X, Y, batch_size, shuffle=True):
+        """Generator that yields the mini-batches of X and Y.
+
+        Args:
+            X (numpy.ndarray): N-dimensioal array with shape (nx, m) that
+                contains the input data. May be a numpy.memmap.
+            Y (numpy.ndarray): N-dimensioal array with shape (classes, m) that
+                contains the correct labels for the input data.
+            batch_size (int): The number of examples in each mini-batch.
+            shuffle (boolean, optional): Defines whether or not to shuffle the
+                examples. The examples of a mini-batch are read in file order
+                so memory-mapped data is read sequentially. Defaults to True.
+
+        Yields:
+            (X_batch, Y_batch) pairs loaded into memory.
+        """
+        m = X.shape[1]
+        if shuffle:
+            order = np.random.permutation(m)
+        for start in range(0, m, batch_size):
+            if shuffle:
+                batch = np.sort(order[start:start + batch_size])
+                yield np.asarray(X[:, batch]), np.asarray(Y[:, batch])
+            else:
+                yield (np.asarray(X[:, start:start + batch_size]),
+                       np.asarray(Y[:, start:start + batch_size]))
+
     def save(self, filename):
         """Function that saves the instance object to a file in pickle format.
         If filename does not have the extension .pkl, it will be added.
@@ -254,21 +501,69 @@ class DeepNeuralNetwork():
         try:
             with open(filename, "rb") as file:
                 contents = pickle.load(file)
-                return contents
+            if isinstance(contents.weights, dict):
+                contents._DeepNeuralNetwork__weights = (
+                    ParameterBuffer.from_dict(contents.weights))
+            if not hasattr(contents, "_DeepNeuralNetwork__dtype"):
+                dtype = contents.weights.flat.dtype
+                contents._DeepNeuralNetwork__dtype = dtype
+                contents._DeepNeuralNetwork__compute_dtype = (
+                    np.promote_types(dtype, np.float32))
+            return contents
         except Exception:
             return None
 
-    def sigmoid(self, Z):
+    def save_weights(self, filename):
+        """Function that saves the weights and biases as one flat array in
+        .npy format, so they can be memory-mapped by load_weights. If
+        filename does not have the extension .npy, it will be added.
+
+        Args:
+            filename (str): The file to which the weights will be saved.
+
+        Returns:
+            The name of the saved file.
+        """
+        ext = ".npy"
+        if not filename.endswith(ext):
+            filename += ext
+        np.save(filename, self.weights.flat)
+        return filename
+
+    def load_weights(self, filename, mmap_mode='r'):
+        """Function that replaces the weights and biases with the ones saved
+        by save_weights. By default the file is memory-mapped read-only, so
+        processes serving the same model share one copy of it.
+
+        Args:
+            filename (str): The file from which the weights are loaded.
+            mmap_mode (str, optional): The numpy.load memory-map mode, or None
+                to read the weights into memory. Defaults to 'r'.
+        """
+        flat = np.load(filename, mmap_mode=mmap_mode)
+        if flat.dtype != self.dtype:
+            raise ValueError("weights must be of type {}".format(self.dtype))
+        self.__weights = ParameterBuffer(self.weights.nx, self.weights.layers,
+                                         self.dtype, flat)
+
+    def sigmoid(self, Z, out=None):
         """Does the math for the Sigmoid activation function.
 
         Args:
             Z (numpy.ndarray): N-demensional array of the dZ values of each
         node in a neural network.
+            out (numpy.ndarray, optional): Array the result is written into.
+        May be Z itself. Defaults to None.
 
         Returns:
             Activation values of the layer of nodes.
         """
-        return 1/(1 + np.exp(-Z))
+        if out is None:
+            return 1/(1 + np.exp(-Z))
+        np.negative(Z, out=out)
+        np.exp(out, out=out)
+        out += 1
+        return np.reciprocal(out, out=out)
 
     def sigmoid_prime(self, A):
         """Does the math for the Sigmoid` activation function.
@@ -282,31 +577,37 @@ class DeepNeuralNetwork():
         """
         return (A * (1 - A))
 
-    def softmax(self, Z):
+    def softmax(self, Z, out=None):
         """Does the math for the Softmax activation function.
 
         Args:
             Z (numpy.ndarray): N-demensional array of the dZ values of each
         node in a neural network.
+            out (numpy.ndarray, optional): Array the result is written into.
+        May be Z itself. Defaults to None.
 
         Returns:
             Activation values of the layer of nodes.
         """
-        T = np.exp(Z)
-        return T / np.sum(T, axis=0, keepdims=True)
+        T = np.subtract(Z, np.max(Z, axis=0, keepdims=True), out=out)
+        np.exp(T, out=T)
+        T /= np.sum(T, axis=0, keepdims=True)
+        return T
 
-    def tanh(self, Z):
+    def tanh(self, Z, out=None):
         """Does the math for the Tanh activation function.
 
         Args:
             Z (numpy.ndarray): N-demensional array of the dZ values of each
         node in a neural network.
+            out (numpy.ndarray, optional): Array the result is written into.
+        May be Z itself. Defaults to None.
 
         Returns:
             Activation values of the layer of nodes.
         """
         # (np.exp(Z) - np.exp(-Z)) / (np.exp(Z) + np.exp(-Z))
-        return np.tanh(Z)
+        return np.tanh(Z, out=out)
 
     def tanh_prime(self, A):
         """Does the math for the Tanh` activation function.
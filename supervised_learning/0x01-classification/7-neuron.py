@@ -9,18 +9,26 @@ import matplotlib.pyplot as plt
 class Neuron():
     """Class which defines a single neuron performing binary classification
     """
-    def __init__(self, nx):
+    def __init__(self, nx, dtype=np.float32):
         """Initizilation function for Neuron
 
         Args:
             nx (int): The number of input features to the neuron
+            dtype (numpy.dtype, optional): The floating point type the weights
+                are stored in. Computations run in this type, except for
+                float16 weights which are computed in float32. Defaults to
+                np.float32.
         """
         if not isinstance(nx, int):
             raise TypeError("nx must be an integer")
         elif nx < 1:
             raise ValueError("nx must be a positive integer")
+        elif not np.issubdtype(dtype, np.floating):
+            raise TypeError("dtype must be a floating point type")
         else:
-            self.__W = np.random.randn(1, nx)
+            self.__dtype = np.dtype(dtype)
+            self.__compute_dtype = np.promote_types(dtype, np.float32)
+            self.__W = np.random.randn(1, nx).astype(dtype)
             self.__b = 0
             self.__A = 0
 
@@ -51,6 +59,15 @@ class Neuron():
         """
         return self.__A
 
+    @property
+    def dtype(self):
+        """Getter for private instance atribute dtype
+
+        Returns:
+            [numpy.dtype]: The type the weights are stored in.
+        """
+        return self.__dtype
+
     def forward_prop(self, X):
         """Function that calculates the forward propagation of the neuron.
         Uses Logistic Regresssion.
@@ -63,7 +80,9 @@ class Neuron():
         Returns:
             [float]: The activated output of the neuron (self.__A).
         """
-        z = np.dot(self.W, X) + self.b
+        X = np.asarray(X, dtype=self.__compute_dtype)
+        W = self.W.astype(self.__compute_dtype, copy=False)
+        z = np.dot(W, X) + self.b
         self.__A = 1/(1 + np.exp(-z))  # Sigmoid
         return self.__A
 
@@ -120,13 +139,14 @@ class Neuron():
         """
         shape = X.shape
         m = shape[1]
-        dZ = A - Y
+        X = np.asarray(X, dtype=self.__compute_dtype)
+        dZ = A - np.asarray(Y, dtype=self.__compute_dtype)
         dW = (np.matmul(X, dZ.T) / m).T
         db = np.sum(dZ) / m
         W = self.W - (alpha * dW)
         b = self.b - (alpha * db)
-        self.__W = W
-        self.__b = b
+        self.__W = W.astype(self.__dtype)
+        self.__b = self.__dtype.type(b)
 
     def train(self, X, Y, iterations=5000, alpha=0.05, verbose=True,
               graph=True, step=100):
@@ -169,6 +189,8 @@ class Neuron():
             elif step < 1 or step > iterations:
                 raise ValueError("step must be positive and <= iterations")
 
+        X = np.asarray(X, dtype=self.__compute_dtype)
+        Y = np.asarray(Y, dtype=self.__compute_dtype)
         x = np.arange(0, iterations, step)
         y = []
 
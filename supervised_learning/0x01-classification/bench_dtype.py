@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Module that compares the weights size, peak training memory and time per
+iteration of a DeepNeuralNetwork stored in float64, float32 and float16."""
+
+import time
+import tracemalloc
+import numpy as np
+Deep = __import__('28-deep_neural_network').DeepNeuralNetwork
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    m = 10000
+    X = np.random.rand(784, m)
+    Y = np.eye(10)[np.random.randint(0, 10, m)].T
+
+    print("{:>8} {:>12} {:>14} {:>14}".format(
+        'dtype', 'weights MB', 'peak train MB', 'ms/iteration'))
+    for dtype in (np.float64, np.float32, np.float16):
+        np.random.seed(0)
+        deep = Deep(784, [256, 128, 10], 'tanh', dtype=dtype)
+        deep.train(X, Y, iterations=2, verbose=False, graph=False)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        deep.train(X, Y, iterations=10, verbose=False, graph=False)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print("{:>8} {:>12.2f} {:>14.1f} {:>14.1f}".format(
+            np.dtype(dtype).name, deep.weights.flat.nbytes / 2 ** 20,
+            peak / 2 ** 20, elapsed * 100))
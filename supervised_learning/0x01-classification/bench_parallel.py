@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Module that measures the samples per second of the data-parallel training
+of a DeepNeuralNetwork with 1, 2, 4, ... worker processes.
+
+Usage: OMP_NUM_THREADS=1 ./bench_parallel.py [max_workers]
+
+Threaded BLAS would start one thread per core in every worker, so limit it
+to one thread with OMP_NUM_THREADS, or OPENBLAS_NUM_THREADS or
+MKL_NUM_THREADS for those builds, or the speedup measures their contention.
+"""
+
+import os
+import sys
+import time
+import numpy as np
+Deep = __import__('28-deep_neural_network').DeepNeuralNetwork
+
+if __name__ == '__main__':
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    np.random.seed(0)
+    m = 20000
+    X = np.random.rand(784, m)
+    Y = np.eye(10)[np.random.randint(0, 10, m)].T
+
+    print("{:>8} {:>14} {:>8}".format('workers', 'samples/sec', 'speedup'))
+    base = None
+    workers = 1
+    while workers <= max_workers:
+        np.random.seed(0)
+        deep = Deep(784, [256, 128, 10], 'tanh')
+        start = time.perf_counter()
+        deep.train(X, Y, verbose=False, graph=False, batch_size=1024,
+                   epochs=1, workers=workers, seed=0)
+        rate = m / (time.perf_counter() - start)
+        base = rate if base is None else base
+        print("{:>8} {:>14.0f} {:>8.2f}".format(workers, rate, rate / base))
+        workers *= 2
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Module that contains the function train_data_parallel and the functions
+run by its worker processes."""
+
+import numpy as np
+import matplotlib.pyplot as plt
+import time
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+worker_state = {}
+
+
+def share_array(array, dtype):
+    """Function that copies an array into a new block of shared memory.
+
+    Args:
+        array (numpy.ndarray): The array to copy.
+        dtype (numpy.dtype): The type of the shared copy.
+
+    Returns:
+        The SharedMemory block, the shared copy of the array and a
+        description of it that attach_array uses to open it in another
+        process.
+    """
+    dtype = np.dtype(dtype)
+    shm = SharedMemory(create=True, size=max(array.size * dtype.itemsize, 1))
+    shared = np.ndarray(array.shape, dtype=dtype, buffer=shm.buf)
+    np.copyto(shared, array, casting='same_kind')
+    return shm, shared, ("shm", shm.name, array.shape, dtype.str)
+
+
+def attach_array(spec):
+    """Function that opens an array described by share_array, or a
+    memory-mapped file described by its filename, in this process.
+
+    Args:
+        spec (tuple): The description of the array.
+
+    Returns:
+        The object that owns the memory, which must be kept alive while the
+        array is used, and the array.
+    """
+    if spec[0] == "memmap":
+        _, filename, shape, dtype, offset, order = spec
+        array = np.memmap(filename, dtype=dtype, mode='r', shape=shape,
+                          offset=offset, order=order)
+        return None, array
+    _, name, shape, dtype = spec
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def worker_init(network, specs, seed):
+    """Function that attaches a worker process to the shared parameters,
+    gradients and data.
+
+    Args:
+        network (DeepNeuralNetwork): A copy of the network being trained.
+        specs (dict): The descriptions of the shared arrays, keyed "params",
+            "grads", "X" and "Y".
+        seed (int): The seed of the worker's random number generator.
+    """
+    np.random.seed(seed)
+    worker_state["network"] = network
+    worker_state["buffers"] = {}
+    worker_state["owners"] = []
+    for key, spec in specs.items():
+        owner, array = attach_array(spec)
+        worker_state["owners"].append(owner)
+        worker_state[key] = array
+
+
+def worker_gradients(task):
+    """Function that computes the gradients of one shard of a mini-batch and
+    writes their sum over the shard into the worker's row of the shared
+    gradients.
+
+    Args:
+        task (tuple): The row of the shard and the indices of its examples.
+
+    Returns:
+        The cost summed over the examples of the shard.
+    """
+    shard, index = task
+    network = worker_state["network"]
+    grads = worker_state["grads"][shard]
+    if index.size == 0:
+        grads[...] = 0
+        return 0
+    np.copyto(network.weights.flat, worker_state["params"])
+    X = np.asarray(worker_state["X"][:, index])
+    Y = np.asarray(worker_state["Y"][:, index])
+    Z, cache = network.forward_prop(X, worker_state["buffers"], logits=True)
+    loss, dZ = network.softmax_cross_entropy(Y, Z, out=Z)
+    np.copyto(grads, network.gradients(Y, cache, dZ).flat)
+    return loss * index.size
+
+
+def train_data_parallel(network, X, Y, alpha=0.05, verbose=True, graph=True,
+                        batch_size=32, shuffle=True, epochs=1, workers=2,
+                        seed=0):
+    """Function that trains a DeepNeuralNetwork with mini-batch gradient
+    descent, splitting each mini-batch into one shard per worker process.
+
+    The weights live in one block of shared memory that every worker reads.
+    Each worker writes the gradients of its shard into its own row of a
+    shared gradient block, and the rows are summed (all-reduced) in a fixed
+    order before the weights are updated, so a run only depends on seed.
+
+    Args:
+        network (DeepNeuralNetwork): The network to train.
+        X (numpy.ndarray): N-dimensioal array with shape (nx, m) that
+            contains the input data. A numpy.memmap is opened by the workers
+            from its file instead of being copied into shared memory.
+        Y (numpy.ndarray): N-dimensioal array with shape (classes, m) that
+            contains the correct labels for the input data.
+        alpha (float, optional): The learning rate. Defaults to 0.05.
+        verbose (boolean, optional): Defines whether or not to print the
+            mean cost and throughput in samples/sec after each epoch.
+        graph (boolean, optional): Defines whether or not to graph the mean
+            cost of each epoch once the training has completed.
+        batch_size (int, optional): The number of examples in each
+            mini-batch. Defaults to 32.
+        shuffle (boolean, optional): Defines whether or not to shuffle the
+            examples before each epoch. Defaults to True.
+        epochs (int, optional): The number of passes over the data.
+            Defaults to 1.
+        workers (int, optional): The number of worker processes. Defaults
+            to 2.
+        seed (int, optional): The seed used to shuffle the data and to seed
+            the workers. Defaults to 0.
+
+    Returns:
+        Evaluation of the last mini-batch.
+    """
+    if not isinstance(batch_size, int):
+        raise TypeError("batch_size must be an integer")
+    elif batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer")
+    elif not isinstance(epochs, int):
+        raise TypeError("epochs must be an integer")
+    elif epochs <= 0:
+        raise ValueError("epochs must be a positive integer")
+    elif not isinstance(workers, int):
+        raise TypeError("workers must be an integer")
+    elif workers <= 0:
+        raise ValueError("workers must be a positive integer")
+
+    m = X.shape[1]
+    compute_dtype = network.compute_dtype
+    flat = network.weights.flat
+    owners = []
+    try:
+        shm, params, params_spec = share_array(flat, flat.dtype)
+        owners.append(shm)
+        shm, grads, grads_spec = share_array(
+            np.zeros((workers, flat.size)), compute_dtype)
+        owners.append(shm)
+        if isinstance(X, np.memmap) and X.filename is not None:
+            layout = 'F' if X.flags.f_contiguous and not X.flags.c_contiguous \
+                else 'C'
+            X_spec = ("memmap", X.filename, X.shape, X.dtype.str, X.offset,
+                      layout)
+        else:
+            shm, _, X_spec = share_array(np.asarray(X), compute_dtype)
+            owners.append(shm)
+        shm, _, Y_spec = share_array(np.asarray(Y), compute_dtype)
+        owners.append(shm)
+        specs = {"params": params_spec, "grads": grads_spec, "X": X_spec,
+                 "Y": Y_spec}
+        total = np.empty(flat.size, dtype=compute_dtype)
+        rng = np.random.RandomState(seed)
+        y = []
+
+        with Pool(workers, worker_init, (network, specs, seed)) as pool:
+            for epoch in range(epochs):
+                order = rng.permutation(m) if shuffle else np.arange(m)
+                total_cost = 0
+                start = time.perf_counter()
+                for first in range(0, m, batch_size):
+                    batch = np.sort(order[first:first + batch_size])
+                    shards = np.array_split(batch, workers)
+                    losses = pool.map(worker_gradients, enumerate(shards),
+                                      chunksize=1)
+                    total_cost += sum(losses)
+                    np.sum(grads, axis=0, out=total)
+                    total *= alpha / batch.size
+                    np.subtract(params, total, out=params,
+                                casting='same_kind')
+                rate = m / (time.perf_counter() - start)
+                y.append(total_cost / m)
+                if verbose:
+                    print("Cost after {} epochs: {} ({:.0f} samples/sec)"
+                          .format(epoch + 1, y[-1], rate))
+        np.copyto(flat, params)
+    finally:
+        params = grads = _ = None
+        for shm in owners:
+            shm.close()
+            shm.unlink()
+
+    if graph:
+        plt.plot(np.arange(1, epochs + 1), y, "b-")
+        plt.xlabel('epoch')
+        plt.ylabel('cost')
+        plt.title("Training Cost")
+        plt.show()
+
+    return network.evaluate(np.asarray(X[:, batch]), np.asarray(Y[:, batch]))
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Module that contains the class MicroBatcher and a prediction-only server
+for a pickled DeepNeuralNetwork.
+
+Requests are read one per line, either from stdin or from clients of a local
+socket. A request holds one or more rows separated by ';', each row holding
+the nx features separated by ','. The response to a request is the predicted
+class of each of its rows, separated by ','.
+
+Usage: ./inference_server.py model.pkl [--port PORT | --unix PATH]
+"""
+
+import argparse
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+Deep = __import__('28-deep_neural_network').DeepNeuralNetwork
+
+
+class MicroBatcher():
+    """Class that groups the requests of concurrent clients into batches and
+    runs a single forward propagation for each batch."""
+
+    def __init__(self, network, max_batch=256, budget_ms=5):
+        """Class constructor
+
+        Args:
+            network (DeepNeuralNetwork): The network used for the predictions.
+            max_batch (int, optional): The number of rows that make a batch
+                full. Defaults to 256.
+            budget_ms (float, optional): The time in milliseconds a request
+                may wait for more requests to join its batch. Defaults to 5.
+        """
+        if not isinstance(max_batch, int):
+            raise TypeError("max_batch must be an integer")
+        elif max_batch < 1:
+            raise ValueError("max_batch must be a positive integer")
+        elif budget_ms < 0:
+            raise ValueError("budget_ms must be positive")
+        self.__network = network
+        self.__max_batch = max_batch
+        self.__budget = budget_ms / 1000
+        self.__queue = queue.Queue()
+        self.__latencies = []
+        self.__rows = 0
+        self.__busy = 0
+        self.__thread = threading.Thread(target=self.run, daemon=True)
+        self.__thread.start()
+
+    def submit(self, X):
+        """Function that queues the rows of a request.
+
+        Args:
+            X (numpy.ndarray): Array with shape (rows, nx) that contains the
+                input data of the request.
+
+        Returns:
+            A Future resolved with the predicted classes of the rows.
+        """
+        future = Future()
+        self.__queue.put((time.perf_counter(), X, future))
+        return future
+
+    def run(self):
+        """Function that collects requests until the batch is full or the
+        oldest request has waited for the latency budget, then predicts the
+        whole batch at once. It runs until close is called."""
+        pending = self.__queue.get()
+        while pending is not None:
+            batch = [pending]
+            rows = pending[1].shape[0]
+            deadline = pending[0] + self.__budget
+            pending = False
+            while rows < self.__max_batch:
+                try:
+                    request = self.__queue.get(
+                        timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if request is None or \
+                        rows + request[1].shape[0] > self.__max_batch:
+                    pending = request
+                    break
+                batch.append(request)
+                rows += request[1].shape[0]
+            self.predict(batch, rows)
+            if pending is False:
+                pending = self.__queue.get()
+
+    def predict(self, batch, rows):
+        """Function that runs the forward propagation of a batch and resolves
+        the futures of its requests.
+
+        Args:
+            batch (list): The (arrival time, rows, future) of each request.
+            rows (int): The total number of rows of the batch.
+        """
+        start = time.perf_counter()
+        try:
+            X = np.concatenate([X for _, X, _ in batch])
+            classes = np.argmax(self.__network.predict(X.T), axis=0)
+        except Exception as error:
+            for _, _, future in batch:
+                future.set_exception(error)
+            return
+        done = time.perf_counter()
+        self.__busy += done - start
+        self.__rows += rows
+        first = 0
+        for arrival, X, future in batch:
+            self.__latencies.append(done - arrival)
+            future.set_result(classes[first:first + X.shape[0]])
+            first += X.shape[0]
+
+    def close(self):
+        """Function that predicts the queued requests and stops the batching
+        thread."""
+        self.__queue.put(None)
+        self.__thread.join()
+
+    def report(self):
+        """Function that returns the statistics of the served requests.
+
+        Returns:
+            A dictionary with the number of requests and rows, the p50 and
+            p99 latencies in milliseconds, and the rows predicted per second
+            of forward propagation.
+        """
+        latencies = np.array(self.__latencies) * 1000
+        if latencies.size == 0:
+            latencies = np.zeros(1)
+        return {"requests": len(self.__latencies), "rows": self.__rows,
+                "p50_ms": np.percentile(latencies, 50),
+                "p99_ms": np.percentile(latencies, 99),
+                "rows_per_sec": self.__rows / self.__busy if self.__busy
+                else 0.0}
+
+
+def parse_request(line, nx):
+    """Function that parses a request line into an array of rows.
+
+    Args:
+        line (str): The rows separated by ';', with the features of each row
+            separated by ','.
+        nx (int): The number of input features.
+
+    Returns:
+        The array with shape (rows, nx).
+    """
+    X = np.array([row.split(',') for row in line.strip().split(';')],
+                 dtype=float)
+    if X.ndim != 2 or X.shape[1] != nx:
+        raise ValueError("each row must have {} features".format(nx))
+    return X
+
+
+def format_response(future):
+    """Function that waits for a request and formats its response line.
+
+    Args:
+        future (Future): The future returned by MicroBatcher.submit.
+
+    Returns:
+        The predicted classes separated by ',', or the error message.
+    """
+    try:
+        return ','.join(str(c) for c in future.result())
+    except Exception as error:
+        return "error: {}".format(error)
+
+
+def load_network(filename):
+    """Function that loads a pickled DeepNeuralNetwork for prediction only.
+
+    The weights are written next to the pickle, as filename with its
+    extension replaced by .weights.npy, the first time or whenever the pickle
+    is newer, then memory-mapped read-only, so that every server process
+    shares them. The activations cached by training are dropped.
+
+    Args:
+        filename (str): The pickled DeepNeuralNetwork.
+
+    Returns:
+        The DeepNeuralNetwork, or None if it could not be loaded.
+    """
+    network = Deep.load(filename)
+    if network is None:
+        return None
+    network.cache.clear()
+    weights = os.path.splitext(filename)[0] + ".weights.npy"
+    if not os.path.exists(weights) or \
+            os.path.getmtime(weights) < os.path.getmtime(filename):
+        network.save_weights(weights)
+    network.load_weights(weights)
+    return network
+
+
+def serve_stdin(batcher, nx):
+    """Function that answers the requests read from stdin on stdout, in the
+    order they were read. Requests are submitted as soon as they are read so
+    consecutive lines share batches.
+
+    Args:
+        batcher (MicroBatcher): The batcher used for the predictions.
+        nx (int): The number of input features.
+    """
+    responses = queue.Queue()
+
+    def printer():
+        """Function that prints the responses in order."""
+        while True:
+            future = responses.get()
+            if future is None:
+                return
+            print(format_response(future), flush=True)
+
+    thread = threading.Thread(target=printer)
+    thread.start()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            responses.put(batcher.submit(parse_request(line, nx)))
+        except ValueError as error:
+            future = Future()
+            future.set_exception(error)
+            responses.put(future)
+    responses.put(None)
+    thread.join()
+
+
+def serve_socket(batcher, nx, port=None, unix=None):
+    """Function that answers the requests of the clients of a local socket,
+    one thread per client.
+
+    Args:
+        batcher (MicroBatcher): The batcher used for the predictions.
+        nx (int): The number of input features.
+        port (int, optional): The TCP port to listen to on localhost.
+        unix (str, optional): The path of the unix socket to listen to.
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        """Class that answers the requests of one client."""
+
+        def handle(self):
+            """Function that answers each line sent by the client."""
+            for line in self.rfile:
+                line = line.decode()
+                if not line.strip():
+                    continue
+                try:
+                    future = batcher.submit(parse_request(line, nx))
+                except ValueError as error:
+                    future = Future()
+                    future.set_exception(error)
+                self.wfile.write((format_response(future) + '\n').encode())
+
+    if unix is not None:
+        if os.path.exists(unix):
+            os.remove(unix)
+        server = socketserver.ThreadingUnixStreamServer(unix, Handler)
+    else:
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', port),
+                                                 Handler)
+    server.daemon_threads = True
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    if unix is not None:
+        os.remove(unix)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve the predictions of "
+                                     "a pickled DeepNeuralNetwork.")
+    parser.add_argument('model', help="the pickled DeepNeuralNetwork")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--port', type=int, help="TCP port on localhost")
+    group.add_argument('--unix', help="path of a unix socket")
+    parser.add_argument('--max-batch', type=int, default=256,
+                        help="rows per forward propagation")
+    parser.add_argument('--budget-ms', type=float, default=5,
+                        help="time a request may wait for a batch")
+    args = parser.parse_args()
+
+    network = load_network(args.model)
+    if network is None:
+        sys.exit("Could not load {}".format(args.model))
+    nx = network.weights.nx
+    batcher = MicroBatcher(network, args.max_batch, args.budget_ms)
+    if args.port is None and args.unix is None:
+        serve_stdin(batcher, nx)
+    else:
+        serve_socket(batcher, nx, args.port, args.unix)
+    batcher.close()
+    stats = batcher.report()
+    print("{} requests, {} rows, p50 {:.2f} ms, p99 {:.2f} ms, {:.0f} rows/sec"
+          .format(stats["requests"], stats["rows"], stats["p50_ms"],
+                  stats["p99_ms"], stats["rows_per_sec"]), file=sys.stderr)
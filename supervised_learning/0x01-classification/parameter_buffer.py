@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Module containing the class ParameterBuffer which stores the weights and
+biases of a neural network in one contiguous array."""
+
+import numpy as np
+
+
+class ParameterBuffer():
+    """Class that stores the weights and biases of every layer of a neural
+    network in one flat array and exposes a view of it for each of them.
+
+    The views can be read and updated like the dictionary of weights the
+    networks used before, under the keys "W{l}" and "b{l}", while the whole
+    set of parameters can be updated, copied or saved through flat."""
+
+    def __init__(self, nx, layers, dtype=float, flat=None):
+        """Class constructor
+
+        Args:
+            nx (int): The number of input features
+            layers (list[int]): List representing the number of nodes in each
+                layer of the network
+            dtype (numpy.dtype, optional): The type of the parameters.
+                Defaults to float.
+            flat (numpy.ndarray, optional): A 1-dimensional array to use as
+                the storage instead of allocating a new one, for example an
+                array backed by shared memory. Defaults to None.
+        """
+        shapes = []
+        prev = nx
+        for L in layers:
+            shapes.append(((L, prev), (L, 1)))
+            prev = L
+        size = sum((L * prev) + L for (L, prev), _ in shapes)
+        if flat is None:
+            flat = np.zeros(size, dtype=dtype)
+        elif flat.shape != (size,):
+            raise ValueError("flat must have shape ({},)".format(size))
+
+        self.__nx = nx
+        self.__layers = list(layers)
+        self.__flat = flat
+        self.__views = []
+        start = 0
+        for W_shape, b_shape in shapes:
+            W_end = start + (W_shape[0] * W_shape[1])
+            b_end = W_end + b_shape[0]
+            self.__views.append((flat[start:W_end].reshape(W_shape),
+                                 flat[W_end:b_end].reshape(b_shape)))
+            start = b_end
+
+    @classmethod
+    def from_dict(cls, weights, dtype=float):
+        """Function that builds a ParameterBuffer from a dictionary of
+        weights and biases keyed "W{l}" and "b{l}".
+
+        Args:
+            weights (dict): The weights and biases of the network.
+            dtype (numpy.dtype, optional): The type of the parameters.
+                Defaults to float.
+
+        Returns:
+            The new ParameterBuffer holding a copy of the weights.
+        """
+        L = len(weights) // 2
+        layers = [weights["W{}".format(i)].shape[0] for i in range(1, L + 1)]
+        params = cls(weights["W1"].shape[1], layers, dtype)
+        for i in range(1, L + 1):
+            W, b = params.layer(i)
+            W[...] = weights["W{}".format(i)]
+            b[...] = weights["b{}".format(i)]
+        return params
+
+    @property
+    def flat(self):
+        """Getter for self.__flat"""
+        return self.__flat
+
+    @property
+    def nx(self):
+        """Getter for self.__nx"""
+        return self.__nx
+
+    @property
+    def layers(self):
+        """Getter for self.__layers"""
+        return list(self.__layers)
+
+    @property
+    def L(self):
+        """Getter for the number of layers"""
+        return len(self.__layers)
+
+    def layer(self, i):
+        """Function that returns the views of the weights and biases of a
+        layer.
+
+        Args:
+            i (int): The layer, starting at 1.
+
+        Returns:
+            The weights (W) and biases (b) views of the layer.
+        """
+        return self.__views[i - 1]
+
+    def zeros_like(self, dtype=None):
+        """Function that creates a ParameterBuffer with the same layout and
+        all values set to 0, for example to hold the gradients.
+
+        Args:
+            dtype (numpy.dtype, optional): The type of the new parameters.
+                Defaults to the type of this buffer.
+
+        Returns:
+            The new ParameterBuffer.
+        """
+        if dtype is None:
+            dtype = self.__flat.dtype
+        return ParameterBuffer(self.__nx, self.__layers, dtype)
+
+    def copy(self):
+        """Function that creates a ParameterBuffer holding a copy of the
+        values.
+
+        Returns:
+            The new ParameterBuffer.
+        """
+        return ParameterBuffer(self.__nx, self.__layers, self.__flat.dtype,
+                               self.__flat.copy())
+
+    def astype(self, dtype):
+        """Function that creates a ParameterBuffer holding the values cast
+        to another type.
+
+        Args:
+            dtype (numpy.dtype): The type of the new parameters.
+
+        Returns:
+            The new ParameterBuffer.
+        """
+        return ParameterBuffer(self.__nx, self.__layers, dtype,
+                               self.__flat.astype(dtype))
+
+    def keys(self):
+        """Function that returns the keys of the weights and biases in
+        layer order."""
+        keys = []
+        for i in range(1, self.L + 1):
+            keys += ["W{}".format(i), "b{}".format(i)]
+        return keys
+
+    def items(self):
+        """Function that returns the (key, view) pairs in layer order."""
+        return [(key, self[key]) for key in self.keys()]
+
+    def __getitem__(self, key):
+        """Function that returns the view for a key such as "W1" or "b1"."""
+        if key[0] not in ("W", "b") or not key[1:].isdigit():
+            raise KeyError(key)
+        i = int(key[1:])
+        if i < 1 or i > self.L:
+            raise KeyError(key)
+        return self.__views[i - 1][0 if key[0] == "W" else 1]
+
+    def __setitem__(self, key, value):
+        """Function that copies value into the view for a key."""
+        self[key][...] = value
+
+    def __contains__(self, key):
+        """Function that checks if a key names a view."""
+        return key in self.keys()
+
+    def __iter__(self):
+        """Function that iterates over the keys in layer order."""
+        return iter(self.keys())
+
+    def __len__(self):
+        """Function that returns the number of views."""
+        return 2 * self.L
+
+    def __repr__(self):
+        """Function that represents the buffer as a dictionary."""
+        return repr(dict(self.items()))
+
+    def __getstate__(self):
+        """Function that returns the layout and flat array to pickle, since
+        the views would otherwise be pickled as separate copies."""
+        return {"nx": self.__nx, "layers": self.__layers, "flat": self.__flat}
+
+    def __setstate__(self, state):
+        """Function that rebuilds the views over the unpickled flat array."""
+        self.__init__(state["nx"], state["layers"], state["flat"].dtype,
+                      state["flat"])
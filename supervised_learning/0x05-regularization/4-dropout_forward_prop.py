@@ -32,8 +32,10 @@ def dropout_forward_prop(X, weights, L, keep_prob):
         b = weights["b{}".format(layer)]
         Z = np.matmul(W, A) + b
         if layer == L:
-            T = np.exp(Z)
-            A = (T / np.sum(T, axis=0, keepdims=True))  # Softmax
+            # Softmax, shifted by the column max so exp cannot overflow
+            Z -= np.max(Z, axis=0, keepdims=True)
+            A = np.exp(Z, out=Z)
+            A /= np.sum(A, axis=0, keepdims=True)
             cache["A{}".format(layer)] = A
         else:
             A = np.tanh(Z)
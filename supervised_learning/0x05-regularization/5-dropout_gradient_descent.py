@@ -14,7 +14,8 @@ def dropout_gradient_descent(Y, weights, cache, alpha, keep_prob, L):
             contains the correct labels for the data, where classes is the
             number of classes and m is the number of data points.
         weights (dict): A dictionary of the weights and biases of the neural
-            network.
+            network, or a ParameterBuffer in which case every layer is
+            updated at once through its flat array.
         cache (dict): A dictionary of the outputs and dropout masks of each
             layer of the neural.
         alpha (float): The learning rate.
@@ -22,6 +23,7 @@ def dropout_gradient_descent(Y, weights, cache, alpha, keep_prob, L):
         L (int): The number of layers of the network.
     """
     m = Y.shape[1]
+    grads = weights.zeros_like() if hasattr(weights, "flat") else None
     for i in range(L, 0, -1):
         Ai = cache["A{}".format(i)]
         Ai_next = cache["A{}".format(i - 1)]
@@ -35,5 +37,13 @@ def dropout_gradient_descent(Y, weights, cache, alpha, keep_prob, L):
         dWi = np.matmul(dZi, Ai_next.T) / m
         dbi = (np.sum(dZi, axis=1, keepdims=True) / m)
         dAi_next = np.matmul(Wi.T, dZi)
-        weights["W{}".format(i)] -= (alpha * dWi)
-        weights["b{}".format(i)] -= (alpha * dbi)
+        if grads is None:
+            weights["W{}".format(i)] -= (alpha * dWi)
+            weights["b{}".format(i)] -= (alpha * dbi)
+        else:
+            grads_W, grads_b = grads.layer(i)
+            grads_W[...] = dWi
+            grads_b[...] = dbi
+    if grads is not None:
+        np.multiply(grads.flat, alpha, out=grads.flat)
+        np.subtract(weights.flat, grads.flat, out=weights.flat)
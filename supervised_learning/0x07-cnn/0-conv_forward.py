@@ -5,7 +5,8 @@
 import numpy as np
 
 
-def conv_forward(A_prev, W, b, activation, padding="same", stride=(1, 1)):
+def conv_forward(A_prev, W, b, activation, padding="same", stride=(1, 1),
+                 cache=None, out=None, workspace=None):
     """Function that performs forward propagation over a convolutional layer of
     a neural network.
 
@@ -23,12 +24,23 @@ def conv_forward(A_prev, W, b, activation, padding="same", stride=(1, 1)):
         b (numpy.ndarray): A tensor with the shape (1, 1, 1, c_new) containing
             the biases applied to the convolution.
         activation (function): An activation function applied to the
-            convolution.
+            convolution. NumPy ufuncs such as np.tanh are applied in place.
         padding (str, optional): A string that is either same or valid,
             indicating the type of padding used. Defaults to "same".
         stride (tuple, optional): A tuple of (sh, sw) containing the strides
             for the convolution where sh is the stride for the height and sw
             is the stride for the width. Defaults to (1, 1).
+        cache (dict, optional): If given, the im2col matrix of the padded
+            input is stored in it under 'A_cols' so conv_backward can reuse
+            it instead of rebuilding it. When a workspace is also given, the
+            cache holds a copy, since the next call with the same workspace
+            overwrites its buffer. Defaults to None.
+        out (numpy.ndarray, optional): A C-contiguous array with the shape of
+            the output that the result is written into. Defaults to None.
+        workspace (dict, optional): A dict holding the padded input under
+            'A_pad' and the im2col matrix under 'A_cols'. Buffers of the right
+            shape and type are reused, otherwise they are allocated and stored
+            in it for the next call. Defaults to None.
 
     Returns:
         The output of the convolutional layer.
@@ -45,22 +57,48 @@ def conv_forward(A_prev, W, b, activation, padding="same", stride=(1, 1)):
     else:
         pad_h, pad_w = padding
 
-    A_pad = np.pad(A_prev, ((0, 0), (pad_h, pad_h), (pad_w, pad_w), (0, 0)),
-                   'constant', constant_values=0)
     conv_h = ((h_prev + (2 * pad_h) - kh) // sh) + 1
     conv_w = ((w_prev + (2 * pad_w) - kw) // sw) + 1
-    convol = np.zeros((m, conv_h, conv_w, nc))
+    shared = workspace is not None
+    if not shared:
+        workspace = {}
+    dtype = np.result_type(A_prev.dtype, W.dtype)
 
-    for z in (range(nc)):
-        i = 0
-        for x in range(0, (h_prev + (2 * pad_h) - kh + 1), sh):
-            j = 0
-            for y in range(0, (w_prev + (2 * pad_w) - kw + 1), sw):
-                convol[:, i, j, z] = np.sum(
-                    (A_pad[:, x: x + kh, y: y + kw, :] *
-                     (W[:, :, :, z])),
-                    axis=(1, 2, 3)
-                ) + b[:, :, :, z]
-                j += 1
-            i += 1
-    return activation(convol)
+    # Copy A_prev into the interior of the zero bordered padding buffer
+    if pad_h or pad_w:
+        pad_shape = (m, h_prev + (2 * pad_h), w_prev + (2 * pad_w), c_prev)
+        A_pad = workspace.get('A_pad')
+        if (A_pad is None or A_pad.shape != pad_shape or
+                A_pad.dtype != dtype):
+            A_pad = np.zeros(pad_shape, dtype=dtype)
+            workspace['A_pad'] = A_pad
+        A_pad[:, pad_h:pad_h + h_prev, pad_w:pad_w + w_prev, :] = A_prev
+    else:
+        A_pad = A_prev
+
+    # Gather every window into one (m * conv_h * conv_w, kh * kw * c_prev)
+    # matrix so the convolution becomes a single matrix multiply
+    s_m, s_h, s_w, s_c = A_pad.strides
+    windows = np.lib.stride_tricks.as_strided(
+        A_pad, shape=(m, conv_h, conv_w, kh, kw, c_prev),
+        strides=(s_m, s_h * sh, s_w * sw, s_h, s_w, s_c), writeable=False)
+    cols_shape = (m * conv_h * conv_w, kh * kw * c_prev)
+    A_cols = workspace.get('A_cols')
+    if A_cols is None or A_cols.shape != cols_shape or A_cols.dtype != dtype:
+        A_cols = np.empty(cols_shape, dtype=dtype)
+        workspace['A_cols'] = A_cols
+    A_cols.reshape(windows.shape)[...] = windows
+    if cache is not None:
+        cache['A_cols'] = A_cols.copy() if shared else A_cols
+
+    # Multiply, add the bias and activate in the output buffer
+    if out is None:
+        out = np.empty((m, conv_h, conv_w, nc),
+                       dtype=np.result_type(dtype, b.dtype))
+    convol = out.reshape(cols_shape[0], nc)
+    np.matmul(A_cols, W.reshape(kh * kw * c_prev, nc), out=convol)
+    np.add(convol, b.reshape(nc), out=convol)
+    if isinstance(activation, np.ufunc):
+        return activation(out, out=out)
+    out[...] = activation(out)
+    return out
@@ -5,7 +5,8 @@
 import numpy as np
 
 
-def pool_forward(A_prev, kernel_shape, stride=(1, 1), mode='max'):
+def pool_forward(A_prev, kernel_shape, stride=(1, 1), mode='max',
+                 cache=None):
     """Function that performs forward propagation over a pooling layer of a
     neural network.
 
@@ -24,6 +25,10 @@ def pool_forward(A_prev, kernel_shape, stride=(1, 1), mode='max'):
         mode (str, optional): A string containing either max or avg, indicating
             whether to perform maximum or average pooling, respectively.
             Defaults to 'max'.
+        cache (dict, optional): If given and mode is max, the flat index of
+            the maximum inside each window is stored in it under 'argmax' so
+            pool_backward can route the gradient without searching the
+            windows again. Defaults to None.
 
     Returns:
         The output of the pooling layer.
@@ -33,18 +38,17 @@ def pool_forward(A_prev, kernel_shape, stride=(1, 1), mode='max'):
     sh, sw = stride
     output_h = ((h_prev - kh) // sh) + 1
     output_w = ((w_prev - kw) // sw) + 1
-    pooled = np.zeros((m, output_h, output_w, c_prev))
-    i = 0
-    for x in range(0, (h_prev - kh + 1), sh):
-        j = 0
-        for y in range(0, w_prev - kw + 1, sw):
-            if mode == 'max':
-                pooled[:, i, j, :] = np.max(A_prev[:, x:x + kh, y:y + kw, :],
-                                            axis=(1, 2))
-            elif mode == 'avg':
-                pooled[:, i, j, :] = np.average(
-                    A_prev[:, x:x + kh, y:y + kw, :], axis=(1, 2)
-                    )
-            j += 1
-        i += 1
-    return pooled
+
+    # View every window as a (kh * kw) row so one reduction pools them all
+    s_m, s_h, s_w, s_c = A_prev.strides
+    windows = np.lib.stride_tricks.as_strided(
+        A_prev, shape=(m, output_h, output_w, c_prev, kh, kw),
+        strides=(s_m, s_h * sh, s_w * sw, s_c, s_h, s_w), writeable=False)
+    if mode == 'avg':
+        return np.mean(windows, axis=(4, 5))
+    windows = windows.reshape(m, output_h, output_w, c_prev, kh * kw)
+    argmax = np.argmax(windows, axis=4)
+    if cache is not None:
+        cache['argmax'] = argmax
+    pooled = np.take_along_axis(windows, argmax[..., np.newaxis], axis=4)
+    return pooled[..., 0].astype(float)
@@ -5,7 +5,8 @@
 import numpy as np
 
 
-def conv_backward(dZ, A_prev, W, b, padding="same", stride=(1, 1)):
+def conv_backward(dZ, A_prev, W, b, padding="same", stride=(1, 1),
+                  cache=None):
     """Function that performs back propagation over a convolutional layer of a
     neural network.
 
@@ -32,6 +33,9 @@ def conv_backward(dZ, A_prev, W, b, padding="same", stride=(1, 1)):
         stride (tuple, optional): A tuple of (sh, sw) containing the strides
             for the convolution where sh is the stride for the height and sw
             is the stride for the width. Defaults to (1, 1).
+        cache (dict, optional): The cache filled by conv_forward for the same
+            layer. If it contains 'A_cols' that im2col matrix is reused rather
+            than gathered again from A_prev. Defaults to None.
 
     Retruns:
         The  partial derivatives with respect to the previous layer (dA_prev),
@@ -43,41 +47,47 @@ def conv_backward(dZ, A_prev, W, b, padding="same", stride=(1, 1)):
     kh, kw, c_prev, c_new = W.shape
     sh, sw = stride
     if padding is 'same':
-        pad_h = ((((h_prev - 1) * sh) + kh - h_prev) // 2) + 1
-        pad_w = ((((w_prev - 1) * sw) + kw - w_prev) // 2) + 1
+        pad_h = ((((h_prev - 1) * sh) + kh - h_prev) // 2)
+        pad_w = ((((w_prev - 1) * sw) + kw - w_prev) // 2)
     elif padding is 'valid':
         pad_h = 0
         pad_w = 0
     else:
         pad_h, pad_w = padding
 
-    # Initialize returns & set db
-    dA_prev = np.zeros_like(A_prev)
-    dW = np.zeros_like(W)
+    # Set db and flatten dZ and W for the matrix multiplies
     db = np.sum(dZ, axis=(0, 1, 2), keepdims=True)
+    dZ_flat = dZ.reshape(m * h_new * w_new, c_new)
+    W_flat = W.reshape(kh * kw * c_prev, c_new)
 
-    # Initialize padded shapes.
-    A_pad = np.pad(A_prev, ((0, 0), (pad_h, pad_h), (pad_w, pad_w), (0, 0)),
-                   'constant', constant_values=0)
-    dA_pad = np.pad(dA_prev, ((0, 0), (pad_h, pad_h), (pad_w, pad_w), (0, 0)),
-                    'constant', constant_values=0)
+    # Reuse the im2col matrix from conv_forward or gather it from A_prev
+    if cache is not None and 'A_cols' in cache:
+        A_cols = cache['A_cols']
+    else:
+        A_pad = np.pad(A_prev,
+                       ((0, 0), (pad_h, pad_h), (pad_w, pad_w), (0, 0)),
+                       'constant', constant_values=0)
+        s_m, s_h, s_w, s_c = A_pad.strides
+        windows = np.lib.stride_tricks.as_strided(
+            A_pad, shape=(m, h_new, w_new, kh, kw, c_prev),
+            strides=(s_m, s_h * sh, s_w * sw, s_h, s_w, s_c),
+            writeable=False)
+        A_cols = windows.reshape(m * h_new * w_new, kh * kw * c_prev)
+
+    # Correlate A_prev with dZ for dW and W with dZ for dA
+    dW = np.matmul(A_cols.T, dZ_flat).reshape(W.shape)
+    dA_cols = np.matmul(dZ_flat, W_flat.T).reshape(
+        m, h_new, w_new, kh, kw, c_prev)
 
-    # Convolve W with dZ for dA and A_prev with dZ for dW
-    for e in range(m):  # For the matrix multi c and e must be the same size
-        for h in range(h_new):
-            i = h * sh
-            for w in range(w_new):
-                j = w * sw
-                for c in range(c_new):
-                    dA_pad[e, i:i + kh, j:j + kw, :] += (W[:, :, :, c] *
-                                                         dZ[e, h, w, c])
-                    dW[:, :, :, c] += (A_pad[e, i:i + kh, j:j + kw, :] *
-                                       dZ[e, h, w, c])
+    # col2im: scatter each kernel offset back onto the padded input
+    dA_pad = np.zeros((m, h_prev + (2 * pad_h), w_prev + (2 * pad_w), c_prev))
+    for i in range(kh):
+        for j in range(kw):
+            dA_pad[:, i:i + (sh * h_new):sh, j:j + (sw * w_new):sw, :] += (
+                dA_cols[:, :, :, i, j, :]
+                )
 
     # Adjust for padding
-    if padding is 'same':
-        dA_prev = dA_pad[:, pad_h: -pad_h, pad_w: -pad_w, :]
-    else:
-        dA_prev = dA_pad
+    dA_prev = dA_pad[:, pad_h:pad_h + h_prev, pad_w:pad_w + w_prev, :]
 
     return dA_prev, dW, db
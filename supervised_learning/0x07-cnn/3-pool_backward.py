@@ -5,7 +5,8 @@
 import numpy as np
 
 
-def pool_backward(dA, A_prev, kernel_shape, stride=(1, 1), mode='max'):
+def pool_backward(dA, A_prev, kernel_shape, stride=(1, 1), mode='max',
+                  cache=None):
     """Function that that performs back propagation over a pooling layer of a
     neural network.
 
@@ -28,6 +29,9 @@ def pool_backward(dA, A_prev, kernel_shape, stride=(1, 1), mode='max'):
         mode (str, optional): A string containing either max or avg,
             indicating whether to perform maximum or average pooling,
             respectively. Defaults to 'max'.
+        cache (dict, optional): The cache filled by pool_forward for the same
+            layer. If it contains 'argmax' those indices are used instead of
+            searching each window for its maximum again. Defaults to None.
 
     Returns:
         The partial derivatives with respect to the previous layer (dA_prev).
@@ -39,25 +43,50 @@ def pool_backward(dA, A_prev, kernel_shape, stride=(1, 1), mode='max'):
     sh, sw = stride
 
     # Initialize dA_prev
-    dA_prev = np.zeros_like(A_prev)
-
-    # Back propigate
-    for e in range(m):
-        for h in range(h_new):
-            i = h * sh
-            for w in range(w_new):
-                j = w * sw
-                for c in range(c_new):
-                    if mode is "avg":
-                        avg_dA = dA[e, h, w, c] / kh / kw
-                        dA_prev[e, i: i + kh, j: j + kw, c] += (
-                            np.ones((kh, kw)) * avg_dA
-                            )
-                    elif mode is 'max':
-                        A_slice = A_prev[e, i: i + kh, j + kw, c]
-                        mask = (A_slice == np.max(A_slice))
-                        dA_prev[e, i: i + kh, j: j + kw, c] += (
-                            mask * dA[e, h, w, c]
-                            )
+    dA_prev = np.zeros(A_prev.shape)
+    tiled = (sh >= kh and sw >= kw and
+             h_new * sh <= h_prev and w_new * sw <= w_prev)
+
+    # Non overlapping windows tile the input, so the gradient is written
+    # through a reshaped view of dA_prev with no scatter
+    if tiled:
+        dA_tiles = dA_prev[:, :h_new * sh, :w_new * sw, :].reshape(
+            m, h_new, sh, w_new, sw, c_new)[:, :, :kh, :, :kw, :]
+
+    if mode == 'avg':
+        avg_dA = dA / kh / kw
+        if tiled:
+            dA_tiles[...] = avg_dA[:, :, np.newaxis, :, np.newaxis, :]
+            return dA_prev
+        for i in range(kh):
+            for j in range(kw):
+                dA_prev[:, i:i + (sh * h_new):sh,
+                        j:j + (sw * w_new):sw, :] += avg_dA
+        return dA_prev
+
+    # Flat index of the maximum in each window, from pool_forward if cached
+    if cache is not None and 'argmax' in cache:
+        argmax = cache['argmax']
+    else:
+        s_m, s_h, s_w, s_c = A_prev.strides
+        windows = np.lib.stride_tricks.as_strided(
+            A_prev, shape=(m, h_new, w_new, c_new, kh, kw),
+            strides=(s_m, s_h * sh, s_w * sw, s_c, s_h, s_w),
+            writeable=False)
+        argmax = np.argmax(windows.reshape(m, h_new, w_new, c_new, kh * kw),
+                           axis=4)
+
+    if tiled:
+        mask = argmax[..., np.newaxis] == np.arange(kh * kw)
+        dA_win = (mask * dA[..., np.newaxis]).reshape(
+            m, h_new, w_new, c_new, kh, kw)
+        dA_tiles[...] = dA_win.transpose(0, 1, 4, 2, 5, 3)
+        return dA_prev
+
+    # Otherwise scatter with add.at, which accumulates shared maximums
+    e, h, w, c = np.indices((m, h_new, w_new, c_new), sparse=True)
+    rows = (h * sh) + (argmax // kw)
+    cols = (w * sw) + (argmax % kw)
+    np.add.at(dA_prev, (e, rows, cols, c), dA)
 
     return dA_prev
@@ -70,7 +70,9 @@ class RNNCell():
         Returns:
             The softmax activated version of y.
         """
-        return np.exp(y) / (np.sum(np.exp(y), axis=1, keepdims=True))
+        # Shifting by the row max keeps exp from overflowing on large inputs
+        T = np.exp(y - np.max(y, axis=1, keepdims=True))
+        return T / np.sum(T, axis=1, keepdims=True)
 
 
 # Testing
@@ -21,7 +21,7 @@ def pca(X, var=0.95):
             fraction of X‘s original variance where, nd is the new
             dimensionality of the transformed X.
     """
-    u, s, vh = np.linalg.svd(X)  # U, Σ, V*
+    u, s, vh = np.linalg.svd(X, full_matrices=False)  # U, Σ, V*
     V = vh.T
     s_percentages = s / np.sum(s)
     variance_cumsum = np.cumsum(s_percentages)
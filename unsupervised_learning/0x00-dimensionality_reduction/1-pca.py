@@ -3,23 +3,93 @@
 input."""
 
 import numpy as np
+import scipy.linalg
 
 
-def pca(X, ndim):
+def randomized_svd(X, ndim, mean=None, oversamples=10, iterations=4):
+    """Function that approximates the ndim largest singular values and
+    vectors of a matrix with a randomized range finder.
+
+    The range of X is sampled with ndim + oversamples random directions,
+    sharpened by power iterations (X X^T)^q, and the SVD is then computed on
+    the small projection of X onto that range. With mean, X - mean is
+    decomposed without ever being formed.
+
+    Args:
+        X (numpy.ndarray): Tensor of shape (n, d) containing the matrix.
+        ndim (int): The number of singular values and vectors.
+        mean (numpy.ndarray, optional): Tensor of shape (d,) subtracted from
+            every row of X. Defaults to None.
+        oversamples (int, optional): The number of extra random directions.
+            Defaults to 10.
+        iterations (int, optional): The number of power iterations.
+            Defaults to 4.
+
+    Returns:
+        U (numpy.ndarray): Tensor of shape (n, ndim), the left singular
+            vectors.
+        s (numpy.ndarray): Tensor of shape (ndim,), the singular values.
+        vh (numpy.ndarray): Tensor of shape (ndim, d), the right singular
+            vectors.
+    """
+    n, d = X.shape
+    if mean is None:
+        mean = np.zeros(d)
+
+    def left(M):
+        """(X - mean) @ M"""
+        return X @ M - mean @ M
+
+    def right(M):
+        """(X - mean).T @ M"""
+        return X.T @ M - np.outer(mean, np.sum(M, axis=0))
+
+    size = min(ndim + oversamples, n, d)
+    Q = left(np.random.standard_normal((d, size)))
+    for _ in range(iterations):
+        # Normalizing at each step keeps the small singular values from
+        # being lost to rounding; an LU factor does it several times faster
+        # than a QR of the tall (n, size) matrix, which is only needed once
+        Q = scipy.linalg.lu(Q, permute_l=True)[0]
+        Q = left(scipy.linalg.lu(right(Q), permute_l=True)[0])
+    Q, _ = scipy.linalg.qr(Q, mode='economic')
+    u, s, vh = np.linalg.svd(right(Q).T, full_matrices=False)
+    return (Q @ u)[:, :ndim], s[:ndim], vh[:ndim]
+
+
+def pca(X, ndim, solver='auto'):
     """Function that performs PCA on a dataset, using Singular Value
     Decomposition.
 
     Args:
-        X (numpy.ndarray): Tensor of shape (n, d) where, n is the number of
-            data points and d is the number of dimensions in each point.
+        X (numpy.ndarray): Tensor of shape (n, d) containing the dataset,
+            where n is the number of data points and d is the number of
+            dimensions in each point.
         ndim (int): The new dimensionality of the transformed X.
+        solver (str, optional): 'full', the exact SVD without the (n, n)
+            left singular vectors, 'randomized', which approximates the ndim
+            largest components without centering a copy of X, or 'auto',
+            which is randomized when ndim is below a tenth of min(n, d) and
+            X holds more than 10^7 values, and full otherwise. Defaults to
+            'auto'.
 
     Returns:
         T (numpy.ndarray): Tensor of shape (n, ndim) containing the transformed
             version of X.
     """
-    X_m = X - np.mean(X, axis=0)
-    u, s, vh = np.linalg.svd(X_m)  # U, Σ, V*
+    if solver not in ('auto', 'full', 'randomized'):
+        raise ValueError("solver must be 'auto', 'full' or 'randomized'")
+    n, d = X.shape
+    if solver == 'auto':
+        small = ndim < min(n, d) // 10 and n * d > 10 ** 7
+        solver = 'randomized' if small else 'full'
+    mean = np.mean(X, axis=0)
+    if solver == 'randomized':
+        _, _, vh = randomized_svd(X, ndim, mean)
+        W = vh.T
+        return X @ W - mean @ W
+    X_m = X - mean
+    u, s, vh = np.linalg.svd(X_m, full_matrices=False)  # U, Σ, V*
     V = vh.T
     W = V[:, :ndim]
     T = X_m @ W
@@ -9,12 +9,16 @@ def HP(Di, beta):
     """Function that calculates the Shannon entropy and P affinities relative
     to a data point.
 
+    Di and beta may also hold several data points, one per row, which are
+    computed at once.
+
     Args:
         Di (numpy.ndarray): Tensor of shape (n - 1,) containing the pariwise
             distances between a data point and all other points except itself
-            where n is the number of data points.
+            where n is the number of data points, or of shape (m, n - 1) for
+            m data points. Infinite distances get an affinity of 0.
         beta (numpy.ndarray): Tensor of shape (1,) containing the beta value
-            for the Gaussian distribution.
+            for the Gaussian distribution, or of shape (m, 1).
 
     Returns:
         Hi (): The Shannon entropy of the points.
@@ -22,8 +26,12 @@ def HP(Di, beta):
             affinities of the points.
 
     """
-    Hi = 0
-    Pi = 0
+    # Shifting by the nearest distance cancels out in the normalization, and
+    # keeps the nearest affinity at exp(0) so the sum never underflows to 0
+    Pi = np.exp(-(Di - np.min(Di, axis=-1, keepdims=True)) * beta)
+    Pi /= np.sum(Pi, axis=-1, keepdims=True)
+    logs = np.log2(Pi, out=np.zeros_like(Pi), where=Pi > 0)
+    Hi = -np.sum(Pi * logs, axis=-1)
     return Hi, Pi
 
 
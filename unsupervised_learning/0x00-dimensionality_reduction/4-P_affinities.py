@@ -3,9 +3,97 @@
 of a data set."""
 
 import numpy as np
+import scipy.sparse
+P_init = __import__('2-P_init').P_init
+HP = __import__('3-entropy').HP
 
 
-def P_affinities(X, tol=1e-5, perplexity=30.0):
+def nearest_neighbors(X, k, chunk_size=None):
+    """Function that finds the k nearest neighbors of every data point.
+
+    The squared distances are computed a chunk of points at a time as
+    ||x||^2 - 2 x.y + ||y||^2, so only (chunk_size, n) distances are kept.
+
+    Args:
+        X (numpy.ndarray): Tensor of shape (n, d) containing the dataset.
+        k (int): The number of neighbors of each point, not counting itself.
+        chunk_size (int, optional): The number of points whose distances are
+            computed at once. Defaults to None, which keeps about 2^22
+            distances at a time.
+
+    Returns:
+        D (numpy.ndarray): Tensor of shape (n, k) containing the squared
+            distances to the neighbors, nearest first.
+        idx (numpy.ndarray): Tensor of shape (n, k) containing the indices of
+            the neighbors.
+    """
+    n = X.shape[0]
+    if chunk_size is None:
+        chunk_size = max(1, 2 ** 22 // n)
+    norms = np.einsum('ij,ij->i', X, X)
+    D = np.empty((n, k))
+    idx = np.empty((n, k), dtype=np.intp)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        rows = np.arange(stop - start)
+        # ||x||^2 is the same along a row, so it is only added to the
+        # distances kept
+        Dc = X[start:stop] @ X.T
+        Dc *= -2
+        Dc += norms
+        Dc[rows, rows + start] = np.inf
+        part = np.argpartition(Dc, k - 1, axis=1)[:, :k]
+        Dp = np.take_along_axis(Dc, part, axis=1)
+        Dp += norms[start:stop, np.newaxis]
+        order = np.argsort(Dp, axis=1)
+        D[start:stop] = np.take_along_axis(Dp, order, axis=1)
+        idx[start:stop] = np.take_along_axis(part, order, axis=1)
+    np.maximum(D, 0, out=D)
+    return D, idx
+
+
+def binary_search(D, betas, H, tol, iterations=100):
+    """Function that finds the beta of every data point whose Gaussian
+    distribution has the entropy H, searching for all of them at once.
+
+    Args:
+        D (numpy.ndarray): Tensor of shape (n, m) containing the squared
+            distances from each point to the points it has affinities with.
+        betas (numpy.ndarray): Tensor of shape (n, 1) containing the initial
+            beta values.
+        H (float): The Shannon entropy for the perplexity.
+        tol (float): The maximum difference in Shannon entropy from H.
+        iterations (int, optional): The maximum number of halvings of the
+            search intervals. Defaults to 100.
+
+    Returns:
+        P (numpy.ndarray): Tensor of shape (n, m) containing the affinities
+            of each point.
+        betas (numpy.ndarray): Tensor of shape (n, 1) containing the beta
+            values found.
+    """
+    betas = betas.astype(float)
+    low = np.zeros_like(betas)
+    high = np.full_like(betas, np.inf)
+    Hi, P = HP(D, betas)
+    active = np.flatnonzero(np.abs(Hi - H) > tol)
+    for _ in range(iterations):
+        if active.size == 0:
+            break
+        # An entropy above H means the distribution is too wide, so beta
+        # must grow, doubling until an upper bound is found
+        wide = (Hi[active] > H)[:, np.newaxis]
+        b = betas[active]
+        low[active] = np.where(wide, b, low[active])
+        high[active] = np.where(wide, high[active], b)
+        betas[active] = np.where(
+            np.isinf(high[active]), b * 2, (low[active] + high[active]) / 2)
+        Hi[active], P[active] = HP(D[active], betas[active])
+        active = active[np.abs(Hi[active] - H) > tol]
+    return P, betas
+
+
+def P_affinities(X, tol=1e-5, perplexity=30.0, neighbors=None):
     """Function that calculates the symmetric P affinities of a data set.
 
     Args:
@@ -17,17 +105,37 @@ def P_affinities(X, tol=1e-5, perplexity=30.0):
             distributions. Defaults to 1e-5.
         perplexity (float, optional): The perplexity that all Gaussian
             distributions should have. Defaults to 30.0.
+        neighbors (int, optional): The number of nearest neighbors each point
+            has affinities with, such as 3 * perplexity, the affinities to
+            the other points being 0. Defaults to None, which computes the
+            affinities to every point.
 
     Returns:
-        P (numpy.ndarray): Tensor of shape (n, n) containing the symmetric P.
+        P (numpy.ndarray): Tensor of shape (n, n) containing the symmetric P,
+            or a scipy.sparse.csr_matrix of shape (n, n) with neighbors.
     """
-    P = 0
-    return P
+    n = X.shape[0]
+    if neighbors is None:
+        D, P, betas, H = P_init(X, perplexity)
+        np.fill_diagonal(D, np.inf)
+        P, _ = binary_search(D, betas, H, tol)
+        return (P + P.T) / (2 * n)
+
+    if not isinstance(neighbors, int):
+        raise TypeError("neighbors must be an integer")
+    elif neighbors < 1 or neighbors >= n:
+        raise ValueError("neighbors must be between 1 and n - 1")
+    D, idx = nearest_neighbors(X, neighbors)
+    P, _ = binary_search(D, np.ones((n, 1)), np.log2(perplexity), tol)
+    P = scipy.sparse.csr_matrix(
+        (P.ravel(), idx.ravel(), np.arange(0, n * neighbors + 1, neighbors)),
+        shape=(n, n))
+    return (P + P.T) / (2 * n)
 
 
 if __name__ == "__main__":
     pca = __import__('1-pca').pca
-    
+
     X = np.loadtxt("mnist2500_X.txt")
     X = pca(X, 50)
     P = P_affinities(X)
@@ -17,8 +17,14 @@ def Q_affinities(Y):
         num (numpy.ndarray): Tensor of shape (n, n) containing the numerator of
             the Q affinities.
     """
-    Q = 0
-    num = 0
+    norms = np.einsum('ij,ij->i', Y, Y)
+    num = norms[:, np.newaxis] - 2 * (Y @ Y.T) + norms
+    np.maximum(num, 0, out=num)
+    # num = (1 + ||y_i - y_j||^2)^-1, computed in place
+    num += 1
+    np.reciprocal(num, out=num)
+    np.fill_diagonal(num, 0)
+    Q = num / np.sum(num)
     return Q, num
 
 
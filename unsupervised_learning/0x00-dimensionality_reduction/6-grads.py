@@ -3,26 +3,57 @@
 Y."""
 
 import numpy as np
+import scipy.sparse
+Q_affinities = __import__('5-Q_affinities').Q_affinities
+repulsion = __import__('barnes_hut').repulsion
 
 
-def grads(Y, P):
+def grads(Y, P, theta=0.5):
     """Function that calculates the gradients of Y.
 
+    With a sparse P, such as the nearest neighbor affinities, the attractive
+    forces are only computed for its nonzero entries, and the repulsive
+    forces are approximated with a Barnes-Hut tree in O(n log n) instead of
+    computing the (n, n) Q affinities.
+
     Args:
         Y (numpy.ndarray): Tensor of shape (n, ndim) containing the low
             dimensional transformation of X.
         P (numpy.ndarray): Tensor of shape (n, n) containing the P affinities
-            of X.
+            of X, or a scipy.sparse matrix of shape (n, n).
+        theta (float, optional): The accuracy of the Barnes-Hut
+            approximation used with a sparse P, 0 being exact. Defaults to
+            0.5.
 
     Returns:
         dY (numpy.ndarray): Tensor of shape (n, ndim) containing the
             gradients of Y.
         Q (numpy.ndarray of shape): Tensor of shape (n, n) containing the Q
-            affinities of Y.
+            affinities of Y, or a scipy.sparse.coo_matrix holding them only
+            for the nonzero entries of a sparse P.
     """
-    dy = 0
-    Q = 0
-    return dy, Q
+    n, ndim = Y.shape
+    if not scipy.sparse.issparse(P):
+        Q, num = Q_affinities(Y)
+        # dY_i = sum_j (p_ij - q_ij) num_ij (y_i - y_j)
+        W = (P - Q) * num
+        dY = np.sum(W, axis=1)[:, np.newaxis] * Y - W @ Y
+        return dY, Q
+
+    P = P.tocoo()
+    Yt = np.ascontiguousarray(Y.T)
+    diff = [Yt[j].take(P.row) - Yt[j].take(P.col) for j in range(ndim)]
+    num = 1 / (1 + sum(d * d for d in diff))
+    weight = P.data * num
+    attract = np.empty((n, ndim))
+    for j in range(ndim):
+        attract[:, j] = np.bincount(P.row, weights=weight * diff[j],
+                                    minlength=n)
+    # sum_j q_ij num_ij (y_i - y_j) = sum_j num_ij^2 (y_i - y_j) / Z
+    rep, Z = repulsion(Y, theta)
+    dY = attract - rep / Z
+    Q = scipy.sparse.coo_matrix((num / Z, (P.row, P.col)), shape=P.shape)
+    return dY, Q
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@
 transformation."""
 
 import numpy as np
+import scipy.sparse
 
 
 def cost(P, Q):
@@ -11,11 +12,19 @@ def cost(P, Q):
     Args:
         P (numpy.ndarray): Tensor of shape (n, n) containing the P affinities.
         Q (numpy.ndarray): Tensor of shape (n, n) containing the Q affinities.
-    
+            With a sparse P, Q only needs the entries where P is nonzero,
+            which are the only ones that add to the cost.
+
     Returns:
         C(float): The cost of the transformation.
     """
-    C = 0
+    if scipy.sparse.issparse(P):
+        P = P.tocoo()
+        Q = np.asarray(Q.tocsr()[P.row, P.col]).ravel()
+        P = P.data
+    P = np.maximum(P, 1e-12)
+    Q = np.maximum(Q, 1e-12)
+    C = np.sum(P * np.log(P / Q))
     return C
 
 
@@ -23,7 +32,7 @@ if __name__ == "__main__":
     pca = __import__('1-pca').pca
     P_affinities = __import__('4-P_affinities').P_affinities
     grads = __import__('6-grads').grads
-    
+
     np.random.seed(0)
     X = np.loadtxt("mnist2500_X.txt")
     X = pca(X, 50)
@@ -3,9 +3,14 @@
 transformation"""
 
 import numpy as np
+pca = __import__('1-pca').pca
+P_affinities = __import__('4-P_affinities').P_affinities
+grads = __import__('6-grads').grads
+cost = __import__('7-cost').cost
 
 
-def tsne(X, ndims=2, idims=50, perplexity=30.0, iterations=1000, lr=500):
+def tsne(X, ndims=2, idims=50, perplexity=30.0, iterations=1000, lr=500,
+         method='barnes_hut', theta=0.5):
     """Function that performs a t-SNE transformation.
     Args:
         X (numpy.ndarray): Tensor of shape (n, d) containing the dataset to be
@@ -18,12 +23,41 @@ def tsne(X, ndims=2, idims=50, perplexity=30.0, iterations=1000, lr=500):
         perplexity (float, optional): The perplexity. Defaults to 30.0.
         iterations (int, optional): The number of iterations. Defaults to 1000.
         lr (int, optional): The learning rate. Defaults to 500.
-    
+        method (str, optional): 'exact', which computes every (n, n)
+            affinity, or 'barnes_hut', which keeps the P affinities of the
+            3 * perplexity nearest neighbors of each point and approximates
+            the gradients with a Barnes-Hut tree, in O(n log n) time and O(n)
+            memory. Defaults to 'barnes_hut'.
+        theta (float, optional): The accuracy of the Barnes-Hut
+            approximation, 0 being exact. Defaults to 0.5.
+
     Returns:
         Y (numpy.ndarray): Tnesor of shape (n, ndim) containing the optimized
             low dimensional transformation of X.
     """
-    Y = 0
+    if method not in ('exact', 'barnes_hut'):
+        raise ValueError("method must be 'exact' or 'barnes_hut'")
+    n = X.shape[0]
+    X = pca(X, idims)
+    if method == 'exact':
+        P = P_affinities(X, perplexity=perplexity)
+    else:
+        neighbors = min(n - 1, int(3 * perplexity))
+        P = P_affinities(X, perplexity=perplexity,
+                         neighbors=neighbors).tocoo()
+    P = P * 4
+    Y = np.random.randn(n, ndims)
+    Y_prev = Y
+
+    for i in range(1, iterations + 1):
+        dY, Q = grads(Y, P, theta)
+        a = 0.5 if i <= 20 else 0.8
+        Y, Y_prev = Y - lr * dY + a * (Y - Y_prev), Y
+        Y = Y - np.mean(Y, axis=0)
+        if i % 100 == 0:
+            print("Cost at iteration {}: {}".format(i, cost(P, Q)))
+        if i == 100:
+            P = P / 4
     return Y
 
 
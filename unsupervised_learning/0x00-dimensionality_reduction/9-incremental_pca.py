@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Module that contains the class IncrementalPCA that performs PCA on a
+stream of data points."""
+
+import numpy as np
+
+
+class IncrementalPCA():
+    """Class that performs PCA on data points arriving in chunks, so the
+    whole dataset never needs to be in memory.
+
+    Only the ndim largest singular values and right singular vectors of the
+    centered points seen so far are kept. Each chunk is stacked under them,
+    with one more row that accounts for the shift of the mean, and the SVD
+    of that small matrix gives the new ones."""
+
+    def __init__(self, ndim, batch_size=1024):
+        """Class constructor
+
+        Args:
+            ndim (int): The number of principal components.
+            batch_size (int, optional): The number of points fit at once by
+                fit. Defaults to 1024.
+        """
+        if not isinstance(ndim, int):
+            raise TypeError("ndim must be an integer")
+        elif ndim < 1:
+            raise ValueError("ndim must be a positive integer")
+        elif not isinstance(batch_size, int):
+            raise TypeError("batch_size must be an integer")
+        elif batch_size < ndim:
+            raise ValueError("batch_size must be at least ndim")
+        self.__ndim = ndim
+        self.__batch_size = batch_size
+        self.__n = 0
+        self.__mean = None
+        self.__s = None
+        self.__vh = None
+
+    @property
+    def ndim(self):
+        """Getter for self.__ndim"""
+        return self.__ndim
+
+    @property
+    def batch_size(self):
+        """Getter for self.__batch_size"""
+        return self.__batch_size
+
+    @property
+    def n(self):
+        """Getter for self.__n"""
+        return self.__n
+
+    @property
+    def mean(self):
+        """Getter for self.__mean"""
+        return self.__mean
+
+    @property
+    def singular_values(self):
+        """Getter for self.__s"""
+        return self.__s
+
+    @property
+    def W(self):
+        """Getter for the weights matrix, of shape (d, ndim)"""
+        return None if self.__vh is None else self.__vh.T
+
+    def partial_fit(self, X):
+        """Function that updates the principal components with a chunk of
+        data points.
+
+        Args:
+            X (numpy.ndarray): A tensor of shape (m, d) containing the chunk.
+                The first chunk needs at least ndim points.
+
+        Returns:
+            self
+        """
+        if not isinstance(X, np.ndarray) or X.ndim != 2:
+            raise TypeError("X must be a numpy.ndarray of shape (m, d)")
+        X = np.asarray(X, dtype=float)
+        m = X.shape[0]
+        if m == 0:
+            return self
+        if self.__mean is None:
+            if m < self.__ndim:
+                raise ValueError(
+                    "the first chunk must have at least ndim points")
+            mean = np.mean(X, axis=0)
+            stack = X - mean
+        else:
+            if X.shape[1] != self.__mean.shape[0]:
+                raise ValueError("X must have {} dimensions"
+                                 .format(self.__mean.shape[0]))
+            n = self.__n
+            batch_mean = np.mean(X, axis=0)
+            mean = self.__mean + (batch_mean - self.__mean) * m / (n + m)
+            # The scatter of the union about its mean is the scatter of each
+            # part about its own mean plus n m / (n + m) (mean shift)^2
+            shift = np.sqrt(n * m / (n + m)) * (self.__mean - batch_mean)
+            stack = np.vstack((self.__s[:, np.newaxis] * self.__vh,
+                               X - batch_mean, shift))
+        _, s, vh = np.linalg.svd(stack, full_matrices=False)
+        self.__n += m
+        self.__mean = mean
+        self.__s = s[:self.__ndim]
+        self.__vh = vh[:self.__ndim]
+        return self
+
+    def fit(self, data):
+        """Function that updates the principal components with every chunk
+        of a dataset.
+
+        Args:
+            data: A tensor of shape (n, d), such as a numpy.memmap, read
+                batch_size points at a time, the filename of such a tensor
+                saved with numpy.save, which is memory-mapped, or an iterable
+                of tensors of shape (m, d), such as a generator.
+
+        Returns:
+            self
+        """
+        if isinstance(data, str):
+            data = np.load(data, mmap_mode='r')
+        chunks = data
+        if isinstance(data, np.ndarray):
+            chunks = (data[start:start + self.__batch_size]
+                      for start in range(0, data.shape[0], self.__batch_size))
+        for chunk in chunks:
+            self.partial_fit(np.asarray(chunk))
+        return self
+
+    def transform(self, X):
+        """Function that projects data points on the principal components.
+
+        Args:
+            X (numpy.ndarray): A tensor of shape (n, d) containing the data
+                points.
+
+        Returns:
+            T (numpy.ndarray): A tensor of shape (n, ndim) containing the
+                transformed version of X.
+        """
+        if self.__vh is None:
+            raise ValueError("partial_fit must be called before transform")
+        return (np.asarray(X) - self.__mean) @ self.__vh.T
+
+
+if __name__ == "__main__":
+    pca = __import__('1-pca').pca
+
+    np.random.seed(0)
+    scales = np.array([[10], [8], [6], [4], [2]])
+    X = np.random.randn(10000, 5) @ (scales * np.random.randn(5, 100))
+    X += np.random.randn(10000, 100) * 0.1
+    T = IncrementalPCA(5, batch_size=500).fit(X).transform(X)
+    T_full = pca(X, 5, solver='full')
+    # Components are only defined up to their sign
+    print(np.max(np.abs(np.abs(T) - np.abs(T_full))))
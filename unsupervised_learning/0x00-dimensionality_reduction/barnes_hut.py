@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Module that contains the function repulsion that approximates the
+repulsive forces of t-SNE with a Barnes-Hut tree."""
+
+import numpy as np
+
+
+def build_tree(Y, depth):
+    """Function that builds the levels of a Barnes-Hut tree, a quadtree in 2
+    dimensions, over points sorted by their Morton code.
+
+    Sorted that way, the points of every cell are contiguous, so a cell is
+    the range [start, end) of the sorted points and its children are the
+    cells of the next level that start inside that range.
+
+    Args:
+        Y (numpy.ndarray): Tensor of shape (n, ndim) containing the points.
+        depth (int): The number of levels below the root cell.
+
+    Returns:
+        order (numpy.ndarray): Tensor of shape (n,) containing the index of
+            each sorted point in Y.
+        width (float): The width of the root cell.
+        levels (list[list]): For each level, the start, end, number of
+            points, center of mass, of shape (ndim, cells), and first and
+            last child of its cells.
+    """
+    n, ndim = Y.shape
+    low = np.min(Y, axis=0)
+    width = float(np.max(np.max(Y, axis=0) - low)) * (1 + 1e-9) or 1.0
+    side = 2 ** depth
+    cells = ((Y - low) * (side / width)).astype(np.int64)
+    np.clip(cells, 0, side - 1, out=cells)
+    code = np.zeros(n, dtype=np.int64)
+    for bit in range(depth - 1, -1, -1):
+        for j in range(ndim):
+            code = (code << 1) | ((cells[:, j] >> bit) & 1)
+    order = np.argsort(code, kind='stable')
+    code = code[order]
+    Ys = Y[order]
+
+    levels = []
+    for level in range(depth + 1):
+        keys = code >> (ndim * (depth - level))
+        start = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        end = np.r_[start[1:], n]
+        count = (end - start).astype(float)
+        com = np.add.reduceat(Ys, start, axis=0).T / count
+        levels.append([start, end, count, com])
+    for level in range(depth):
+        child = levels[level + 1][0]
+        levels[level] += [np.searchsorted(child, levels[level][0]),
+                          np.searchsorted(child, levels[level][1])]
+    return order, width, levels
+
+
+def repulsion(Y, theta=0.5, depth=None, chunk_size=1024):
+    """Function that approximates, for every point i, the sums over the other
+    points j of num_ij = (1 + ||y_i - y_j||^2)^-1 and of
+    num_ij^2 (y_i - y_j), in O(n log n).
+
+    Every point walks down the tree, one level at a time for all the points
+    of a chunk at once. A cell whose width is below theta times its distance
+    to the point counts as all of its points at its center of mass, and the
+    other cells are opened. The coordinates are kept one dimension per
+    array, and selected with take, which is several times faster than
+    indexing rows of an (n, ndim) array.
+
+    Args:
+        Y (numpy.ndarray): Tensor of shape (n, ndim) containing the points.
+        theta (float, optional): The accuracy of the approximation, 0 being
+            exact. Defaults to 0.5.
+        depth (int, optional): The number of levels of the tree, points
+            closer than the width of a cell of the last level being counted
+            at their center of mass. Defaults to None, which uses
+            log2(n) + 8 levels, at most 62 / ndim.
+        chunk_size (int, optional): The number of points walking down the
+            tree at once. Defaults to 1024.
+
+    Returns:
+        rep (numpy.ndarray): Tensor of shape (n, ndim) containing the sums of
+            num_ij^2 (y_i - y_j).
+        Z (float): The sum of num_ij over every pair i != j.
+    """
+    n, ndim = Y.shape
+    if depth is None:
+        depth = min(int(np.log2(max(n, 2))) + 8, 62 // ndim)
+    order, width, levels = build_tree(Y, depth)
+    Ys = np.ascontiguousarray(Y[order].T)
+    rep = np.zeros((ndim, n))
+    Zs = np.zeros(n)
+
+    for first in range(0, n, chunk_size):
+        m = min(chunk_size, n - first)
+        points = np.arange(m)
+        nodes = np.zeros(m, dtype=np.intp)
+        for level, cells in enumerate(levels):
+            start, end, count, com = cells[:4]
+            if points.size == 0:
+                break
+            p = points + first
+            diff = [Ys[j].take(p) - com[j].take(nodes) for j in range(ndim)]
+            d2 = sum(d * d for d in diff)
+            inside = (start.take(nodes) <= p) & (p < end.take(nodes))
+            counts = count.take(nodes)
+            w = width / 2 ** level
+            done = ~inside & ((w * w < theta * theta * d2) | (counts == 1))
+            if level == depth:
+                # The cells of the last level are never opened, and the point
+                # may share its cell with duplicates, which are counted at
+                # their center of mass without the point itself
+                dup = inside & (counts > 1)
+                scale = np.where(dup, counts / np.maximum(counts - 1, 1), 1)
+                diff = [d * scale for d in diff]
+                d2 = sum(d * d for d in diff)
+                counts = counts - dup
+                done = ~inside | dup
+            idx = np.flatnonzero(done)
+            owner = points.take(idx)
+            q = 1 / (1 + d2.take(idx))
+            weight = counts.take(idx) * q
+            Zs[first:first + m] += np.bincount(owner, weights=weight,
+                                               minlength=m)
+            weight *= q
+            for j in range(ndim):
+                rep[j, first:first + m] += np.bincount(
+                    owner, weights=weight * diff[j].take(idx), minlength=m)
+            if level == depth:
+                break
+
+            # The cells that are neither counted nor the point alone are
+            # replaced by their children
+            idx = np.flatnonzero(~done & ~(inside & (counts == 1)))
+            points, nodes = points.take(idx), nodes.take(idx)
+            first_child = cells[4].take(nodes)
+            fanout = cells[5].take(nodes) - first_child
+            offsets = np.arange(np.sum(fanout)) - np.repeat(
+                np.cumsum(fanout) - fanout, fanout)
+            points = np.repeat(points, fanout)
+            nodes = np.repeat(first_child, fanout) + offsets
+
+    out = np.empty((n, ndim))
+    out[order] = rep.T
+    return out, float(np.sum(Zs))
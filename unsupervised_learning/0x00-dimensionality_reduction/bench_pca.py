@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Module that compares the time and peak memory of the pca solvers and of
+IncrementalPCA over a memory-mapped file, on low-rank data with noise.
+
+Usage: ./bench_pca.py [n d]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+pca = __import__('1-pca').pca
+IncrementalPCA = __import__('9-incremental_pca').IncrementalPCA
+
+
+def original(X, ndim):
+    """The pca of 1-pca before the solvers, with the full (n, n) U"""
+    X_m = X - np.mean(X, axis=0)
+    u, s, vh = np.linalg.svd(X_m)
+    return X_m @ vh.T[:, :ndim]
+
+
+def incremental(filename, ndim):
+    """IncrementalPCA over the memory-mapped file"""
+    X = np.load(filename, mmap_mode='r')
+    model = IncrementalPCA(ndim, batch_size=2000).fit(X)
+    return np.concatenate([model.transform(X[i:i + 2000])
+                           for i in range(0, X.shape[0], 2000)])
+
+
+def measure(function, *args):
+    """Returns the seconds and peak MB allocated by function(*args)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    shapes = [(4000, 500), (20000, 500), (200000, 500)]
+    if len(sys.argv) > 2:
+        shapes = [(int(sys.argv[1]), int(sys.argv[2]))]
+    ndim = 50
+    np.random.seed(0)
+
+    print("{:>8} {:>6} {:>12} {:>10} {:>12}".format(
+        'n', 'd', 'solver', 'seconds', 'peak MB'))
+    for n, d in shapes:
+        X = np.random.randn(n, 100) @ np.random.randn(100, d)
+        X += np.random.randn(n, d)
+        filename = os.path.join(tempfile.mkdtemp(), 'X.npy')
+        np.save(filename, X)
+        runs = [('full', pca, X, ndim, 'full'),
+                ('randomized', pca, X, ndim, 'randomized'),
+                ('incremental', incremental, filename, ndim)]
+        # The original keeps the (n, n) U, 8 n^2 bytes
+        if 8 * n * n < 2 ** 30:
+            runs.insert(0, ('original', original, X, ndim))
+        for name, function, *args in runs:
+            elapsed, peak = measure(function, *args)
+            print("{:>8} {:>6} {:>12} {:>10.2f} {:>12.0f}".format(
+                n, d, name, elapsed, peak))
+        os.remove(filename)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Module that times the affinities and the gradient of t-SNE, exact and with
+kNN affinities and Barnes-Hut gradients, on blobs of 50 dimensions.
+
+Usage: ./bench_tsne.py [n ...]
+"""
+
+import sys
+import time
+import numpy as np
+P_affinities = __import__('4-P_affinities').P_affinities
+grads = __import__('6-grads').grads
+
+
+def blobs(n, d, k=10):
+    """Samples n points of d dimensions around k centers"""
+    centers = np.random.randn(k, d) * 4
+    return centers[np.random.randint(0, k, n)] + np.random.randn(n, d)
+
+
+if __name__ == '__main__':
+    sizes = [int(n) for n in sys.argv[1:]] or [2500, 10000, 100000]
+    np.random.seed(0)
+
+    print("{:>8} {:>12} {:>12} {:>12}".format(
+        'points', 'method', 'P (s)', 's/iteration'))
+    for n in sizes:
+        X = blobs(n, 50)
+        Y = np.random.randn(n, 2)
+        methods = ['exact', 'barnes_hut'] if n <= 10000 else ['barnes_hut']
+        for method in methods:
+            start = time.perf_counter()
+            if method == 'exact':
+                P = P_affinities(X)
+            else:
+                P = P_affinities(X, neighbors=90).tocoo()
+            affinities = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(3):
+                grads(Y, P)
+            elapsed = (time.perf_counter() - start) / 3
+            print("{:>8} {:>12} {:>12.2f} {:>12.3f}".format(
+                n, method, affinities, elapsed))
@@ -5,7 +5,7 @@ centroids for K-means."""
 import numpy as np
 
 
-def initialize(X, k):
+def initialize(X, k, method='uniform'):
     """Function that initializes cluster centroids for K-means.
 
     Args:
@@ -13,6 +13,10 @@ def initialize(X, k):
             that will be used for K-means clustering, where n is the number of
             data points and d is the number of dimensions for each data point.
         k (int): The number of clusters.
+        method (str, optional): 'uniform' to draw the centroids uniformly
+            within the bounds of X, or 'kmeans++' to pick data points, each
+            with a probability proportional to its squared distance from the
+            closest centroid already picked. Defaults to 'uniform'.
 
     Returns:
         centroids (numpy.ndarray): Tensor of shape (k, d) containing the
@@ -20,15 +24,60 @@ def initialize(X, k):
         None on failure.
     """
     if (not isinstance(X, np.ndarray) or not isinstance(k, int) or k <= 0 or
-            len(X.shape) != 2 or k > X.shape[0]):
+            len(X.shape) != 2 or k > X.shape[0] or
+            method not in ('uniform', 'kmeans++')):
         return None
     n, d = X.shape
+    if method == 'kmeans++':
+        return kmeans_plus_plus(X, k)
     low = X.min(axis=0)
     high = X.max(axis=0)
     centroids = np.random.uniform(low=low, high=high, size=(k, d))
     return centroids
 
 
+def kmeans_plus_plus(X, k, chunk_size=None):
+    """Function that picks k-means++ centroids among the data points.
+
+    The squared distances are computed chunk_size points at a time, so apart
+    from the (n,) distances the memory used does not grow with n.
+
+    Args:
+        X (numpy.ndarray): A tensor of shape (n, d) containing the dataset.
+        k (int): The number of clusters.
+        chunk_size (int, optional): The number of points per chunk. Defaults
+            to None, which uses chunks of about 2^20 values.
+
+    Returns:
+        centroids (numpy.ndarray): Tensor of shape (k, d) containing the
+            initialized centroids for each cluster
+    """
+    n, d = X.shape
+    if chunk_size is None:
+        chunk_size = max(1, 2 ** 20 // d)
+    centroids = np.empty((k, d))
+    centroids[0] = X[np.random.randint(n)]
+    closest = np.full(n, np.inf)
+
+    for j in range(1, k):
+        # Squared distance to the closest centroid picked so far
+        for start in range(0, n, chunk_size):
+            diff = X[start:start + chunk_size] - centroids[j - 1]
+            np.minimum(closest[start:start + chunk_size],
+                       np.einsum('ij,ij->i', diff, diff),
+                       out=closest[start:start + chunk_size])
+        cumulative = np.cumsum(closest)
+        if cumulative[-1] > 0:
+            pick = np.searchsorted(cumulative,
+                                   np.random.uniform() * cumulative[-1],
+                                   side='right')
+        else:
+            # Every point is already a centroid
+            pick = np.random.randint(n)
+        centroids[j] = X[min(pick, n - 1)]
+    return centroids
+
+
 if __name__ == "__main__":
     # matplotlib.pyplot as plt
 
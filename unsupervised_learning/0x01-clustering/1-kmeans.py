@@ -3,9 +3,52 @@
 dataset."""
 
 import numpy as np
+initialize = __import__('0-initialize').initialize
 
 
-def kmeans(X, k, iterations=1000):
+def closest(X, C, chunk_size=None):
+    """Function that finds the closest centroid to each data point.
+
+    The squared distances are expanded as ||x||^2 - 2x.c + ||c||^2 and
+    computed chunk_size points at a time, so only a (chunk_size, k) block of
+    them is in memory at once.
+
+    Args:
+        X (numpy.ndarray): A tensor of shape (n, d) containing the dataset.
+        C (numpy.ndarray): A tensor of shape (k, d) containing the centroids.
+        chunk_size (int, optional): The number of points per chunk. Defaults
+            to None, which uses chunks of about 2^20 distances.
+
+    Returns:
+        clss (numpy.ndarray): A tensor of shape (n,) containing the index of
+            the closest centroid to each data point.
+        dist (numpy.ndarray): A tensor of shape (n,) containing the squared
+            distance to it.
+    """
+    n = X.shape[0]
+    k = C.shape[0]
+    if chunk_size is None:
+        chunk_size = max(1, 2 ** 20 // k)
+    C_norms = np.einsum('ij,ij->i', C, C)
+    clss = np.empty(n, dtype=int)
+    dist = np.empty(n)
+    block = np.empty((min(chunk_size, n), k))
+
+    for start in range(0, n, chunk_size):
+        chunk = X[start:start + chunk_size]
+        end = start + chunk.shape[0]
+        scores = block[:chunk.shape[0]]
+        np.matmul(chunk, C.T, out=scores)
+        scores *= -2
+        scores += C_norms
+        clss[start:end] = np.argmin(scores, axis=1)
+        dist[start:end] = scores[np.arange(chunk.shape[0]), clss[start:end]]
+        dist[start:end] += np.einsum('ij,ij->i', chunk, chunk)
+    np.maximum(dist, 0, out=dist)
+    return clss, dist
+
+
+def kmeans(X, k, iterations=1000, init='uniform'):
     """Function that performs K-means on a dataset.
 
     Args:
@@ -15,6 +58,8 @@ def kmeans(X, k, iterations=1000):
         k (int): The number of clusters.
         iterations (int, optional): The maximum number of iterations that
             should be performed. Defaults to 1000.
+        init (str, optional): The initialization method of the centroids,
+            'uniform' or 'kmeans++'. Defaults to 'uniform'.
 
     Returns:
         C (numpy.ndarray) A tensor of shape (k, d) containing the centroid
@@ -25,35 +70,32 @@ def kmeans(X, k, iterations=1000):
     """
     if (not isinstance(X, np.ndarray) or not isinstance(k, int) or k <= 0 or
             len(X.shape) != 2 or k > X.shape[0] or
-            not isinstance(iterations, int) or iterations <= 0):
+            not isinstance(iterations, int) or iterations <= 0 or
+            init not in ('uniform', 'kmeans++')):
         return None, None
 
     # Initialize centroids
     n, d = X.shape
     low = X.min(axis=0)
     high = X.max(axis=0)
-    centroids = np.random.uniform(low=low, high=high, size=(k, d))
+    centroids = initialize(X, k, init)
 
-    for i in range(iterations):
-        # Calculate distance between centroids and data points
-        diffrence = (X - centroids[:, None, :])  # (k, n, d)
-        dist = np.linalg.norm(diffrence, axis=2).T  # (n, k)
-        # Seperate into clusters
-        clss = np.argmin(dist, axis=1)
-        labeled = np.concatenate((X.copy(), np.reshape(clss, (n, 1))), axis=1)
+    # Seperate into clusters
+    clss, _ = closest(X, centroids)
 
+    for i in range(iterations):
         # Calculate the means of each cluster
+        counts = np.bincount(clss, minlength=k)
         C = np.empty((k, d))
-        for j in range(k):
-            temp = labeled[labeled[:, -1] == j]
-            temp = temp[:, :d]
-            if temp.size == 0:
-                re_init = np.random.uniform(low=low, high=high, size=(1, d))
-                C[j] = re_init
-            else:
-                C[j] = np.mean(temp, axis=0)
+        for j in range(d):
+            C[:, j] = np.bincount(clss, weights=X[:, j], minlength=k)
+        empty = counts == 0
+        np.divide(C, counts[:, np.newaxis], out=C, where=~empty[:, None])
+        for j in np.where(empty)[0]:
+            C[j] = np.random.uniform(low=low, high=high, size=(1, d))
+
         # Recalculate clss
-        clss = np.argmin(np.linalg.norm((X - C[:, None, :]), axis=2).T, axis=1)
+        clss, _ = closest(X, C)
 
         # Check for change
         if np.array_equal(centroids, C):
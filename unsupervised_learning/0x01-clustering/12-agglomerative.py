@@ -2,28 +2,113 @@
 """Module that contains the function agglomerative that performs agglomerative
 clustering on a dataset."""
 
+import numpy as np
 import scipy.cluster.hierarchy
 import matplotlib.pyplot as plt
+MiniBatchKMeans = __import__('13-minibatch_kmeans').MiniBatchKMeans
 
 
-def agglomerative(X, dist):
+def ward(C, counts):
+    """Function that performs Ward linkage on clusters given by their
+    centroids and sizes.
+
+    The squared Ward distance of clusters i and j is
+    2 n_i n_j / (n_i + n_j) |c_i - c_j|^2, which is the euclidean distance
+    for single points, and is updated after each merge with the
+    Lance-Williams formula, so only the (m, m) distances are kept.
+
+    Args:
+        C (numpy.ndarray): A tensor of shape (m, d) containing the centroids.
+        counts (numpy.ndarray): A tensor of shape (m,) containing the number
+            of data points of each cluster.
+
+    Returns:
+        Z (numpy.ndarray): The linkage matrix of shape (m - 1, 4), in the
+            format of scipy.cluster.hierarchy, where the last column counts
+            the clusters, not the data points, that were merged.
+    """
+    m = C.shape[0]
+    sizes = counts.astype(float)
+    norms = np.einsum('ij,ij->i', C, C)
+    D = norms[:, np.newaxis] - 2 * (C @ C.T) + norms
+    np.maximum(D, 0, out=D)
+    D *= 2 * np.outer(sizes, sizes) / np.add.outer(sizes, sizes)
+    np.fill_diagonal(D, np.inf)
+    ids = np.arange(m)
+    leaves = np.ones(m)
+    Z = np.empty((m - 1, 4))
+
+    for step in range(m - 1):
+        i, j = np.unravel_index(np.argmin(D), D.shape)
+        i, j = min(i, j), max(i, j)
+        d_ij = D[i, j]
+        Z[step] = (min(ids[i], ids[j]), max(ids[i], ids[j]), np.sqrt(d_ij),
+                   leaves[i] + leaves[j])
+
+        # d(k, i+j)^2 = ((n_k + n_i) d(k, i)^2 + (n_k + n_j) d(k, j)^2
+        #               - n_k d(i, j)^2) / (n_k + n_i + n_j)
+        total = sizes + sizes[i] + sizes[j]
+        merged = ((sizes + sizes[i]) * D[i] + (sizes + sizes[j]) * D[j] -
+                  sizes * d_ij) / total
+        merged[i] = np.inf
+        D[i] = merged
+        D[:, i] = merged
+        D[j] = np.inf
+        D[:, j] = np.inf
+        sizes[i] += sizes[j]
+        leaves[i] += leaves[j]
+        ids[i] = m + step
+    return Z
+
+
+def agglomerative(X, dist, plot=True, micro_clusters=None):
     """Function that performs agglomerative clustering on a dataset.
 
     Args:
         X (numpy.ndarray): A tensor of shape (n, d) containing the dataset.
         dist (int): The maximum cophenetic distance for all clusters.
+        plot (bool, optional): Defines whether or not to show the dendrogram.
+            Defaults to True.
+        micro_clusters (int, optional): For large datasets, the number of
+            micro-clusters the data points are first grouped into with
+            mini-batch K-means, fit on the data points in a random order,
+            before Ward linkage on their centroids. This keeps the memory to
+            (micro_clusters, micro_clusters) distances instead of (n, n).
+            Defaults to None, which links the data points themselves.
 
     Returns:
         clss (numpy.ndarray): A tensor of shape (n,) containing the cluster
             indices for each data point.
     """
     hierarchy = scipy.cluster.hierarchy
-    Z = hierarchy.ward(X)
-    clss = hierarchy.fcluster(Z=Z, t=dist, criterion="distance")
+    if micro_clusters is None or micro_clusters >= X.shape[0]:
+        Z = hierarchy.ward(X)
+        clss = hierarchy.fcluster(Z=Z, t=dist, criterion="distance")
+    else:
+        model = MiniBatchKMeans(micro_clusters,
+                                batch_size=max(1024, 3 * micro_clusters))
+        # X may be ordered, so its chunks are drawn in a random order
+        order = np.random.permutation(X.shape[0])
+        model.fit(X[order[start:start + model.batch_size]]
+                  for start in range(0, X.shape[0], model.batch_size))
+        micro = model.predict(X)
+        counts = np.bincount(micro, minlength=micro_clusters)
+        used = counts > 0
+        C = np.empty((micro_clusters, X.shape[1]))
+        for j in range(X.shape[1]):
+            C[:, j] = np.bincount(micro, weights=X[:, j],
+                                  minlength=micro_clusters)
+        C = C[used] / counts[used, np.newaxis]
+        Z = ward(C, counts[used])
+        # Labels of the micro-clusters, mapped back to their data points
+        labels = np.zeros(micro_clusters, dtype=int)
+        labels[used] = hierarchy.fcluster(Z=Z, t=dist, criterion="distance")
+        clss = labels[micro]
 
-    plt.figure()
-    hierarchy.dendrogram(Z, color_threshold=dist)
-    plt.show()
+    if plot:
+        plt.figure()
+        hierarchy.dendrogram(Z, color_threshold=dist)
+        plt.show()
 
     return clss
 
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Module that contains the class MiniBatchKMeans that performs K-means on a
+stream of data points."""
+
+import numpy as np
+kmeans = __import__('1-kmeans').kmeans
+closest = __import__('1-kmeans').closest
+
+
+class MiniBatchKMeans():
+    """Class that performs K-means on data points arriving in chunks, so the
+    whole dataset never needs to be in memory.
+
+    Each centroid has its own learning rate, 1 / (number of points assigned
+    to it so far), which makes it the running mean of every point it has
+    been assigned. The centroids start from the best of n_init runs of
+    kmeans on the first chunk, since a centroid that starts in the wrong
+    place moves less and less.
+
+    The chunks are assumed to be drawn from the whole dataset, as when it is
+    shuffled. On an ordered or drifting stream the first chunk only covers
+    part of the data, so, as sklearn does with its reassignment_ratio, every
+    10 k points the centroids that were assigned fewer than
+    reassignment_ratio times the points of the largest one move to random
+    points of the chunk. This recovers empty and starved centroids, but the
+    result still depends on the order of the stream.
+
+    On a shuffled stream its inertia is expected within 0.1% of that of
+    kmeans when both reach the same local minimum, which
+    bench_minibatch_kmeans.py measures."""
+
+    def __init__(self, k, batch_size=1024, init='kmeans++', n_init=3,
+                 reassignment_ratio=0.01):
+        """Class constructor
+
+        Args:
+            k (int): The number of clusters.
+            batch_size (int, optional): The number of points fit at once by
+                fit. Defaults to 1024.
+            init (str, optional): The initialization method of the
+                centroids from the first chunk, 'uniform' or 'kmeans++'.
+                Defaults to 'kmeans++'.
+            n_init (int, optional): The number of runs of kmeans on the
+                first chunk. Defaults to 3.
+            reassignment_ratio (float, optional): The fraction of the points
+                of the largest centroid below which a centroid is moved to a
+                point of the chunk. 0 never moves them. Defaults to 0.01.
+        """
+        if not isinstance(k, int):
+            raise TypeError("k must be an integer")
+        elif k < 1:
+            raise ValueError("k must be a positive integer")
+        elif not isinstance(batch_size, int):
+            raise TypeError("batch_size must be an integer")
+        elif batch_size < k:
+            raise ValueError("batch_size must be at least k")
+        elif init not in ('uniform', 'kmeans++'):
+            raise ValueError("init must be 'uniform' or 'kmeans++'")
+        elif not isinstance(n_init, int):
+            raise TypeError("n_init must be an integer")
+        elif n_init < 1:
+            raise ValueError("n_init must be a positive integer")
+        elif not isinstance(reassignment_ratio, (int, float)):
+            raise TypeError("reassignment_ratio must be a number")
+        elif reassignment_ratio < 0:
+            raise ValueError("reassignment_ratio must be positive")
+        self.__k = k
+        self.__batch_size = batch_size
+        self.__init = init
+        self.__n_init = n_init
+        self.__reassignment_ratio = reassignment_ratio
+        self.__since_reassign = 0
+        self.__C = None
+        self.__counts = np.zeros(k)
+
+    @property
+    def k(self):
+        """Getter for self.__k"""
+        return self.__k
+
+    @property
+    def batch_size(self):
+        """Getter for self.__batch_size"""
+        return self.__batch_size
+
+    @property
+    def C(self):
+        """Getter for self.__C"""
+        return self.__C
+
+    @property
+    def counts(self):
+        """Getter for self.__counts"""
+        return self.__counts
+
+    def partial_fit(self, X):
+        """Function that updates the centroids with a chunk of data points.
+
+        Args:
+            X (numpy.ndarray): A tensor of shape (m, d) containing the chunk.
+                The first chunk needs at least k points to initialize the
+                centroids.
+
+        Returns:
+            The squared distance the centroids moved, summed over them.
+        """
+        if not isinstance(X, np.ndarray) or X.ndim != 2:
+            raise TypeError("X must be a numpy.ndarray of shape (m, d)")
+        X = np.asarray(X, dtype=float)
+        if self.__C is None:
+            if X.shape[0] < self.__k:
+                raise ValueError("the first chunk must have at least k points")
+            best = np.inf
+            for _ in range(self.__n_init):
+                C, _ = kmeans(X, self.__k, 100, self.__init)
+                inertia = np.sum(closest(X, C)[1])
+                if inertia < best:
+                    best = inertia
+                    self.__C = C
+        elif X.shape[1] != self.__C.shape[1]:
+            raise ValueError("X must have {} dimensions"
+                             .format(self.__C.shape[1]))
+        if X.shape[0] == 0:
+            return 0.0
+
+        k, d = self.__C.shape
+        clss, _ = closest(X, self.__C)
+        counts = np.bincount(clss, minlength=k)
+        sums = np.empty((k, d))
+        for j in range(d):
+            sums[:, j] = np.bincount(clss, weights=X[:, j], minlength=k)
+
+        # c += (sum(x) - m c) / count, the same as updating c with each of
+        # its m points x in turn with a learning rate of 1 / count
+        self.__counts += counts
+        seen = self.__counts > 0
+        step = sums - counts[:, np.newaxis] * self.__C
+        np.divide(step, self.__counts[:, np.newaxis], out=step,
+                  where=seen[:, np.newaxis])
+        step[~seen] = 0
+        self.__C += step
+        shift = float(np.sum(np.square(step)))
+
+        # Move the starved centroids to random points of the chunk, at most
+        # half of them, and give them the count of the smallest other one
+        self.__since_reassign += X.shape[0]
+        if self.__reassignment_ratio > 0 and self.__since_reassign >= 10 * k:
+            self.__since_reassign = 0
+            low = self.__counts < (self.__reassignment_ratio *
+                                   np.max(self.__counts))
+            if np.sum(low) > X.shape[0] // 2:
+                low[np.argsort(self.__counts)[X.shape[0] // 2:]] = False
+            if low.any() and not low.all():
+                picks = np.random.choice(X.shape[0], np.sum(low),
+                                         replace=False)
+                shift += float(np.sum(np.square(X[picks] - self.__C[low])))
+                self.__C[low] = X[picks]
+                self.__counts[low] = np.min(self.__counts[~low])
+        return shift
+
+    def fit(self, data, epochs=1, tol=None):
+        """Function that updates the centroids with every chunk of a dataset.
+
+        Args:
+            data: A tensor of shape (n, d), such as a numpy.memmap, read
+                batch_size points at a time, the filename of such a tensor
+                saved with numpy.save, which is memory-mapped, or an iterable
+                of tensors of shape (m, d), such as a generator.
+            epochs (int, optional): The number of passes over a tensor or
+                file. An iterable is only passed over once. Defaults to 1.
+            tol (float, optional): Stop once a chunk moves the centroids by
+                a summed squared distance below tol. Defaults to None.
+
+        Returns:
+            self
+        """
+        if not isinstance(epochs, int):
+            raise TypeError("epochs must be an integer")
+        elif epochs < 1:
+            raise ValueError("epochs must be a positive integer")
+        if isinstance(data, str):
+            data = np.load(data, mmap_mode='r')
+        chunks = data
+        if isinstance(data, np.ndarray):
+            chunks = (data[start:start + self.__batch_size]
+                      for _ in range(epochs)
+                      for start in range(0, data.shape[0], self.__batch_size))
+        for chunk in chunks:
+            started = self.__C is not None
+            shift = self.partial_fit(np.asarray(chunk))
+            if (tol is not None and started and shift < tol and
+                    self.__counts.all()):
+                break
+        return self
+
+    def predict(self, X):
+        """Function that finds the cluster of data points.
+
+        Args:
+            X (numpy.ndarray): A tensor of shape (n, d) containing the data
+                points.
+
+        Returns:
+            clss (numpy.ndarray) A tensor of shape (n,) containing the index
+                of the cluster in C that each data point belongs to.
+        """
+        if self.__C is None:
+            raise ValueError("partial_fit must be called before predict")
+        clss, _ = closest(np.asarray(X), self.__C)
+        return clss
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    a = np.random.multivariate_normal([30, 40], [[16, 0], [0, 16]], size=5000)
+    b = np.random.multivariate_normal([10, 25], [[16, 0], [0, 16]], size=5000)
+    c = np.random.multivariate_normal([40, 20], [[16, 0], [0, 16]], size=5000)
+    d = np.random.multivariate_normal([60, 30], [[16, 0], [0, 16]], size=5000)
+    e = np.random.multivariate_normal([20, 70], [[16, 0], [0, 16]], size=5000)
+    X = np.concatenate((a, b, c, d, e), axis=0)
+    np.random.shuffle(X)
+    model = MiniBatchKMeans(5, batch_size=500).fit(X, epochs=2)
+    print(model.C[np.argsort(model.C[:, 0])])
+    print(np.bincount(model.predict(X)))
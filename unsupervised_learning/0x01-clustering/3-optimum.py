@@ -5,9 +5,26 @@ number of clusters by variance."""
 import numpy as np
 kmeans = __import__('1-kmeans').kmeans
 variance = __import__('2-variance').variance
+sweep = __import__('parallel_sweep').sweep
 
 
-def optimum_k(X, kmin=1, kmax=None, iterations=1000):
+def fit_kmeans(X, k, iterations):
+    """Function that performs K-means and calculates its variance.
+
+    Args:
+        X (numpy.ndarray): A tensor of shape (n, d) containing the data set.
+        k (int): The number of clusters.
+        iterations (int): The maximum number of iterations for K-means.
+
+    Returns:
+        The centroids, the clusters of the data points and the variance.
+    """
+    C, clss = kmeans(X, k, iterations)
+    return C, clss, variance(X, C)
+
+
+def optimum_k(X, kmin=1, kmax=None, iterations=1000, restarts=1,
+              workers=None):
     """Function that tests for the optimum number of clusters by variance.
 
     Args:
@@ -18,6 +35,12 @@ def optimum_k(X, kmin=1, kmax=None, iterations=1000):
             (inclusive). Defaults to None.
         iterations (int, optional): The maximum number of iterations for
             K-means. Defaults to 1000.
+        restarts (int, optional): The number of times K-means is performed
+            for each cluster size, keeping the one with the lowest variance.
+            Defaults to 1.
+        workers (int, optional): The number of processes the cluster sizes
+            are split across. Defaults to None, which runs them in this
+            process.
 
     Returns:
         results (list): A list containing the outputs of K-means for each
@@ -33,19 +56,21 @@ def optimum_k(X, kmin=1, kmax=None, iterations=1000):
             len(X.shape) != 2) or iterations <= 0:
         return None, None
 
+    if (not isinstance(restarts, int) or restarts <= 0 or
+            (workers is not None and
+             (not isinstance(workers, int) or workers <= 0))):
+        return None, None
+
     if not kmax:
         kmax = X.shape[0]
 
     if not isinstance(kmin, int) or kmin >= kmax or kmin <= 0:
         return None, None
 
-    results = []
-    d_vars = []
-
-    for k in range(kmin, kmax + 1):
-        C, clss = kmeans(X, k, iterations)
-        results.append((C, clss))
-        d_vars.append(variance(X, C))
+    fits = sweep(fit_kmeans, X, range(kmin, kmax + 1), (iterations,),
+                 restarts, workers, score=lambda fit: -fit[2])
+    results = [(C, clss) for C, clss, _ in fits]
+    d_vars = [var for _, _, var in fits]
 
     d_vars = [d_vars[0] - x for x in d_vars]
 
@@ -6,12 +6,16 @@ import numpy as np
 kmeans = __import__('1-kmeans').kmeans
 
 
-def initialize(X, k):
+def initialize(X, k, covariance_type='full'):
     """Function that initializes variables for a Gaussian Mixture Model.
 
     Args:
         X (numpy.ndarray): A tensor of shape (n, d) containing the data set.
         k (int): The number of clusters.
+        covariance_type (str, optional): 'full' for one (d, d) matrix per
+            cluster, 'diag' for one (d,) variance per dimension per cluster,
+            'tied' for one (d, d) matrix shared by the clusters, or
+            'spherical' for one variance per cluster. Defaults to 'full'.
 
     Returns:
         pi (numpy.ndarray): A tensor of shape (k,) containing the priors for
@@ -20,16 +24,26 @@ def initialize(X, k):
             means for each cluster, initialized with K-means.
         S (numpy.ndarray): A tensor of shape (k, d, d) containing the
             covariance matrices for each cluster, initialized as identity
-            matrices.
+            matrices, or of shape (k, d), (d, d) or (k,) filled with ones on
+            the diagonal for the 'diag', 'tied' and 'spherical' types.
         None, None, None on failure.
     """
     if (not isinstance(X, np.ndarray) or not isinstance(k, int) or
-            k <= 0 or len(X.shape) != 2):
+            k <= 0 or len(X.shape) != 2 or
+            covariance_type not in ('full', 'diag', 'tied', 'spherical')):
         return None, None, None
 
     pi = np.ones(k) / k
     m = kmeans(X, k)[0]
-    S = np.repeat(np.identity(X.shape[1])[None, :, :], k, axis=0)
+    d = X.shape[1]
+    if covariance_type == 'diag':
+        S = np.ones((k, d))
+    elif covariance_type == 'tied':
+        S = np.identity(d)
+    elif covariance_type == 'spherical':
+        S = np.ones(k)
+    else:
+        S = np.repeat(np.identity(d)[None, :, :], k, axis=0)
     return pi, m, S
 
 
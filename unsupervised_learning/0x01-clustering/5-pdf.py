@@ -3,6 +3,97 @@
 density function of a Gaussian distribution."""
 
 import numpy as np
+import scipy.linalg
+
+
+def covariance_shape(k, d, covariance_type='full'):
+    """Function that returns the shape of the covariances of a GMM.
+
+    Args:
+        k (int): The number of clusters.
+        d (int): The number of dimensions.
+        covariance_type (str, optional): 'full' for one (d, d) matrix per
+            cluster, 'diag' for one (d,) variance per dimension per cluster,
+            'tied' for one (d, d) matrix shared by the clusters, or
+            'spherical' for one variance per cluster. Defaults to 'full'.
+
+    Returns:
+        The shape of the covariances, or None for an unknown type.
+    """
+    return {'full': (k, d, d), 'diag': (k, d), 'tied': (d, d),
+            'spherical': (k,)}.get(covariance_type)
+
+
+def log_pdf(X, m, S, covariance_type='full'):
+    """Function that calculates the log of the probability density function
+    of several Gaussian distributions at once.
+
+    Each full covariance is Cholesky-factored as S = L L.T, so the
+    Mahalanobis distances come from triangular solves and the log of the
+    determinant from the diagonal of L, without computing a determinant that
+    underflows in high dimensions. Diagonal and spherical covariances only
+    need the products of the data with the scaled means.
+
+    Args:
+        X (numpy.ndarray): A tensor of shape (n, d) containing the data points
+            whose PDF should be evaluated.
+        m (numpy.ndarray): A tensor of shape (k, d) containing the means of
+            the distributions.
+        S (numpy.ndarray): A tensor containing the covariances of the
+            distributions, of the shape given by covariance_shape.
+        covariance_type (str, optional): 'full', 'diag', 'tied' or
+            'spherical'. Defaults to 'full'.
+
+    Returns:
+        P (numpy.ndarray): A tensor of shape (k, n) containing the log of the
+            PDF values of each distribution for each data point.
+        None on failure, including a covariance that is not positive definite.
+    """
+    if (not isinstance(X, np.ndarray) or X.ndim != 2 or
+            not isinstance(m, np.ndarray) or m.ndim != 2 or
+            not isinstance(S, np.ndarray) or X.shape[1] != m.shape[1] or
+            S.shape != covariance_shape(*m.shape, covariance_type)):
+        return None
+
+    k = m.shape[0]
+    n, d = X.shape
+
+    if covariance_type in ('diag', 'spherical'):
+        if (S <= 0).any():
+            return None
+        var = S if covariance_type == 'diag' else \
+            np.repeat(S[:, np.newaxis], d, axis=1)
+        # (x-μ).T Σ**-1 (x-μ) = sum(x**2 / σ**2) - 2 x.(μ / σ**2)
+        #                       + sum(μ**2 / σ**2)
+        # taken about the mean of X so the terms do not cancel out
+        center = np.mean(X, axis=0)
+        X = X - center
+        m = m - center
+        P = (np.square(X) @ (1 / var).T).T
+        P -= 2 * ((m / var) @ X.T)
+        P += np.sum(np.square(m) / var, axis=1)[:, np.newaxis]
+        np.maximum(P, 0, out=P)
+        log_det = np.sum(np.log(var), axis=1)
+    else:
+        try:
+            L = np.linalg.cholesky(S)
+        except np.linalg.LinAlgError:
+            return None
+        if covariance_type == 'tied':
+            L = np.broadcast_to(L, (k, d, d))
+
+        # log |Σ| = 2 sum(log(diag(L)))
+        log_det = 2 * np.sum(np.log(np.diagonal(L, axis1=1, axis2=2)),
+                             axis=1)
+        P = np.empty((k, n))
+        for i in range(k):
+            # (x-μ).T Σ**-1 (x-μ) = |L**-1 (x-μ)|**2
+            Z = scipy.linalg.solve_triangular(L[i], (X - m[i]).T, lower=True,
+                                              check_finite=False)
+            np.einsum('ij,ij->j', Z, Z, out=P[i])
+    P += (d * np.log(2 * np.pi)) + log_det[:, np.newaxis]
+    P *= -0.5
+    return P
 
 
 def pdf(X, m, S):
@@ -33,18 +124,10 @@ def pdf(X, m, S):
     # P(x) =∑[i, k] ϕ_i N(x∣μ_i, Σ_i)
     # N(x∣μ_i, Σ_i) = (1 / sqrt(2π**K |Σ|))exp(-(1/2)(x-μ_i).T(Σ_i**-1)(x-μ_i)
     # ∑[i, k] ϕ_i = 1
-
-    d = X.shape[1]
-    μ = m[None, :]  # Mean
-    Σ = S  # Covariance
-    π = np.pi
-    X_μ = X - μ
-    determinant = np.linalg.det(Σ)  # |Σ|
-    inverse = np.linalg.inv(Σ)  # Σ ** -1
-    norm = 1 / (np.sqrt((((2 * π) ** (d)) * (determinant))))
-    res = np.exp(-0.5 * np.sum(((X_μ @ inverse) * X_μ), axis=1))  # sum to (n,)
-    pdf = (norm * res)
-    P = np.maximum(pdf, 1e-300)
+    log_P = log_pdf(X, m[np.newaxis], S[np.newaxis].astype(float))
+    if log_P is None:
+        return None
+    P = np.maximum(np.exp(log_P[0]), 1e-300)
     return P
 
 
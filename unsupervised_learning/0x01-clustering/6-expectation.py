@@ -3,10 +3,11 @@
 expectation step in the EM algorithm for a GMM."""
 
 import numpy as np
-pdf = __import__('5-pdf').pdf
+log_pdf = __import__('5-pdf').log_pdf
+covariance_shape = __import__('5-pdf').covariance_shape
 
 
-def expectation(X, pi, m, S):
+def expectation(X, pi, m, S, covariance_type='full'):
     """Function that calculates the expectation step in the EM algorithm for a
     GMM.
 
@@ -17,7 +18,10 @@ def expectation(X, pi, m, S):
         m (numpy.ndarray): A tensor of shape (k, d) containing the centroid
             means for each cluster.
         S (numpy.ndarray): A tensor of shape (k, d, d) containing the
-            covariance matrices for each cluster.
+            covariance matrices for each cluster, or of the shape given by
+            covariance_shape for the other covariance types.
+        covariance_type (str, optional): 'full', 'diag', 'tied' or
+            'spherical'. Defaults to 'full'.
 
     Returns:
         g (numpy.ndarray): A tensor of shape (k, n) containing the posterior
@@ -28,31 +32,29 @@ def expectation(X, pi, m, S):
     if (not isinstance(X, np.ndarray) or X.ndim != 2 or
             not isinstance(pi, np.ndarray) or pi.ndim != 1 or
             not isinstance(m, np.ndarray) or m.ndim != 2 or
-            not isinstance(S, np.ndarray) or S.ndim != 3 or
-            pi.shape[0] != m.shape[0] or m.shape[0] != S.shape[0] or
-            X.shape[1] != m.shape[1] or m.shape[1] != S.shape[1] or
-            S.shape[1] != S.shape[2] or pi.shape[0] > X.shape[0] or
+            not isinstance(S, np.ndarray) or
+            pi.shape[0] != m.shape[0] or X.shape[1] != m.shape[1] or
+            S.shape != covariance_shape(*m.shape, covariance_type) or
+            pi.shape[0] > X.shape[0] or
             not np.isclose(np.sum(pi), [1])[0]):
         return None, None
 
-    k = pi.shape[0]  # Clusters
-    n, d = X.shape  # Number and dimesions of datapoints.
-
-    g = np.empty((k, n))
-
-    for i in range(k):
-        # P(A|B) = P(B|A) * P(A) / P(B)
-        # Prior = Likelihood * Prior / Marginal(a.k.a. Evidence)
-        # pi[i] = P(A), P = P(B|A), sum(P * pi) = P(B)
-        likelihood = pdf(X, m[i], S[i])  # (n,)
-        prior = pi[i]  # (1,)
-        intersection = prior * likelihood  # (n,)
-        g[i] = intersection
+    # P(A|B) = P(B|A) * P(A) / P(B)
+    # Prior = Likelihood * Prior / Marginal(a.k.a. Evidence)
+    # pi[i] = P(A), P = P(B|A), sum(P * pi) = P(B), all kept as logs
+    likelihood = log_pdf(X, m, S, covariance_type)  # (k, n)
+    if likelihood is None:
+        return None, None
+    with np.errstate(divide='ignore'):
+        g = likelihood + np.log(pi)[:, np.newaxis]
 
+    # log(sum(exp(g))) over the clusters, shifted by the largest one
+    shift = np.max(g, axis=0, keepdims=True)
+    g -= shift
+    np.exp(g, out=g)
     marginal = np.sum(g, axis=0, keepdims=True)  # Marginal across cluster
     g /= marginal
-
-    log = np.sum(np.log(np.sum(marginal, axis=0)), axis=0)
+    log = np.sum(np.log(marginal) + shift)
     return g, log
 
 
@@ -5,7 +5,7 @@ maximization step in the EM algorithm for a GMM."""
 import numpy as np
 
 
-def maximization(X, g):
+def maximization(X, g, covariance_type='full'):
     """Function that calculates the maximization step in the EM algorithm for a
     GMM.
 
@@ -13,6 +13,10 @@ def maximization(X, g):
         X (numpy.ndarray): A tensor of shape (n, d) containing the data set.
         g (numpy.ndarray): A tensor of shape (k, n) containing the posterior
             probabilities for each data point in each cluster.
+        covariance_type (str, optional): 'full' for one (d, d) matrix per
+            cluster, 'diag' for one (d,) variance per dimension per cluster,
+            'tied' for one (d, d) matrix shared by the clusters, or
+            'spherical' for one variance per cluster. Defaults to 'full'.
 
     Returns:
         pi (numpy.ndarray) A tensor of shape (k,) containing the updated priors
@@ -20,30 +24,44 @@ def maximization(X, g):
         m (numpy.ndarray) A tensor of shape (k, d) containing the updated
             centroid means for each cluster.
         S (numpy.ndarray) A tensor of shape (k, d, d) containing the updated
-            covariance matrices for each cluster.
+            covariance matrices for each cluster, or of shape (k, d), (d, d)
+            or (k,) for the 'diag', 'tied' and 'spherical' types.
         None, None, None on failure.
     """
     if (not isinstance(X, np.ndarray) or X.ndim != 2 or
             not isinstance(g, np.ndarray) or g.ndim != 2 or
             X.shape[0] != g.shape[1] or
+            covariance_type not in ('full', 'diag', 'tied', 'spherical') or
             not np.isclose(np.sum(g, axis=0), np.ones(X.shape[0],)).all()):
         return None, None, None
 
     n, d = X.shape
-    k = g.shape[0]
-    pi = np.empty((k))
-    m = np.empty((k, d))
-    S = np.empty((k, d, d))
-
-    for i in range(k):
-        # g = γ, expected value, posterior probablity, W
-        sum_gi = np.sum(g[i], axis=0)
-        # pi = 1/n sum(g)
-        pi[i] = sum_gi / n
-        # mu = sum(g * X) / sum(g)
-        m[i] = np.sum(g[i, None, ...] @ X, axis=0) / sum_gi
-        # sigma = sum(g) * (X - mu)(X - mu).T / sum(g), summed in broadcast?
-        S[i] = ((g[i, None, ...] * (X - m[i]).T) @ (X - m[i])) / sum_gi
+    # g = γ, expected value, posterior probablity, W
+    sum_g = np.sum(g, axis=1)
+    # pi = 1/n sum(g)
+    pi = sum_g / n
+    # mu = sum(g * X) / sum(g)
+    m = (g @ X) / sum_g[:, np.newaxis]
+    # sigma = sum(g * (X - mu)(X - mu).T) / sum(g), which only needs sums of
+    # products of X, taken about the mean of X so the differences below do
+    # not cancel out
+    center = np.mean(X, axis=0)
+    X_c = X - center
+    m_c = m - center
+    if covariance_type == 'full':
+        S = np.einsum('kn,ni,nj->kij', g, X_c, X_c, optimize=True)
+        S /= sum_g[:, np.newaxis, np.newaxis]
+        S -= m_c[:, :, np.newaxis] * m_c[:, np.newaxis, :]
+    elif covariance_type == 'tied':
+        # sum(g * (X - mu)(X - mu).T) over all clusters / n
+        S = (X_c.T @ X_c) - ((m_c.T * sum_g) @ m_c)
+        S /= n
+    else:
+        # Diagonals of the full covariances
+        S = (g @ np.square(X_c)) / sum_g[:, np.newaxis] - np.square(m_c)
+        np.maximum(S, 0, out=S)
+        if covariance_type == 'spherical':
+            S = np.mean(S, axis=1)
 
     return pi, m, S
 
@@ -8,7 +8,8 @@ expectation = __import__('6-expectation').expectation
 maximization = __import__('7-maximization').maximization
 
 
-def expectation_maximization(X, k, iterations=1000, tol=1e-5, verbose=False):
+def expectation_maximization(X, k, iterations=1000, tol=1e-5, verbose=False,
+                             covariance_type='full'):
     """Function that performs the expectation maximization for a GMM.
 
     Args:
@@ -22,6 +23,10 @@ def expectation_maximization(X, k, iterations=1000, tol=1e-5, verbose=False):
             algorithm. Defaults to 1e-5.
         verbose (bool, optional): Determines if you should print information
             about the algorithm. Defaults to False.
+        covariance_type (str, optional): 'full' for one (d, d) matrix per
+            cluster, 'diag' for one (d,) variance per dimension per cluster,
+            'tied' for one (d, d) matrix shared by the clusters, or
+            'spherical' for one variance per cluster. Defaults to 'full'.
 
     Returns: pi, m, S, g, l, or None, None, None, None, None on failure
         pi (numpy.ndarray): A tensor of shape (k,) containing the priors for
@@ -29,7 +34,8 @@ def expectation_maximization(X, k, iterations=1000, tol=1e-5, verbose=False):
         m (numpy.ndarray): A tensor of shape (k, d) containing the centroid
             means for each cluster.
         S (numpy.ndarray): A tensor of shape (k, d, d) containing the
-            covariance matrices for each cluster.
+            covariance matrices for each cluster, or of shape (k, d), (d, d)
+            or (k,) for the 'diag', 'tied' and 'spherical' types.
         g (numpy.ndarray): A tensor of shape (k, n) containing the
             probabilities for each data point in each cluster.
         l (float): The log likelihood of the model.
@@ -43,14 +49,16 @@ def expectation_maximization(X, k, iterations=1000, tol=1e-5, verbose=False):
         return None, None, None, None, None
 
     n, d = X.shape
-    pi, m, S = initialize(X, k)
+    pi, m, S = initialize(X, k, covariance_type)
+    if pi is None:
+        return None, None, None, None, None
     l_prev = 0
 
     for i in range(iterations + 1):
         if i != 0:
             l_prev = log
-            pi, m, S = maximization(X, g)
-        g, log = expectation(X, pi, m, S)
+            pi, m, S = maximization(X, g, covariance_type)
+        g, log = expectation(X, pi, m, S, covariance_type)
         if g is None or log is None or pi is None or m is None or S is None:
             return None, None, None, None, None
         if verbose and (i % 10 == 0 or i == iterations or
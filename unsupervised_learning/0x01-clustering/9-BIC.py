@@ -4,9 +4,11 @@ for a GMM using the Bayesian Information Criterion."""
 
 import numpy as np
 expectation_maximization = __import__('8-EM').expectation_maximization
+sweep = __import__('parallel_sweep').sweep
 
 
-def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False):
+def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False,
+        restarts=1, workers=None, patience=None, covariance_type='full'):
     """Function that finds the best number of clusters for a GMM using the
     Bayesian Information Criterion.
 
@@ -22,6 +24,19 @@ def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False):
             for the EM algorithm. Defaults to 1e-5.
         verbose (bool, optional): A boolean that determines if the EM algorithm
             should print information to the standard output. Defaults to False.
+        restarts (int, optional): The number of times the EM algorithm is
+            performed for each cluster size, keeping the one with the highest
+            log likelihood. Defaults to 1.
+        workers (int, optional): The number of processes the cluster sizes
+            are split across. Defaults to None, which runs them in this
+            process.
+        patience (int, optional): Stop once the BIC of this many cluster
+            sizes in a row is above the lowest one found. The cluster sizes
+            that are not tested get a log likelihood and BIC of nan.
+            Defaults to None, which tests all of them.
+        covariance_type (str, optional): 'full', 'diag', 'tied' or
+            'spherical', the covariances fit by the EM algorithm. Defaults to
+            'full'.
 
     Returns:
         best_k is the best value for k based on its BIC.
@@ -31,9 +46,11 @@ def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False):
             m (numpy.ndarray): A tensor of shape (k, d) containing the centroid
                 means for the best number of clusters.
             S (numpy.ndarray): A tensor of shape (k, d, d) containing the
-                covariance matrices for the best number of clusters.
+                covariance matrices for the best number of clusters, or of
+                shape (k, d), (d, d) or (k,) for the other covariance types.
         l (numpy.ndarray): A tensor of shape (kmax - kmin + 1) containing the
-            log likelihood for each cluster size tested.
+            log likelihood for each cluster size tested, or nan for those
+            whose EM algorithm failed, which also get a BIC of nan.
         b (numpy.ndarray): A tensor of shape (kmax - kmin + 1) containing the
             BIC value for each cluster size tested.
                 Use: BIC = p * ln(n) - 2 * l
@@ -52,29 +69,55 @@ def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False):
             not isinstance(kmax, int) or kmax <= 0 or kmax <= kmin or
             kmax > X.shape[0] or not isinstance(iterations, int) or
             iterations <= 0 or not isinstance(tol, float) or tol < 0 or
-            not isinstance(verbose, bool)):
+            not isinstance(verbose, bool) or
+            not isinstance(restarts, int) or restarts <= 0 or
+            (workers is not None and
+             (not isinstance(workers, int) or workers <= 0)) or
+            (patience is not None and
+             (not isinstance(patience, int) or patience <= 0)) or
+            covariance_type not in ('full', 'diag', 'tied', 'spherical')):
         return None, None, None, None
 
     n, d = X.shape
-    l_arr = np.empty((kmax - kmin + 1))
-    b = np.empty((kmax - kmin + 1))
-    results = [()] * (kmax - kmin + 1)
+    l_arr = np.full((kmax - kmin + 1), np.nan)
+    b = np.full((kmax - kmin + 1), np.nan)
+    results = [None] * (kmax - kmin + 1)
 
-    for k in range(kmin, kmax + 1):
-        index = k - kmin
-        pi, m, S, g, log = expectation_maximization(
-            X, k, iterations, tol, verbose
-        )
+    def score(fit):
+        """Function that returns the log likelihood of a fit."""
+        return -np.inf if fit[4] is None else fit[4]
 
-        l_arr[index] = log
-        results[index] = (pi, m, S)
+    def bottomed_out(fits):
+        """Function that stores the BIC of the latest fit and checks if
+        the last patience ones are above the lowest."""
+        index = len(fits) - 1
+        k = index + kmin
+        pi, m, S, g, log = fits[-1]
 
-        p = (k * d) + (k * (d * ((d + 1)) / 2)) + (k - 1)
-        BIC = (p * np.log(n)) - (2 * log)
-        b[index] = BIC
+        # A failed fit keeps a log likelihood and BIC of nan
+        if log is not None:
+            l_arr[index] = log
+            results[index] = (pi, m, S)
 
-    best_result = results[np.argmin(b)]
-    best_k = np.argmin(b) + kmin
+            # Means, covariances and priors, which sum to 1
+            covariances = {'full': k * (d * ((d + 1)) / 2), 'diag': k * d,
+                           'tied': d * ((d + 1)) / 2, 'spherical': k}
+            p = (k * d) + covariances[covariance_type] + (k - 1)
+            BIC = (p * np.log(n)) - (2 * log)
+            b[index] = BIC
+
+        return (patience is not None and
+                not np.isnan(b[:index + 1]).all() and
+                index - np.nanargmin(b[:index + 1]) >= patience)
+
+    sweep(expectation_maximization, X, range(kmin, kmax + 1),
+          (iterations, tol, verbose, covariance_type), restarts, workers,
+          score, bottomed_out)
+
+    if np.isnan(b).all():
+        return None, None, None, None
+    best_result = results[np.nanargmin(b)]
+    best_k = np.nanargmin(b) + kmin
 
     return best_k, best_result, l_arr, b
 
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Module that compares the time, points read, peak memory and inertia of
+kmeans on a dataset in memory and MiniBatchKMeans streaming it from a file.
+
+Usage: ./bench_minibatch_kmeans.py [n]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+kmeans = __import__('1-kmeans').kmeans
+closest = __import__('1-kmeans').closest
+MiniBatchKMeans = __import__('13-minibatch_kmeans').MiniBatchKMeans
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    k, d = 8, 10
+    np.random.seed(0)
+    means = np.random.uniform(-50, 50, (k, d))
+    X = means[np.random.randint(0, k, n)] + 4 * np.random.randn(n, d)
+    filename = os.path.join(tempfile.mkdtemp(), 'X.npy')
+    np.save(filename, X)
+
+    print("{:>4} {:>10} {:>8} {:>12} {:>10} {:>12} {:>10}".format(
+        'seed', 'method', 'seconds', 'points read', 'peak MB', 'inertia',
+        'vs kmeans'))
+    for seed in range(3):
+        results = []
+        for method in ('kmeans', 'minibatch'):
+            np.random.seed(seed)
+            tracemalloc.start()
+            start = time.perf_counter()
+            if method == 'kmeans':
+                C, _ = kmeans(X, k, 100, init='kmeans++')
+                read = n
+            else:
+                model = MiniBatchKMeans(k, batch_size=4096)
+                C = model.fit(filename, epochs=1, tol=1e-6).C
+                read = int(np.sum(model.counts))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            inertia = np.sum(closest(X, C)[1])
+            results.append(inertia)
+            print("{:>4} {:>10} {:>8.3f} {:>12} {:>10.1f} {:>12.6g} {:>+9.3f}%"
+                  .format(seed, method, elapsed, read, peak / 2 ** 20,
+                          inertia, 100 * (inertia / results[0] - 1)))
+    os.remove(filename)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Module that contains the function sweep that fits a clustering model for
+each number of clusters, optionally across worker processes."""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+worker_state = {}
+
+
+def worker_init(name, shape, dtype):
+    """Function that attaches a worker process to the shared data set.
+
+    Args:
+        name (str): The name of the shared memory block holding the data set.
+        shape (tuple): The shape of the data set.
+        dtype (str): The type of the data set.
+    """
+    shm = SharedMemory(name=name)
+    X = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    X.flags.writeable = False
+    worker_state["shm"] = shm
+    worker_state["X"] = X
+
+
+def worker_fit(task):
+    """Function that fits one model on the shared data set.
+
+    Args:
+        task (tuple): The fit function, the number of clusters, the seed of
+            the random number generator and the extra arguments of fit.
+
+    Returns:
+        The result of fit.
+    """
+    fit, k, seed, args = task
+    np.random.seed(seed)
+    return fit(worker_state["X"], k, *args)
+
+
+def sweep(fit, X, ks, args=(), restarts=1, workers=None, score=None,
+          stop=None):
+    """Function that fits a model for each number of clusters and keeps the
+    best of its restarts.
+
+    With workers, X is copied once into shared memory that the worker
+    processes read, and the numbers of clusters are fit a few at a time
+    ahead of the one being checked, so stop can end the sweep early.
+
+    Args:
+        fit (function): A module-level function fit(X, k, *args) that fits a
+            model with k clusters.
+        X (numpy.ndarray): A tensor of shape (n, d) containing the data set.
+        ks (list[int]): The numbers of clusters, in the order they are
+            checked.
+        args (tuple, optional): The extra arguments of fit. Defaults to ().
+        restarts (int, optional): The number of fits for each number of
+            clusters. Defaults to 1.
+        workers (int, optional): The number of worker processes. Defaults to
+            None, which fits in this process with the global random state.
+        score (function, optional): Function of a result that is higher for
+            better fits, used to pick among the restarts. Defaults to None,
+            which keeps the first one.
+        stop (function, optional): Function of the list of results so far
+            that returns True to end the sweep. Defaults to None.
+
+    Returns:
+        results (list): The best result for each number of clusters checked,
+            in the order of ks.
+    """
+    results = []
+
+    def best(fits):
+        """Function that picks the best of the restarts."""
+        if score is None or len(fits) == 1:
+            return fits[0]
+        return max(fits, key=score)
+
+    if workers is None:
+        for k in ks:
+            results.append(best([fit(X, k, *args) for _ in range(restarts)]))
+            if stop is not None and stop(results):
+                break
+        return results
+
+    seeds = np.random.randint(0, 2 ** 31, size=(len(ks), restarts))
+    X = np.ascontiguousarray(X)
+    shm = SharedMemory(create=True, size=max(X.nbytes, 1))
+    try:
+        shared = np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)
+        shared[...] = X
+        with ProcessPoolExecutor(workers, initializer=worker_init,
+                                 initargs=(shm.name, X.shape,
+                                           X.dtype.str)) as pool:
+            pending = []
+            for i, k in enumerate(ks):
+                # Keep every worker busy with the next numbers of clusters
+                while len(pending) < i + workers and len(pending) < len(ks):
+                    j = len(pending)
+                    pending.append([pool.submit(worker_fit, (
+                        fit, ks[j], seeds[j, r], args))
+                        for r in range(restarts)])
+                results.append(best([future.result()
+                                     for future in pending[i]]))
+                if stop is not None and stop(results):
+                    for futures in pending[i + 1:]:
+                        for future in futures:
+                            future.cancel()
+                    break
+        shared = None
+    finally:
+        shm.close()
+        shm.unlink()
+    return results
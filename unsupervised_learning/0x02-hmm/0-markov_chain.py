@@ -4,6 +4,7 @@ probability of a markov chain being in a particular state after a specified
 number of iterations."""
 
 import numpy as np
+import scipy.sparse
 
 
 def markov_chain(P, s, t=1):
@@ -14,7 +15,8 @@ def markov_chain(P, s, t=1):
         P (numpy.ndarray): A square tensor of shape (n, n) representing the
             transition matrix, where P[i, j] is the probability of
             transitioning from state i to state j and n is the number of states
-            in the markov chain.
+            in the markov chain. A scipy.sparse matrix is also accepted for
+            chains with many states.
         s (numpy.ndarray): A tensor of shape (1, n) representing the
             probability of starting in each state.
         t (int, optional): The number of iterations that the markov chain has
@@ -25,7 +27,8 @@ def markov_chain(P, s, t=1):
             probability of being in a specific state after t iterations.
         None on failure.
     """
-    if (not isinstance(P, np.ndarray) or P.ndim != 2 or
+    sparse = scipy.sparse.issparse(P)
+    if (not (isinstance(P, np.ndarray) or sparse) or P.ndim != 2 or
             P.shape[0] != P.shape[1] or not isinstance(s, np.ndarray) or
             s.ndim != 2 or s.shape[0] != 1 or s.shape[1] != P.shape[0] or
             not isinstance(t, int) or t <= 0):
@@ -33,8 +36,32 @@ def markov_chain(P, s, t=1):
 
     s_k = s
 
-    for k in range(t):
-        s_k = s_k @ P
+    if sparse:
+        # Powers of a sparse matrix fill in, so apply it t times instead,
+        # each step costing one product with its nonzero entries
+        P = P.tocsr().T
+        s_k = s_k.T
+        for k in range(t):
+            s_k = P @ s_k
+        return s_k.T
+
+    # t products with s cost t n^2, while squaring costs about log2(t) n^3,
+    # so only square for chains run for many more steps than they have states
+    if t <= P.shape[0] * t.bit_length():
+        for k in range(t):
+            s_k = s_k @ P
+        return s_k
+
+    # Exponentiation by squaring, P^t is the product of the P^(2^k) of the
+    # bits k set in t
+    power = P
+    while True:
+        if t & 1:
+            s_k = s_k @ power
+        t >>= 1
+        if not t:
+            break
+        power = power @ power
 
     return s_k
 
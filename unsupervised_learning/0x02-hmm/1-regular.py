@@ -3,40 +3,95 @@
 probabilities of a regular markov chain."""
 
 import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
 
 
-def regular(P):
+def regular(P, method='iterative', tol=1e-10, iterations=1000):
     """Function that determines the steady state probabilities of a regular
     markov chain.
 
+    A chain is regular when every state can reach every other one
+    (irreducible) and the lengths of its cycles have no common divisor above
+    1 (aperiodic). This is checked on the graph of the nonzero transitions,
+    so P only needs to be sparse, not strictly positive.
+
     Args:
         P (numpy.ndarray): A square tensor of shape (n, n) representing the
         transition matrix, where P[i, j] is the probability of transitioning
         from state i to state j and n is the number of states in the markov
-        chain.
+        chain. A scipy.sparse matrix is also accepted for chains with many
+        states.
+        method (str, optional): How a scipy.sparse P is solved. 'iterative'
+        runs BiCGSTAB, then GMRES if it does not converge, each costing one
+        or two products with P per iteration. 'lu' uses a direct sparse LU
+        factorization, which fills in on most chains but suits banded ones
+        that mix too slowly for the iterative solvers. Defaults to
+        'iterative'.
+        tol (float, optional): The relative residual the iterative solvers
+        stop at. Defaults to 1e-10.
+        iterations (int, optional): The maximum number of iterations of each
+        iterative solver. Defaults to 1000.
 
     Returns:
         v (numpy.ndarray): A tensor of shape (1, n) containing the steady state
-        probabilities, or None on failure.
+        probabilities, or None on failure, including when the iterative
+        solvers do not converge.
     """
-    if (not isinstance(P, np.ndarray) or P.ndim != 2 or
-            P.shape[0] != P.shape[1]):
+    sparse = scipy.sparse.issparse(P)
+    if (not (isinstance(P, np.ndarray) or sparse) or P.ndim != 2 or
+            P.shape[0] != P.shape[1] or method not in ('iterative', 'lu') or
+            not isinstance(iterations, int) or iterations < 1):
         return None
 
     n = P.shape[0]
-    if not (P > 0).all():
+    graph = scipy.sparse.csr_matrix(P != 0)
+    count, _ = scipy.sparse.csgraph.connected_components(
+        graph, directed=True, connection='strong')
+    if count != 1:
         return None
 
-    # v(P - I) = 0, πQ = 0
-    Iden = np.eye(n)
-    Q = (P - Iden)
+    # The period is the gcd of level(i) + 1 - level(j) over the edges i -> j,
+    # with the levels of a breadth first search from state 0
+    level = scipy.sparse.csgraph.shortest_path(graph, indices=0,
+                                               unweighted=True)
+    i, j = graph.nonzero()
+    if np.gcd.reduce((level[i] + 1 - level[j]).astype(int)) != 1:
+        return None
 
-    # Mπ = b
-    M = np.vstack((Q.T[:-1], np.ones(n)))
-    b = np.vstack((np.zeros((n - 1, 1)), [1]))
+    # v(P - I) = 0, πQ = 0
+    if sparse:
+        # Fixing π of the last state to 1 leaves a nonsingular sparse system
+        # without it
+        P_T = P.T.tocsr()
+        Q = P_T - scipy.sparse.identity(n, format='csr')
+        A = Q[:-1, :-1]
+        b = -Q[:-1, -1].toarray().ravel()
+        v = np.ones(n)
+        if n > 1 and method == 'lu':
+            v[:-1] = scipy.sparse.linalg.splu(A.tocsc()).solve(b)
+        elif n > 1:
+            y, info = scipy.sparse.linalg.bicgstab(A, b, rtol=tol,
+                                                   maxiter=iterations)
+            if info != 0:
+                # BiCGSTAB can break down, GMRES cannot, so it is the
+                # fallback, restarted every 20 steps for about as many steps
+                y, info = scipy.sparse.linalg.gmres(
+                    A, b, rtol=tol, restart=20,
+                    maxiter=max(1, iterations // 20))
+            if info != 0:
+                return None
+            v[:-1] = y
+        v /= np.sum(v)
+    else:
+        Q = (P - np.eye(n))
 
-    v = np.linalg.solve(M, b).T
-    return v
+        # Mπ = b
+        M = np.vstack((Q.T[:-1], np.ones(n)))
+        b = np.vstack((np.zeros((n - 1, 1)), [1]))
+        v = np.linalg.solve(M, b)
+    return v.reshape((1, n))
 
 
 if __name__ == "__main__":
@@ -3,26 +3,35 @@
 chain is absorbing."""
 
 import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
 
 
 def absorbing(P):
     """Function that determines if a markov chain is absorbing.
 
+    A chain is absorbing when it has an absorbing state and every state can
+    reach one. This is checked with one breadth first search from the
+    absorbing states along the reversed transitions, so P does not need to be
+    in standard form.
+
     Args:
         P (numpy.ndarray): A square tensor of shape (n, n) representing the
             standard transition matrix, where P[i, j] is the probability of
             transitioning from state i to state j and n is the number of states
-            in the markov chain.
+            in the markov chain. A scipy.sparse matrix is also accepted for
+            chains with many states.
 
     Returns:
         True if it is absorbing, or False on failure
     """
-    if (not isinstance(P, np.ndarray) or P.ndim != 2 or
+    sparse = scipy.sparse.issparse(P)
+    if (not (isinstance(P, np.ndarray) or sparse) or P.ndim != 2 or
             P.shape[0] != P.shape[1]):
         return False
 
     n, _ = P.shape
-    diag = np.diag(P)
+    diag = P.diagonal()
 
     # Check if there is at least 1 absorbing state.
     if not (diag == 1).any():
@@ -32,30 +41,22 @@ def absorbing(P):
     if (diag == 1).all():
         return True
 
-    # Put transition matrix in standard from. P is already in standard form.
-    # Get I, R, & Q from standard transition matrix P = [[I, O], [R, Q]]
-    I_size = np.where(diag != 1)[0][0]
-    I_from_P = np.eye(I_size)
-    R = P[I_size:, :I_size]
-    Q = P[I_size:, I_size:]
-
-    # Get F (fundimental matrix), F = Inverse(I - Q) where I.shape == Q.shape
-    I_for_Q = np.eye(Q.shape[0])
-    try:
-        F = np.linalg.inv(I_for_Q - Q)
-    except Exception:
-        return False
-
-    # Use F to find limiting matrix P_bar, P_bar = [[I, 0],[FR, 0]]
-    FR = F @ R
-    P_bar = np.zeros((n, n))
-    P_bar[:I_size, :I_size] = I_from_P
-    P_bar[I_size:, :I_size] = FR
-
-    if (FR == 0).all():
-        return False
+    # Reversed transitions, j -> i for each P[i, j] != 0, plus an extra state
+    # n leading to every absorbing state, so one search starts from all of them
+    states = np.where(diag == 1)[0]
+    reverse = scipy.sparse.csr_matrix(P != 0).T
+    sources = scipy.sparse.csr_matrix(
+        (np.ones(states.size, dtype=bool),
+         (np.zeros(states.size, dtype=int), states)), shape=(1, n))
+    graph = scipy.sparse.hstack((scipy.sparse.vstack((reverse, sources)),
+                                 scipy.sparse.csr_matrix((n + 1, 1),
+                                                         dtype=bool)),
+                                format='csr')
+    reached = scipy.sparse.csgraph.breadth_first_order(
+        graph, n, directed=True, return_predecessors=False)
 
-    return True
+    # Every state, plus the extra one, can reach an absorbing state
+    return bool(reached.size == n + 1)
 
 
 if __name__ == "__main__":
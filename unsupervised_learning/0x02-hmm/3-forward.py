@@ -5,12 +5,17 @@ algorithm for a hidden markov model."""
 import numpy as np
 
 
-def forward(Observation, Emission, Transition, Initial):
+def forward(Observation, Emission, Transition, Initial, log=False):
     """Function that performs the forward algorithm for a hidden markov model.
 
+    Each time step is one matrix product of the previous forward
+    probabilities with the transition matrix, for every sequence at once.
+
     Args:
         Observation (numpy.ndarray): A tensor of shape (T,) that contains the
             index of the observation, where T is the number of observations.
+            A tensor of shape (B, T) holds B sequences of the same length that
+            are processed together.
         Emission (numpy.ndarray): A tensor of shape (N, M) containing the
             emission probability of a specific observation given a hidden
             state, where Emission[i, j] is the probability of observing j given
@@ -21,15 +26,23 @@ def forward(Observation, Emission, Transition, Initial):
             of transitioning from the hidden state i to j.
         Initial (numpy.ndarray): A tensor of shape (N, 1) containing the
             probability of starting in a particular hidden state.
+        log (bool, optional): Defines whether or not to rescale the forward
+            probabilities at each step and return the log-likelihood and the
+            log of F, which do not underflow on long sequences. Defaults to
+            False.
 
     Returns:
-        P (float): The likelihood of the observations given the model.
+        P (float): The likelihood of the observations given the model, or its
+            log if log is True.
         F (numpy.ndarray): A tensor of shape (N, T) containing the forward path
             probabilities, where F[i, j] is the probability of being in hidden
-            state i at time j given the previous observations.
+            state i at time j given the previous observations, or their log if
+            log is True.
+        For a (B, T) Observation, P has shape (B,) and F has shape (B, N, T).
         None, None on failure.
     """
-    if (not isinstance(Observation, np.ndarray) or Observation.ndim != 1 or
+    if (not isinstance(Observation, np.ndarray) or
+            Observation.ndim not in (1, 2) or Observation.shape[-1] == 0 or
             not isinstance(Emission, np.ndarray) or Emission.ndim != 2 or
             not isinstance(Transition, np.ndarray) or Transition.ndim != 2 or
             Emission.shape[0] != Transition.shape[0] or
@@ -38,23 +51,37 @@ def forward(Observation, Emission, Transition, Initial):
             Initial.shape[0] != Emission.shape[0] or Initial.shape[1] != 1):
         return None, None
 
-    T = Observation.shape[0]
+    Obs = Observation.reshape((-1, Observation.shape[-1]))
+    S, T = Obs.shape
     N = Emission.shape[0]
-    F = np.zeros((N, T))
+    # Emission probabilities of each observation, shape (T, S, N)
+    E = Emission.T[Obs.T]
+    F = np.empty((T, S, N))
+    scale = np.ones((T, S, 1))
 
-    α_1 = Initial.T * Emission[:, Observation[0]]
-    F[:, 0] = α_1
+    F[0] = Initial.T * E[0]
+    for t in range(T):  # For each observation
+        if t > 0:
+            # Probability of every hidden state given the previous ones
+            np.matmul(F[t - 1], Transition, out=F[t])
+            F[t] *= E[t]
+        if log:
+            np.sum(F[t], axis=1, keepdims=True, out=scale[t])
+            np.divide(F[t], scale[t], out=F[t], where=scale[t] > 0)
 
-    for t in range(1, T):  # For each observation past the initial
-        for n in range(N):  # For each hidden state
-            # Emission probablities for hidden state at obeservation,
-            # Transition probablities for that state,
-            # & previous state's probablity.
-            F[n, t] = np.sum(
-                Emission[n, Observation[t]] * Transition[:, n] * F[:, t - 1]
-                )
+    if log:
+        with np.errstate(divide='ignore'):
+            np.log(scale, out=scale)
+            np.log(F, out=F)
+        np.cumsum(scale, axis=0, out=scale)
+        F += scale
+        P = scale[-1, :, 0]
+    else:
+        P = np.sum(F[-1], axis=1)
+    F = F.transpose(1, 2, 0)
 
-    P = np.sum(F[:, -1])
+    if Observation.ndim == 1:
+        return P[0], F[0]
     return P, F
 
 
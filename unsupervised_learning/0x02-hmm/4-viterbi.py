@@ -5,13 +5,18 @@ sequence of hidden states for a hidden markov model."""
 import numpy as np
 
 
-def viterbi(Observation, Emission, Transition, Initial):
+def viterbi(Observation, Emission, Transition, Initial, log=False):
     """Function that calculates the most likely sequence of hidden states for a
     hidden markov model.
 
+    The probabilities are kept as logs, so long sequences do not underflow,
+    and each time step is one max-plus product over all the transitions.
+
     Args:
         Observation (numpy.ndarray): A tensor of shape (T,) that contains the
             index of the observation, where T is the number of observations.
+            A tensor of shape (B, T) holds B sequences of the same length that
+            are decoded together.
         Emission (numpy.ndarray): A tensor of shape (N, M) containing the
             emission probability of a specific observation given a hidden
             state, where Emission[i, j] is the probability of observing j
@@ -22,14 +27,20 @@ def viterbi(Observation, Emission, Transition, Initial):
             of transitioning from the hidden state i to j.
         Initial (numpy.ndarray): A tensor of shape (N, 1) containing the
             probability of starting in a particular hidden state.
+        log (bool, optional): Defines whether or not to return the log of the
+            probability of the path. Defaults to False.
 
     Returns:
         path (list): A list of length T containing the most likely sequence of
             hidden states.
-        P (float): The probability of obtaining the path sequence.
+        P (float): The probability of obtaining the path sequence, or its log
+            if log is True.
+        For a (B, T) Observation, path is a numpy.ndarray of shape (B, T) and
+            P has shape (B,).
         None, None on failure
     """
-    if (not isinstance(Observation, np.ndarray) or Observation.ndim != 1 or
+    if (not isinstance(Observation, np.ndarray) or
+            Observation.ndim not in (1, 2) or Observation.shape[-1] == 0 or
             not isinstance(Emission, np.ndarray) or Emission.ndim != 2 or
             not isinstance(Transition, np.ndarray) or Transition.ndim != 2 or
             Emission.shape[0] != Transition.shape[0] or
@@ -38,34 +49,51 @@ def viterbi(Observation, Emission, Transition, Initial):
             Initial.shape[0] != Emission.shape[0] or Initial.shape[1] != 1):
         return None, None
 
-    T = Observation.shape[0]
+    Obs = Observation.reshape((-1, Observation.shape[-1]))
+    S, T = Obs.shape
     N = Emission.shape[0]
-    mu = np.zeros((N, T))
-    trail = np.zeros((N, T))
-    path = []
+    with np.errstate(divide='ignore'):
+        log_E = np.log(Emission)
+        log_T = np.log(Transition)
+        log_I = np.log(Initial.T)
+    # Log emission probabilities of each observation, shape (T, S, N)
+    E = log_E.T[Obs.T]
+    # Smallest type that can hold the index of a hidden state
+    if N <= np.iinfo(np.uint8).max + 1:
+        dtype = np.uint8
+    elif N <= np.iinfo(np.uint16).max + 1:
+        dtype = np.uint16
+    else:
+        dtype = np.intp
+    trail = np.empty((T, S, N), dtype=dtype)
+    scores = np.empty((S, N, N))
 
     # Step 0
-    mu[:, 0] = Initial.T * Emission[:, Observation[0]]
+    mu = log_I + E[0]
 
-    # Steps until N
+    # Steps until T
     for t in range(1, T):
-        for n in range(N):
-            # hidden node of max probablity & probalbity for observation
-            trail[n, t] = np.argmax(
-                Emission[n, Observation[t]] * Transition[:, n] * mu[:, t - 1]
-            )
-            mu[n, t] = np.max(
-                Emission[n, Observation[t]] * Transition[:, n] * mu[:, t - 1]
-            )
+        # scores[s, i, j] is the best path ending in i followed by i -> j
+        np.add(mu[:, :, np.newaxis], log_T, out=scores)
+        best = np.argmax(scores, axis=1)
+        trail[t] = best
+        mu = np.take_along_axis(scores, best[:, np.newaxis], axis=1)[:, 0]
+        mu += E[t]
 
     # Most likly final hiden state
-    P = np.max(mu[:, -1], axis=0)
-    path.append(np.argmax(mu[:, -1], axis=0))
+    path = np.empty((S, T), dtype=np.intp)
+    path[:, -1] = np.argmax(mu, axis=1)
+    P = mu[np.arange(S), path[:, -1]]
 
     # Given most likely final state, trace most likely path of hidden states
+    rows = np.arange(S)
     for t in range(T - 1, 0, -1):
-        path.insert(0, int(trail[int(path[0]), t]))
+        path[:, t - 1] = trail[t, rows, path[:, t]]
 
+    if not log:
+        P = np.exp(P)
+    if Observation.ndim == 1:
+        return path[0].tolist(), P[0]
     return path, P
 
 
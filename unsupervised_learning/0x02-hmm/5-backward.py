@@ -5,12 +5,17 @@ algorithm for a hidden markov model."""
 import numpy as np
 
 
-def backward(Observation, Emission, Transition, Initial):
+def backward(Observation, Emission, Transition, Initial, log=False):
     """Function that performs the backward algorithm for a hidden markov model.
 
+    Each time step is one matrix product of the next backward probabilities
+    with the transition matrix, for every sequence at once.
+
     Args:
         Observation (numpy.ndarray): A tensor of shape (T,) that contains the
             index of the observation, where T is the number of observations.
+            A tensor of shape (B, T) holds B sequences of the same length that
+            are processed together.
         Emission (numpy.ndarray): A tensor of shape (N, M) containing the
             emission probability of a specific observation given a hidden
             state, where Emission[i, j] is the probability of observing j
@@ -21,15 +26,23 @@ def backward(Observation, Emission, Transition, Initial):
             of transitioning from the hidden state i to j.
         Initial (numpy.ndarray): A tensor of shape (N, 1) containing the
             probability of starting in a particular hidden state.
+        log (bool, optional): Defines whether or not to rescale the backward
+            probabilities at each step and return the log-likelihood and the
+            log of B, which do not underflow on long sequences. Defaults to
+            False.
 
     Returns:
-        P(float): The likelihood of the observations given the model.
+        P(float): The likelihood of the observations given the model, or its
+            log if log is True.
         B (numpy.ndarray): A tensor of shape (N, T) containing the backward
             path probabilities, where B[i, j] is the probability of generating
-            the future observations from hidden state i at time j.
+            the future observations from hidden state i at time j, or their
+            log if log is True.
+        For a (B, T) Observation, P has shape (B,) and B has shape (B, N, T).
         None, None on failure.
     """
-    if (not isinstance(Observation, np.ndarray) or Observation.ndim != 1 or
+    if (not isinstance(Observation, np.ndarray) or
+            Observation.ndim not in (1, 2) or Observation.shape[-1] == 0 or
             not isinstance(Emission, np.ndarray) or Emission.ndim != 2 or
             not isinstance(Transition, np.ndarray) or Transition.ndim != 2 or
             Emission.shape[0] != Transition.shape[0] or
@@ -38,24 +51,39 @@ def backward(Observation, Emission, Transition, Initial):
             Initial.shape[0] != Emission.shape[0] or Initial.shape[1] != 1):
         return None, None
 
-    T = Observation.shape[0]
+    Obs = Observation.reshape((-1, Observation.shape[-1]))
+    S, T = Obs.shape
     N = Emission.shape[0]
-    B = np.zeros((N, T))
-    B[:, -1] = 1
+    # Emission probabilities of each observation, shape (T, S, N)
+    E = Emission.T[Obs.T]
+    B = np.empty((T, S, N))
+    scale = np.ones((T, S, 1))
+    emitted = np.empty((S, N))
 
-    for t in range(T - 2, -1, -1):  # For each observation past the initial
-        for n in range(N):  # For each hidden state
-            # Emission probablities for hidden state at next obeservation,
-            # Transition probablities for that state,
-            # & next state's probablity.
-            B[n, t] = np.sum(
-                Emission[:, Observation[t + 1]] *
-                Transition[n, :] *
-                B[:, t + 1]
-                )
+    B[-1] = 1
+    for t in range(T - 2, -1, -1):  # For each observation before the last
+        # Probability of the next observation from each next hidden state,
+        # summed over the transitions to them
+        np.multiply(E[t + 1], B[t + 1], out=emitted)
+        np.matmul(emitted, Transition.T, out=B[t])
+        if log:
+            np.sum(B[t], axis=1, keepdims=True, out=scale[t])
+            np.divide(B[t], scale[t], out=B[t], where=scale[t] > 0)
 
     # Sum of states for initial observation multiplied by probablity of state
-    P = np.sum(Initial.T * Emission[:, Observation[0]] * B[:, 0], axis=1)[0]
+    P = np.sum(Initial.T * E[0] * B[0], axis=1)
+    if log:
+        with np.errstate(divide='ignore'):
+            np.log(scale, out=scale)
+            np.log(B, out=B)
+            P = np.log(P)
+        np.cumsum(scale[::-1], axis=0, out=scale[::-1])
+        B += scale
+        P += scale[0, :, 0]
+    B = B.transpose(1, 2, 0)
+
+    if Observation.ndim == 1:
+        return P[0], B[0]
     return P, B
 
 
@@ -3,15 +3,112 @@
 algorithm for a hidden markov model."""
 
 import numpy as np
+from multiprocessing import Pool
+forward = __import__('3-forward').forward
+backward = __import__('5-backward').backward
 
+worker_state = {}
 
-def baum_welch(Observations, Transition, Emission, Initial, iterations=1000):
+
+def expectation(Observations, Transition, Emission, Initial):
+    """Function that performs the expectation step of the Baum-Welch algorithm
+    over several sequences of observations. Sequences of the same length are
+    run through the forward and backward algorithms together.
+
+    Args:
+        Observations (list[numpy.ndarray]): The sequences of observations,
+            each a tensor of shape (T,) with its own T.
+        Transition (numpy.ndarray): A tensor of shape (M, M) that contains the
+            transition probabilities.
+        Emission (numpy.ndarray): A tensor of shape (M, N) that contains the
+            emission probabilities.
+        Initial (numpy.ndarray): A tensor of shape (M, 1) that contains the
+            starting probabilities.
+
+    Returns:
+        The expected number of transitions, a tensor of shape (M, M), the
+        expected number of emissions, a tensor of shape (M, N), and the
+        log-likelihood of the observations, summed over the sequences.
+    """
+    M, N = Emission.shape
+    transitions = np.zeros((M, M))
+    emissions = np.zeros((M, N))
+    log_likelihood = 0
+    lengths = {}
+    for obs in Observations:
+        lengths.setdefault(obs.shape[0], []).append(obs)
+
+    for group in lengths.values():
+        Obs = np.stack(group)
+        P, F = forward(Obs, Emission, Transition, Initial, log=True)
+        _, B = backward(Obs, Emission, Transition, Initial, log=True)
+        log_likelihood += np.sum(P)
+        P = P[:, np.newaxis, np.newaxis]
+
+        # Probability of being in each hidden state at each time, (S, M, T)
+        gamma = np.exp(F + B - P)
+        for i in range(M):
+            emissions[i] += np.bincount(Obs.ravel(), gamma[:, i].ravel(),
+                                        minlength=N)
+
+        # xi[s, i, j, t] = F[s, i, t] Transition[i, j]
+        #                  Emission[j, Obs[s, t + 1]] B[s, j, t + 1] / P[s]
+        # is summed over s and t as one product of rescaled factors
+        shift = np.max(F[:, :, :-1], axis=1, keepdims=True)
+        shift[np.isinf(shift)] = 0
+        before = np.exp(F[:, :, :-1] - shift)
+        with np.errstate(divide='ignore'):
+            after = np.log(Emission.T[Obs[:, 1:]].transpose(0, 2, 1))
+        after += B[:, :, 1:] + shift - P
+        np.exp(after, out=after)
+        transitions += Transition * np.tensordot(before, after,
+                                                 axes=([0, 2], [0, 2]))
+
+    return transitions, emissions, log_likelihood
+
+
+def worker_init(Observations):
+    """Function that keeps the sequences of observations in a worker process
+    so they are only sent to it once.
+
+    Args:
+        Observations (list[numpy.ndarray]): The sequences of observations.
+    """
+    worker_state["Observations"] = Observations
+
+
+def worker_expectation(task):
+    """Function that performs the expectation step over a chunk of the
+    sequences of observations kept by worker_init.
+
+    Args:
+        task (tuple): The indices of the sequences of the chunk, followed by
+            the Transition, Emission and Initial probabilities.
+
+    Returns:
+        The expected counts and log-likelihood of the chunk.
+    """
+    index, Transition, Emission, Initial = task
+    Observations = worker_state["Observations"]
+    return expectation([Observations[i] for i in index], Transition,
+                       Emission, Initial)
+
+
+def baum_welch(Observations, Transition, Emission, Initial, iterations=1000,
+               tol=None, workers=None):
     """Function that performs the Baum-Welch algorithm for a hidden markov
     model.
 
+    The forward and backward probabilities are rescaled at each step, so long
+    sequences do not underflow. The starting probabilities are not
+    re-estimated.
+
     Args:
         Observations (numpy.ndarray): A tensor of shape (T,) that contains the
             index of the observation, where T is the number of observations.
+            A tensor of shape (S, T) or a list of tensors of shape (T,), each
+            with its own T, holds several sequences of observations whose
+            expected counts are summed.
         Transition (numpy.ndarray): A tensor of shape (M, M) that contains the
             initialized transition probabilities, where M is the number of
             hidden states.
@@ -22,12 +119,73 @@ def baum_welch(Observations, Transition, Emission, Initial, iterations=1000):
             initialized starting probabilities.
         iterations (int, optional): The number of times
             expectation-maximization should be performed. Defaults to 1000.
+        tol (float, optional): Stop early once an iteration improves the
+            log-likelihood by less than tol. Defaults to None.
+        workers (int, optional): The number of processes the expectation
+            step is split across. Defaults to None, which runs it in this
+            process.
 
     Returns:
         The converged Transition & Emission.
         None, None on failure.
     """
-    return None, None
+    if (isinstance(Observations, np.ndarray) and Observations.ndim in (1, 2)
+            and Observations.size > 0):
+        Observations = list(Observations.reshape(
+            (-1, Observations.shape[-1])))
+    if (not isinstance(Observations, (list, tuple)) or
+            len(Observations) == 0 or
+            not all(isinstance(obs, np.ndarray) and obs.ndim == 1 and
+                    obs.shape[0] > 0 for obs in Observations) or
+            not isinstance(Transition, np.ndarray) or Transition.ndim != 2 or
+            Transition.shape[0] != Transition.shape[1] or
+            not isinstance(Emission, np.ndarray) or Emission.ndim != 2 or
+            Emission.shape[0] != Transition.shape[0] or
+            not isinstance(Initial, np.ndarray) or Initial.ndim != 2 or
+            Initial.shape != (Transition.shape[0], 1) or
+            not isinstance(iterations, int) or iterations < 1 or
+            (workers is not None and
+             (not isinstance(workers, int) or workers < 1))):
+        return None, None
+
+    Transition = Transition.astype(float)
+    Emission = Emission.astype(float)
+    previous = -np.inf
+    pool = None
+    if workers is not None and workers > 1:
+        pool = Pool(workers, worker_init, (Observations,))
+        # A few chunks per worker, so uneven sequence lengths balance out
+        chunks = [index for index in np.array_split(
+            np.arange(len(Observations)), 4 * workers) if index.size]
+
+    try:
+        for _ in range(iterations):
+            # Expectation
+            if pool is None:
+                transitions, emissions, log_likelihood = expectation(
+                    Observations, Transition, Emission, Initial)
+            else:
+                counts = pool.map(worker_expectation, [
+                    (index, Transition, Emission, Initial)
+                    for index in chunks], chunksize=1)
+                transitions, emissions, log_likelihood = (
+                    sum(count) for count in zip(*counts))
+
+            # Maximization, keeping the rows of unvisited states
+            total = np.sum(transitions, axis=1, keepdims=True)
+            np.divide(transitions, total, out=Transition, where=total > 0)
+            total = np.sum(emissions, axis=1, keepdims=True)
+            np.divide(emissions, total, out=Emission, where=total > 0)
+
+            if tol is not None and log_likelihood - previous < tol:
+                break
+            previous = log_likelihood
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return Transition, Emission
 
 
 if __name__ == "__main__":
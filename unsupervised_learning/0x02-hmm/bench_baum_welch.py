@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Module that times an iteration of baum_welch on 10^5 and 10^6 sampled
+observations, with the expectation step split across 1, 2, 4, ... processes.
+
+Usage: OMP_NUM_THREADS=1 ./bench_baum_welch.py [max_workers]
+
+Each process works on its own sequences, so BLAS should run single-threaded
+in all of them, which OMP_NUM_THREADS (or the variable of the BLAS numpy was
+built with) sets before numpy is loaded.
+"""
+
+import os
+import sys
+import time
+import numpy as np
+baum_welch = __import__('6-baum_welch').baum_welch
+
+
+def sample(Transition, Emission, Initial, length):
+    """Samples a sequence of observations of a hidden markov model"""
+    hidden = np.empty(length, dtype=int)
+    hidden[0] = np.random.choice(Initial.size, p=Initial[:, 0])
+    for t in range(1, length):
+        hidden[t] = np.random.choice(Transition.shape[0],
+                                     p=Transition[hidden[t - 1]])
+    uniform = np.random.rand(length, 1)
+    return np.argmax(np.cumsum(Emission[hidden], axis=1) > uniform, axis=1)
+
+
+if __name__ == '__main__':
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    iterations = 5
+    length = 1000
+    np.random.seed(0)
+    Transition = np.array([[0.90, 0.05, 0.03, 0.02],
+                           [0.05, 0.90, 0.03, 0.02],
+                           [0.02, 0.03, 0.90, 0.05],
+                           [0.02, 0.03, 0.05, 0.90]])
+    Emission = np.array([[0.70, 0.10, 0.10, 0.05, 0.05],
+                         [0.05, 0.70, 0.10, 0.10, 0.05],
+                         [0.05, 0.05, 0.70, 0.10, 0.10],
+                         [0.10, 0.05, 0.05, 0.10, 0.70]])
+    Initial = np.full((4, 1), 0.25)
+    T_test = np.full((4, 4), 0.25) + np.random.rand(4, 4) / 10
+    T_test /= np.sum(T_test, axis=1, keepdims=True)
+    E_test = np.full((4, 5), 0.2) + np.random.rand(4, 5) / 10
+    E_test /= np.sum(E_test, axis=1, keepdims=True)
+
+    print("{:>12} {:>8} {:>14} {:>14}".format(
+        'observations', 'workers', 's/iteration', 'obs/sec'))
+    for total in (10 ** 5, 10 ** 6):
+        Observations = [sample(Transition, Emission, Initial, length)
+                        for _ in range(total // length)]
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            baum_welch(Observations, T_test, E_test, Initial, iterations,
+                       workers=workers if workers > 1 else None)
+            elapsed = (time.perf_counter() - start) / iterations
+            print("{:>12} {:>8} {:>14.3f} {:>14.0f}".format(
+                total, workers, elapsed, total / elapsed))
+            workers *= 2
@@ -1,55 +1,72 @@
 #!/usr/bin/env python3
 """Moduel that contians the class GaussianProcess that represents a noiseless
-1D Gaussian process."""
+Gaussian process."""
 
 import numpy as np
+from scipy.linalg import cholesky, solve_triangular
 
 
 class GaussianProcess():
-    """Class that represents a noiseless 1D Gaussian process.
+    """Class that represents a noiseless Gaussian process over inputs of d
+    dimensions.
     """
 
-    def __init__(self, X_init, Y_init, l=1, sigma_f=1):
+    def __init__(self, X_init, Y_init, l=1, sigma_f=1, jitter=1e-10):
         """Constructor function that sets the public instance attributes
         X, Y, l, and sigma_f corresponding to the respective constructor
         inputs. Also sets the public instance attribute K, representing the
-        current covariance kernel matrix for the Gaussian process.
+        current covariance kernel matrix for the Gaussian process, and L, its
+        lower Cholesky factor, which predict and update use instead of the
+        inverse of K.
 
         Args:
-            X_init (numpy.ndarray): A tensor of shape (t, 1) representing the
+            X_init (numpy.ndarray): A tensor of shape (t, d) representing the
                 inputs already sampled with the black-box function, where t is
-                the number of initial samples.
+                the number of initial samples and d the number of dimensions
+                of an input.
             Y_init (numpy.ndarray): A tensor of shape (t, 1) representing the
                 outputs of the black-box function for each input in X_init,
                 where t is the number of initial samples.
-            l (float, optional): The length parameter for the kernel.
-                Defaults to 1.
+            l (float, optional): The length parameter for the kernel, or a
+                tensor of shape (d,) holding one length per dimension
+                (automatic relevance determination). Defaults to 1.
             sigma_f (int, optional): The standard deviation given to the output
                 of the black-box function. Defaults to 1.
+            jitter (float, optional): The value added to the diagonal of K
+                before it is factored, so that samples closer than the
+                rounding errors still give a factor. Defaults to 1e-10.
         """
         if (not isinstance(X_init, np.ndarray) or not
                 isinstance(Y_init, np.ndarray) or not
                 isinstance(Y_init, np.ndarray) or not
-                isinstance(l, (float, int)) or not
+                isinstance(l, (float, int, np.ndarray)) or not
                 isinstance(sigma_f, (float, int))):
             raise TypeError("Something's not the right type")
         if (X_init.ndim != 2 or Y_init.ndim != 2 or not
-                X_init.shape[0] == Y_init.shape[0]):
+                X_init.shape[0] == Y_init.shape[0] or
+                (isinstance(l, np.ndarray) and
+                 l.shape != (X_init.shape[1],))):
             raise Exception("Something is not right with the arrys")
 
         self.X = X_init
         self.Y = Y_init
         self.l = l
         self.sigma_f = sigma_f
+        self.jitter = jitter
         self.K = self.kernel(X1=X_init, X2=X_init)
+        # K = L L^T, and Y is kept as L^-1 Y, so that predictions only need
+        # triangular solves
+        self.L = cholesky(self.K + jitter * np.eye(self.K.shape[0]),
+                          lower=True)
+        self.__LY = solve_triangular(self.L, self.Y, lower=True)
 
     def kernel(self, X1, X2):
         """Public instance method that calculates the covariance kernel matrix
         between two matrices. The kernel uses the Radial Basis Function (RBF).
 
         Args:
-            X1 (numpy.ndarray): A tensor of shape (m, 1).
-            X2 (numpy.ndarray): A tensor of shape (n, 1).
+            X1 (numpy.ndarray): A tensor of shape (m, d).
+            X2 (numpy.ndarray): A tensor of shape (n, d).
 
         Returns:
             Kernal (numpy.ndarray): The covariance kernal matrix as a
@@ -58,11 +75,15 @@ class GaussianProcess():
         # K = var * exp(-gamma * ||x - y||^2), where ||X||^2 = L2-norm of X
         # gama = 1/(2σ^2)
         # ||x - y||^2 = ||x||^2 + ||y||^2 - 2 * x^T * y
+        # With one length per dimension, the inputs are divided by them
+        length = np.asarray(self.l, dtype=float)
+        if length.ndim == 1:
+            X1, X2, length = X1 / length, X2 / length, 1
         x_norm = np.sum(X1 ** 2, axis=-1, keepdims=True)
         y_norm = np.sum(X2 ** 2, axis=-1, keepdims=True).T
         sqdist = x_norm + y_norm - 2 * X1 @ X2.T
         var = (self.sigma_f ** 2)
-        gama = 1 / (2 * (self.l ** 2))
+        gama = 1 / (2 * (length ** 2))
         Kernal = var * np.exp(-gama * sqdist)
 
         return Kernal
@@ -72,7 +93,7 @@ class GaussianProcess():
         a Gaussian process.
 
         Args:
-            X_s (numpy.ndarray): A tensor of shape (s, 1) containing all of the
+            X_s (numpy.ndarray): A tensor of shape (s, d) containing all of the
                 points whose mean and standard deviation should be calculated,
                 where s is the number of sample points.
 
@@ -83,35 +104,93 @@ class GaussianProcess():
                 variance for each point in X_s, respectively.
         """
         if (not isinstance(X_s, np.ndarray) or X_s.ndim != 2 or not
-                X_s.shape[1] == 1):
+                X_s.shape[1] == self.X.shape[1]):
             return None, None
-        # mu* = K*.T K^-1 f
+        # With V = L^-1 K*, K*.T K^-1 = V.T L^-1
         K_s = self.kernel(X1=self.X, X2=X_s)
-        mu = (K_s.T @ np.linalg.inv(self.K) @ self.Y).reshape(-1)
-        # sigma* = -K*.T K^-1 K* - K**
-        K_ss = self.kernel(X1=X_s, X2=X_s)
-        covariance_s = K_ss - (K_s.T @ np.linalg.inv(self.K) @ K_s)
-        sigma = np.diag(covariance_s)
+        V = solve_triangular(self.L, K_s, lower=True)
+        # mu* = K*.T K^-1 f
+        mu = (V.T @ self.__LY).reshape(-1)
+        # sigma* = diag(K** - K*.T K^-1 K*), where the diagonal of K** is
+        # sigma_f^2, so the (s, s) K** is never computed
+        sigma = np.maximum(self.sigma_f ** 2 - np.sum(V ** 2, axis=0), 0)
         return mu, sigma
 
+    def predict_gradient(self, X_s):
+        """Function that predicts the mean and variance of points in a
+        Gaussian process, along with their gradients with respect to the
+        points.
+
+        With k the kernel between the samples and a point x,
+        dk_i/dx = k_i (x_i - x) / l^2, so dmu/dx = sum_i a_i dk_i/dx with
+        a = K^-1 f, and dsigma/dx = -2 sum_i b_i dk_i/dx with b = K^-1 k.
+
+        Args:
+            X_s (numpy.ndarray): A tensor of shape (s, d) containing the
+                points.
+
+        Returns:
+            mu (numpy.ndarray): A tensor of shape (s,) containing the mean for
+                each point in X_s.
+            sigma (numpy.ndarray): A tensor of shape (s,) containing the
+                variance for each point in X_s.
+            dmu (numpy.ndarray): A tensor of shape (s, d) containing the
+                gradient of the mean at each point.
+            dsigma (numpy.ndarray): A tensor of shape (s, d) containing the
+                gradient of the variance at each point.
+            None, None, None, None on failure.
+        """
+        if (not isinstance(X_s, np.ndarray) or X_s.ndim != 2 or not
+                X_s.shape[1] == self.X.shape[1]):
+            return None, None, None, None
+        K_s = self.kernel(X1=self.X, X2=X_s)
+        V = solve_triangular(self.L, K_s, lower=True)
+        mu = (V.T @ self.__LY).reshape(-1)
+        sigma = np.maximum(self.sigma_f ** 2 - np.sum(V ** 2, axis=0), 0)
+        a = solve_triangular(self.L.T, self.__LY, lower=False)
+        b = solve_triangular(self.L.T, V, lower=False)
+        length2 = np.asarray(self.l, dtype=float) ** 2
+
+        def gradient(weights):
+            """sum_i weights_i k_i (x_i - x) / l^2 for each point x"""
+            W = weights * K_s
+            return (W.T @ self.X - np.sum(W, axis=0)[:, None] * X_s) / length2
+
+        return mu, sigma, gradient(a), -2 * gradient(b)
+
     def update(self, X_new, Y_new):
         """Public instance method that updates a Gaussian Process. Updates
-        the public instance attributes X, Y, and K.
+        the public instance attributes X, Y, K and L.
+
+        Only the new row of K is computed, and the Cholesky factor is
+        extended by one row with a triangular solve, in O(t^2) instead of the
+        O(t^3) of factoring K again.
 
         Args:
-            X_new (numpy.ndarray): A tensor of shape (1,) that represents the
+            X_new (numpy.ndarray): A tensor of shape (d,) that represents the
                 new sample point.
             Y_new (numpy.ndarray): A tensor of shape (1,) that represents the
                 new sample function value
 
         """
         if (not isinstance(X_new, np.ndarray) or X_new.ndim != 1 or not
-                X_new.shape[0] == 1 or not isinstance(Y_new, np.ndarray) or not
+                X_new.shape[0] == self.X.shape[1] or not
+                isinstance(Y_new, np.ndarray) or not
                 Y_new.ndim == 1 or Y_new.shape[0] != 1):
             raise Exception("Invalid Input")
-        self.X = np.concatenate((self.X, X_new[:, None]), axis=0)
+        x = X_new[None, :]
+        k = self.kernel(X1=self.X, X2=x)
+        k_new = self.kernel(X1=x, X2=x)
+        # [[K, k], [k.T, k_new]] = [[L, 0], [r.T, d]] [[L.T, r], [0, d]]
+        r = solve_triangular(self.L, k, lower=True)
+        d = np.sqrt(max(k_new[0, 0] + self.jitter - np.sum(r ** 2),
+                        self.jitter))
+        self.L = np.block([[self.L, np.zeros_like(r)], [r.T, d]])
+        self.__LY = np.concatenate(
+            (self.__LY, (Y_new[:, None] - r.T @ self.__LY) / d), axis=0)
+        self.K = np.block([[self.K, k], [k.T, k_new]])
+        self.X = np.concatenate((self.X, x), axis=0)
         self.Y = np.concatenate((self.Y, Y_new[:, None]), axis=0)
-        self.K = self.kernel(X1=self.X, X2=self.X)
 
 
 if __name__ == "__main__":
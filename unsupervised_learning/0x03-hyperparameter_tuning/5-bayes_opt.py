@@ -1,35 +1,41 @@
 #!/usr/bin/env python3
 """Moduel that contians the class BayesianOptimization that performs Bayesian
-optimization on a noiseless 1D Gaussian process."""
+optimization on a noiseless Gaussian process."""
 
+import copy
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from scipy.optimize import minimize
 from scipy.stats import norm
 GP = __import__('2-gp').GaussianProcess
 
 
 class BayesianOptimization():
-    """Class that performs Bayesian optimization on a noiseless 1D Gaussian
-    process.
+    """Class that performs Bayesian optimization on a noiseless Gaussian
+    process over a box of d dimensions.
     """
 
     def __init__(self, f, X_init, Y_init, bounds, ac_samples, l=1, sigma_f=1,
-                 xsi=0.01, minimize=True):
+                 xsi=0.01, minimize=True, search='auto', restarts=10):
         """Class constructor.
 
         Args:
             f (function): The black-box function to be optimized
-            X_init (numpy.ndarray): A tensor of shape (t, 1) representing the
+            X_init (numpy.ndarray): A tensor of shape (t, d) representing the
                 inputs already sampled with the black-box function, where t is
-                the number of initial samples.
+                the number of initial samples and d the number of dimensions
+                of an input.
             Y_init (numpy.ndarray): A tensor of shape (t, 1) representing the
                 outputs of the black-box function for each input in X_init,
                 where t is the number of initial samples.
             bounds (tuple): The (min, max) representing the bounds of the space
-                in which to look for the optimal point.
+                in which to look for the optimal point, or a sequence of shape
+                (d, 2) holding the (min, max) of each dimension.
             ac_samples (int): The number of samples that should be analyzed
                 during acquisition.
-            l (float, optional): The length parameter for the kernel. Defaults
-                to 1.
+            l (float, optional): The length parameter for the kernel, or a
+                tensor of shape (d,) holding one length per dimension.
+                Defaults to 1.
             sigma_f (float, optional): The standard deviation given to the
                 output of the black-box function. Defaults to 1.
             xsi (float, optional): The exploration-exploitation factor for
@@ -37,69 +43,271 @@ class BayesianOptimization():
             minimize (bool, optional): A bool determining whether optimization
                 should be performed for minimization (True) or maximization
                 (False). Defaults to True.
+            search (str, optional): How the acquisition is maximized. 'grid'
+                picks the best of the acquisition samples, in 1 dimension
+                only, and 'lbfgs' runs L-BFGS-B on the analytic gradient of
+                the acquisition from the restarts best acquisition samples.
+                Defaults to 'auto', which is 'grid' in 1 dimension and
+                'lbfgs' otherwise.
+            restarts (int, optional): The number of starting points of
+                L-BFGS-B. Defaults to 10.
 
         Sets the following public instance attributes:
             f (function): The black-box function.
             gp (GaussianProcess): A GaussianProcess object.
-            X_s (numpy.ndarray): A tensor of shape (ac_samples, 1) containing
+            X_s (numpy.ndarray): A tensor of shape (ac_samples, d) containing
                 all acquisition sample points, evenly spaced between min and
-                max.
+                max in 1 dimension, and drawn uniformly in the bounds
+                otherwise.
             xsi (): The exploration-exploitation factor.
             minimize (bool): A bool for minimization versus maximization.
+            bounds (numpy.ndarray): A tensor of shape (d, 2) containing the
+                bounds of each dimension.
+            search (str): 'grid' or 'lbfgs'.
+            restarts (int): The number of starting points of L-BFGS-B.
         """
+        d = X_init.shape[1]
+        bounds = np.asarray(bounds, dtype=float)
+        if bounds.ndim == 1:
+            bounds = bounds.reshape(1, 2)
+        if bounds.shape != (d, 2):
+            raise ValueError("bounds must have shape ({}, 2).".format(d))
+        if search == 'auto':
+            search = 'grid' if d == 1 else 'lbfgs'
+        if search not in ('grid', 'lbfgs'):
+            raise ValueError("search must be 'auto', 'grid' or 'lbfgs'.")
+        if search == 'grid' and d != 1:
+            raise ValueError("the grid search only works in 1 dimension.")
+        if not isinstance(restarts, int):
+            raise TypeError("restarts must be an integer.")
+        if restarts < 1:
+            raise ValueError("restarts must be greater than 0.")
+
         self.f = f
         self.gp = GP(X_init=X_init, Y_init=Y_init, l=l, sigma_f=sigma_f)
-        self.X_s = np.linspace(start=bounds[0], stop=bounds[1],
-                               num=ac_samples).reshape(ac_samples, 1)
+        if d == 1:
+            self.X_s = np.linspace(start=bounds[0, 0], stop=bounds[0, 1],
+                                   num=ac_samples).reshape(ac_samples, 1)
+        else:
+            self.X_s = np.random.uniform(bounds[:, 0], bounds[:, 1],
+                                         (ac_samples, d))
         self.xsi = xsi
         self.minimize = minimize
+        self.bounds = bounds
+        self.search = search
+        self.restarts = restarts
 
-    def acquisition(self):
-        """Public instance method that calculates the next best sample
-        location. Uses the Expected Improvement acquisition function.
+    def expected_improvement(self, gp=None):
+        """Public instance method that calculates the expected improvement of
+        every acquisition sample at once.
 
-        Formula from resource: Machine learning - Bayesian optimization and
-        multi-armed bandits @ 57:00.
+        Args:
+            gp (GaussianProcess, optional): The Gaussian process to use.
+                Defaults to None, which uses self.gp.
 
         Returns:
-            X_next (numpy.ndarray): A tensor of shape (1,) representing the
-                next best sample point.
             EI (numpy.ndarray): A tensor of shape (ac_samples,) containing the
                 expected improvement of each potential sample.
+            μ (numpy.ndarray): A tensor of shape (ac_samples,) containing the
+                predicted mean of each potential sample.
+            σ (numpy.ndarray): A tensor of shape (ac_samples,) containing the
+                predicted variance of each potential sample.
         """
-        # Get variables to work with.
-        ac_samples = self.X_s.shape[0]
-        Z = np.zeros(ac_samples)
-        EI = np.zeros(ac_samples)
-        μ, σ = self.gp.predict(X_s=self.X_s)  # mu, sigma
+        if gp is None:
+            gp = self.gp
+        μ, σ = gp.predict(X_s=self.X_s)  # mu, sigma
         ε = self.xsi  # epislon
-        f_output = self.gp.Y
 
         # Configure for minimization or maximization.
         if self.minimize:
-            μ_pluse = np.min(f_output)
-            numerator = μ_pluse - μ - ε
+            numerator = np.min(gp.Y) - μ - ε
+        else:
+            numerator = μ - np.max(gp.Y) - ε
+
+        # The samples without uncertainty have no expected improvement
+        with np.errstate(divide='ignore', invalid='ignore'):
+            Z = numerator / σ  # The standard normal
+            EI = np.where(σ > 0, numerator * norm.cdf(Z) + σ * norm.pdf(Z), 0)
+        return EI, μ, σ
+
+    def expected_improvement_gradient(self, X, gp=None):
+        """Public instance method that calculates the expected improvement of
+        points and its gradient with respect to the points.
+
+        As EI = u Φ(Z) + σ φ(Z) with Z = u / σ, dEI/du = Φ(Z) and
+        dEI/dσ = φ(Z), where u is the improvement of the mean.
+
+        Args:
+            X (numpy.ndarray): A tensor of shape (s, d) containing the points.
+            gp (GaussianProcess, optional): The Gaussian process to use.
+                Defaults to None, which uses self.gp.
+
+        Returns:
+            EI (numpy.ndarray): A tensor of shape (s,) containing the
+                expected improvement of each point.
+            dEI (numpy.ndarray): A tensor of shape (s, d) containing its
+                gradient.
+        """
+        if gp is None:
+            gp = self.gp
+        μ, σ, dμ, dσ = gp.predict_gradient(X)
+        if self.minimize:
+            numerator, dnumerator = np.min(gp.Y) - μ - self.xsi, -dμ
         else:
-            μ_pluse = np.max(f_output)
-            numerator = μ - μ_pluse - ε
+            numerator, dnumerator = μ - np.max(gp.Y) - self.xsi, dμ
+
+        uncertain = σ > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            Z = numerator / σ
+        Φ = np.where(uncertain, norm.cdf(Z), 0)
+        φ = np.where(uncertain, norm.pdf(Z), 0)
+        EI = np.where(uncertain, numerator * Φ + σ * φ, 0)
+        dEI = Φ[:, None] * dnumerator + φ[:, None] * dσ
+        return EI, dEI
+
+    def best_point(self, acquisition):
+        """Public instance method that maximizes an acquisition function over
+        the bounds.
+
+        With the 'lbfgs' search, L-BFGS-B runs from the restarts acquisition
+        samples where the function is highest, and the best point it reaches
+        is kept, unless an acquisition sample is better.
+
+        Args:
+            acquisition (function): Function of a tensor of shape (s, d) that
+                returns the values of shape (s,) and gradients of shape (s, d)
+                of the acquisition at each point.
+
+        Returns:
+            X_next (numpy.ndarray): A tensor of shape (d,) representing the
+                best point.
+            values (numpy.ndarray): A tensor of shape (ac_samples,)
+                containing the acquisition at each acquisition sample.
+        """
+        values, _ = acquisition(self.X_s)
+        best = np.argmax(values)
+        X_next, value = self.X_s[best], values[best]
+        if self.search == 'grid':
+            return X_next, values
+
+        def negative(x):
+            """The negated acquisition and its gradient at x"""
+            value, gradient = acquisition(x[None, :])
+            return -value[0], -gradient[0]
 
-        Z = (numerator) / σ  # The standard normal
+        starts = np.argsort(-values)[:self.restarts]
+        for x0 in self.X_s[starts]:
+            result = minimize(negative, x0, jac=True, method='L-BFGS-B',
+                              bounds=self.bounds)
+            if -result.fun > value:
+                X_next, value = result.x, -result.fun
+        return X_next, values
 
-        # Get expected improvement of each sample.
-        for x in range(ac_samples):
-            Φ = norm.cdf(Z[x])  # Capital Phi
-            φ = norm.pdf(Z[x])  # Lowercase phi
-            if σ[x] > 0:
-                EI[x] = (numerator[x] * Φ) + (σ[x] * φ)
-            if σ[x] == 0:
-                EI[x] = 0
+    def acquisition(self):
+        """Public instance method that calculates the next best sample
+        location. Uses the Expected Improvement acquisition function.
+
+        Formula from resource: Machine learning - Bayesian optimization and
+        multi-armed bandits @ 57:00.
+
+        Returns:
+            X_next (numpy.ndarray): A tensor of shape (d,) representing the
+                next best sample point.
+            EI (numpy.ndarray): A tensor of shape (ac_samples,) containing the
+                expected improvement of each potential sample.
+        """
+        if self.search == 'lbfgs':
+            return self.best_point(self.expected_improvement_gradient)
+
+        EI, _, _ = self.expected_improvement()
 
         # Get best next sample point.
         X_next = self.X_s[np.argmax(EI)]
 
         return X_next, EI
 
-    def optimize(self, iterations=100):
+    def batch_acquisition(self, q, strategy='believer'):
+        """Public instance method that calculates the q next sample locations,
+        to be evaluated together.
+
+        With 'believer' (kriging believer), each point is the best one of a
+        copy of the Gaussian process that was updated with the previous
+        points as if f returned their predicted mean there. With
+        'penalization' (local penalization), the expected improvement is
+        multiplied, for each previous point, by the probability that the
+        points around it are not within the ball that its prediction allows,
+        given a Lipschitz constant of the mean.
+
+        Args:
+            q (int): The number of sample points.
+            strategy (str, optional): 'believer' or 'penalization'. Defaults
+                to 'believer'.
+
+        Returns:
+            X_next (numpy.ndarray): A tensor of shape (q, d) representing the
+                next sample points.
+        """
+        if not isinstance(q, int):
+            raise TypeError("q must be an integer.")
+        if q < 1:
+            raise ValueError("q must be greater than 0.")
+        if strategy not in ('believer', 'penalization'):
+            raise ValueError("strategy must be 'believer' or 'penalization'.")
+        X_next = np.empty((q, self.X_s.shape[1]))
+
+        if strategy == 'believer':
+            gp = copy.deepcopy(self.gp)
+            for j in range(q):
+                X_next[j], _ = self.best_point(
+                    lambda X: self.expected_improvement_gradient(X, gp))
+                μ, _ = gp.predict(X_next[j:j + 1])
+                gp.update(X_next[j], μ)
+            return X_next
+
+        _, _, dμ, _ = self.gp.predict_gradient(self.X_s)
+        lipschitz = max(np.max(np.linalg.norm(dμ, axis=1)), 1e-7)
+        y_best = np.min(self.gp.Y) if self.minimize else np.max(self.gp.Y)
+        centers, radii, scales = [], [], []
+
+        def penalized(X):
+            """The expected improvement times the penalty of each chosen
+            point, and its gradient"""
+            EI, dEI = self.expected_improvement_gradient(X)
+            penalties, gradients = [], []
+            for center, radius, scale in zip(centers, radii, scales):
+                offset = X - center
+                distance = np.linalg.norm(offset, axis=1)
+                if scale > 0:
+                    z = (distance - radius) / scale
+                    penalties.append(norm.cdf(z))
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        direction = np.where(distance[:, None] > 0,
+                                             offset / distance[:, None], 0)
+                    gradients.append((norm.pdf(z) / scale)[:, None] *
+                                     direction)
+                else:
+                    penalties.append((distance > radius).astype(float))
+                    gradients.append(np.zeros_like(X))
+            penalty = np.prod(penalties + [np.ones_like(EI)], axis=0)
+            value = EI * penalty
+            gradient = dEI * penalty[:, None]
+            for j, dpenalty in enumerate(gradients):
+                others = np.prod(penalties[:j] + penalties[j + 1:] +
+                                 [np.ones_like(EI)], axis=0)
+                gradient += (EI * others)[:, None] * dpenalty
+            return value, gradient
+
+        for j in range(q):
+            X_next[j], _ = self.best_point(penalized)
+            μ, σ = self.gp.predict(X_next[j:j + 1])
+            # Ball that f(x) = y_best cannot reach from the chosen point
+            centers.append(X_next[j])
+            radii.append(np.abs(μ[0] - y_best) / lipschitz)
+            scales.append(np.sqrt(2 * σ[0]) / lipschitz)
+        return X_next
+
+    def optimize(self, iterations=100, q=1, strategy='believer',
+                 workers=None):
         """Public instance method that optimizes the black-box function. If the
         next proposed point is one that has already been sampled, optimization
         will be stopped early.
@@ -107,9 +315,17 @@ class BayesianOptimization():
         Args:
             iterations (int, optional): The maximum number of iterations to
                 perform. Defaults to 100.
+            q (int, optional): The number of points proposed and evaluated
+                at each iteration. Defaults to 1.
+            strategy (str, optional): The strategy of batch_acquisition when
+                q is above 1. Defaults to 'believer'.
+            workers (int, optional): The number of worker processes that
+                evaluate the points of an iteration at the same time, f
+                having to be a module-level function. Defaults to None, which
+                evaluates them in this process.
 
         Returns:
-            X_opt (numpy.ndarray): A tensor of shape (1,) representing the
+            X_opt (numpy.ndarray): A tensor of shape (d,) representing the
                 optimal point.
             Y_opt (numpy.ndarray): A tensor of shape (1,) representing the
                 optimal function value.
@@ -118,31 +334,49 @@ class BayesianOptimization():
             raise TypeError("iterations must be an integer.")
         if iterations < 1:
             raise ValueError("iterations must be greater than 1.")
+        if not isinstance(q, int):
+            raise TypeError("q must be an integer.")
+        if q < 1:
+            raise ValueError("q must be greater than 0.")
+        if strategy not in ('believer', 'penalization'):
+            raise ValueError("strategy must be 'believer' or 'penalization'.")
+
+        tested = set()
+        pool = None if workers is None else ProcessPoolExecutor(workers)
 
-        tested = []
-
-        for i in range(iterations):
-            # Find the next sampling point using the acquisition function
-            try:
-                X_next, _ = self.acquisition()
-            except Exception:
-                break
-            # Early stopping
-            if X_next in tested:
-                break
-            tested.append(X_next)
-            # Obtain a sample yt=f(xt)+ϵt from the objective function f.
-            Y_next = self.f(X_next)
-            # Add the sample to previous samples and update the GP.
-            np.concatenate((self.X_s, X_next[None, :]), axis=0)
-            self.gp.update(X_next, Y_next)
-            # Get current optimums
-            if self.minimize:
-                Y_opt = np.min(self.gp.Y).reshape(1)
-                X_opt = self.gp.X[np.argmin(self.gp.Y)]
-            else:
-                Y_opt = np.max(self.gp.Y).reshape(1)
-                X_opt = self.gp.X[np.argmax(self.gp.Y)]
+        try:
+            for i in range(iterations):
+                # Find the next sampling points using the acquisition
+                # function
+                if q == 1:
+                    X_batch = self.acquisition()[0][np.newaxis]
+                else:
+                    X_batch = self.batch_acquisition(q, strategy)
+                # Early stopping
+                X_batch = [X_next for X_next in X_batch
+                           if tuple(X_next) not in tested]
+                if not X_batch:
+                    break
+                tested.update(tuple(X_next) for X_next in X_batch)
+                # Obtain samples yt=f(xt)+ϵt from the objective function f.
+                if pool is None:
+                    Y_batch = [self.f(X_next) for X_next in X_batch]
+                else:
+                    Y_batch = list(pool.map(self.f, X_batch))
+                # Add the samples to previous samples and update the GP.
+                for X_next, Y_next in zip(X_batch, Y_batch):
+                    self.gp.update(X_next, Y_next)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        # Get current optimums
+        if self.minimize:
+            Y_opt = np.min(self.gp.Y).reshape(1)
+            X_opt = self.gp.X[np.argmin(self.gp.Y)]
+        else:
+            Y_opt = np.max(self.gp.Y).reshape(1)
+            X_opt = self.gp.X[np.argmax(self.gp.Y)]
 
         return X_opt, Y_opt
 